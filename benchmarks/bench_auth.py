@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+"""
+Benchmarks for MDSAuth header generation
+"""
+
+from mds.MDSAuth import MDSAuth
+from mds.MDSTransport import MDSMemoryTransport, MDSTransportResponse
+
+
+def test_bearer(benchmark):
+    auth = MDSAuth(config={"auth_type": "Bearer", "token": "token"})
+    assert benchmark(auth.authenticate)["Authorization"] == "Bearer token"
+
+
+def test_basic(benchmark):
+    auth = MDSAuth(config={"auth_type": "Basic", "auth_data": {"username": "user", "password": "pass"}})
+    assert benchmark(auth.authenticate)["Authorization"].startswith("Basic ")
+
+
+def test_custom(benchmark):
+    auth = MDSAuth(
+        config={"auth_type": "Custom"},
+        custom_function=lambda config: {"Authorization": "Bearer custom"},
+    )
+    assert benchmark(auth.authenticate)["Authorization"] == "Bearer custom"
+
+
+def test_oauth(benchmark):
+    """
+    Generates OAuth headers against an in-process token endpoint
+    """
+    transport = MDSMemoryTransport()
+    transport.add("POST", "http://provider.test/token", MDSTransportResponse(200, {"access_token": "token"}))
+    auth = MDSAuth(config={
+        "auth_type": "OAuth",
+        "token_url": "http://provider.test/token",
+        "auth_data": {"client_id": "id", "client_secret": "secret"},
+        "auth_token_res_key": "access_token",
+    }, transport=transport)
+    assert benchmark(auth.authenticate)["Authorization"] == "Bearer token"
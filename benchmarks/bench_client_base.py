@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+"""
+Benchmarks for MDSClientBase
+"""
+
+import synthetic
+
+from mds.clients.MDSClientBase import MDSClientBase
+
+
+def test_build_response(benchmark, synthetic_size):
+    """
+    Decodes one synthetic page
+    """
+    bodies = synthetic.make_pages(
+        version="0.3.0",
+        pages=1,
+        trips_per_page=synthetic_size["trips_per_page"],
+        route_points=synthetic_size["route_points"],
+    )
+    response = synthetic.FakeResponse(next(iter(bodies.values())))
+    data = benchmark(MDSClientBase._build_response, response)
+    assert len(data["payload"]["data"]["trips"]) == synthetic_size["trips_per_page"]
+
+
+def test_build_response_error(benchmark):
+    """
+    Builds the response of a failed request
+    """
+    response = synthetic.FakeResponse(b"Internal Server Error", status_code=500)
+    data = benchmark(MDSClientBase._build_response, response)
+    assert data["response"] == "error"
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Benchmarks for the paging loops and parameters of the version clients
+"""
+
+import pytest
+import synthetic
+
+from mds.clients import MDSClient020, MDSClient030, MDSClient040
+
+CLIENTS = {
+    "0.2.0": MDSClient020,
+    "0.3.0": MDSClient030,
+    "0.4.0": MDSClient040,
+}
+
+
+def build_client(version):
+    client = CLIENTS[version](config={"mds_api_url": synthetic.BASE_URL, "delay": 0})
+    client.headers = {"Authorization": "Bearer token"}
+    return client
+
+
+@pytest.mark.parametrize("version", sorted(CLIENTS))
+def test_get_trips(benchmark, fake_transport, synthetic_size, version):
+    """
+    Downloads and accumulates every synthetic page
+    """
+    client = build_client(version)
+    client.set_transport(fake_transport(version, **synthetic_size))
+    trips = benchmark(client.get_trips, start_time=1578780000, end_time=1578783600)
+    assert len(trips["data"]["trips"]) == synthetic_size["pages"] * synthetic_size["trips_per_page"]
+
+
+def test_get_trips_fields(benchmark, fake_transport, synthetic_size):
+    """
+    Downloads every synthetic page, keeping a few fields of each trip
+    """
+    client = build_client("0.3.0")
+    client.set_transport(fake_transport("0.3.0", **synthetic_size))
+    trips = benchmark(
+        client.get_trips, start_time=1578780000, end_time=1578783600,
+        fields=["trip_id", "device_id", "start_time", "end_time", "trip_distance", "cost"],
+    )
+    assert "route" not in trips["data"]["trips"][0]
+
+
+@pytest.mark.parametrize("version", sorted(CLIENTS))
+def test_load_params(benchmark, version):
+    """
+    Loads the URI parameters of a query
+    """
+    client = build_client(version)
+    if version == "0.4.0":
+        benchmark(client._load_params, end_time=1578783600)
+    else:
+        benchmark(client._load_params, start_time=1578780000, end_time=1578783600)
+    assert client.params
+
+
+def test_convert_format(benchmark):
+    """
+    Converts a unix timestamp into the MDS 0.4.0 hour format
+    """
+    assert benchmark(MDSClient040._convert_format, 1578783600) == "2020-01-11T23"
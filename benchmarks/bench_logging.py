@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Benchmark: logging overhead per page
+
+Measures the time spent per page by MDSClientBase._get_paged_data against an
+in-process fake provider (no network) under three logging setups:
+
+    legacy:   DEBUG records formatted and written by a root handler, which is
+              what the former import-time logging.basicConfig(level=DEBUG) did
+    default:  the library's default, nothing configured by the application
+    async:    DEBUG enabled through MDSLogging.enable_async_logging, records
+              are written by a background thread
+
+Usage:
+    $ python benchmarks/bench_logging.py --pages 2000 --repeat 5
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic
+
+from mds.MDSLogging import MDSLogging
+from mds.clients.MDSClient030 import MDSClient030
+
+
+def run(client, pages, repeat):
+    """
+    Returns the best time per page in microseconds
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        client._get_paged_data(mds_endpoint=f"{synthetic.BASE_URL}/trips", params={"min_end_time": 0})
+        elapsed = (time.perf_counter() - start) / pages * 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page logging overhead of the MDS client")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--trips-per-page", type=int, default=10)
+    parser.add_argument("--route-points", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    transport = synthetic.FakeTransport(synthetic.make_pages(
+        version="0.3.0", pages=args.pages, trips_per_page=args.trips_per_page, route_points=args.route_points
+    ))
+    client = MDSClient030(config={"mds_api_url": synthetic.BASE_URL, "delay": 0, "transport": transport})
+    client.headers = {"Accept": "application/vnd.mds.provider+json;version=0.3", "Authorization": "Bearer secret"}
+
+    devnull = open(os.devnull, "w")
+    root = logging.getLogger()
+    mds_logger = logging.getLogger("mds")
+    results = {}
+
+    # legacy: everything formatted and emitted by a root handler
+    handler = logging.StreamHandler(devnull)
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(logging.DEBUG)
+    results["legacy"] = run(client, args.pages, args.repeat)
+    root.removeHandler(handler)
+    root.setLevel(logging.WARNING)
+
+    # default: nothing configured
+    results["default"] = run(client, args.pages, args.repeat)
+
+    # async: DEBUG enabled, emitted in a background thread
+    handler = logging.StreamHandler(devnull)
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    MDSLogging.enable_async_logging(handler)
+    results["async"] = run(client, args.pages, args.repeat)
+    MDSLogging.disable_async_logging()
+    mds_logger.setLevel(logging.NOTSET)
+
+    print(f"{'setup':<10}{'us/page':>12}{'vs legacy':>12}")
+    for name, per_page in results.items():
+        print(f"{name:<10}{per_page:>12.1f}{results['legacy'] / per_page:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
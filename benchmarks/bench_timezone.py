@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""
+Benchmarks for MDSTimeZone
+"""
+
+from datetime import datetime
+
+from mds.MDSTimeZone import MDSTimeZone
+
+
+def build_time_zone():
+    return MDSTimeZone(date_time_now=datetime(2020, 1, 11, 17), offset=3600, time_zone="US/Central")
+
+
+def test_constructor(benchmark):
+    """
+    Builds a time-zone aware start/end pair
+    """
+    assert isinstance(benchmark(build_time_zone), MDSTimeZone)
+
+
+def test_get_time_start(benchmark):
+    """
+    Returns the start time in UTC unix format
+    """
+    time_zone = build_time_zone()
+    assert benchmark(time_zone.get_time_start, utc=True, unix=True) == 1578780000.0
+
+
+def test_get_time_end(benchmark):
+    """
+    Returns the end time in UTC unix format
+    """
+    time_zone = build_time_zone()
+    assert benchmark(time_zone.get_time_end, utc=True, unix=True) == 1578783600.0
+
+
+def test_get_windows(benchmark):
+    """
+    Plans a year of hourly windows in US/Central, in milliseconds
+    """
+    starts, ends = benchmark(
+        MDSTimeZone.get_windows, datetime(2020, 1, 1), datetime(2021, 1, 1),
+        time_zone="US/Central", milliseconds=True,
+    )
+    assert len(starts) == len(ends) == 8784
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("mds-benchmarks")
+    group.addoption("--mds-pages", type=int, default=10, help="Pages per synthetic pull")
+    group.addoption("--mds-trips", type=int, default=100, help="Trips per synthetic page")
+    group.addoption("--mds-route-points", type=int, default=10, help="Route points per synthetic trip")
+
+
+@pytest.fixture(scope="session")
+def synthetic_size(request):
+    return {
+        "pages": request.config.getoption("--mds-pages"),
+        "trips_per_page": request.config.getoption("--mds-trips"),
+        "route_points": request.config.getoption("--mds-route-points"),
+    }
+
+
+@pytest.fixture
+def fake_transport():
+    """
+    Returns a factory that builds a FakeTransport serving synthetic pages for a version
+    """
+
+    def build(version, **size):
+        return synthetic.FakeTransport(synthetic.make_pages(version=version, **size))
+
+    return build
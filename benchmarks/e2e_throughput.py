@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+End-to-end throughput and tail latency of MDSClient under load
+
+Starts a local MDSMockProvider, then pulls consecutive hourly windows with
+several concurrent clients and reports the throughput and the request latency
+percentiles as seen by the client (retries and injected faults included).
+
+Usage:
+    $ python benchmarks/e2e_throughput.py --version 0.3.0 --concurrency 8 --windows 48
+    $ python benchmarks/e2e_throughput.py --latency-median 0.05 --latency-sigma 0.8 \
+        --error-rate-429 0.02 --error-rate-5xx 0.02 --disconnect-rate 0.01 --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mds import MDSClient, MDSObserver, MDSPagingException, MDSTransport
+from mds.MDSMockProvider import MDSMockProvider
+
+
+class LatencyRecorder(MDSObserver):
+    """
+    Keeps every request duration, so percentiles are exact
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.bytes = 0
+        self.retries = 0
+        self.pages = 0
+
+    def on_request_end(self, elapsed, bytes_received, **kwargs):
+        with self.lock:
+            self.latencies.append(elapsed)
+            self.bytes += bytes_received
+
+    def on_retry(self, **kwargs):
+        with self.lock:
+            self.retries += 1
+
+    def on_page(self, **kwargs):
+        with self.lock:
+            self.pages += 1
+
+
+def percentile(values, q):
+    """
+    Returns the q-th percentile (0-100) of a sorted list, nearest rank
+    """
+    if not values:
+        return None
+    rank = max(int(round(q / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end throughput of MDSClient against a local provider")
+    parser.add_argument("--version", default="0.3.0", choices=sorted(MDSMockProvider.versions))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--windows", type=int, default=24, help="Hourly windows to pull")
+    parser.add_argument("--trips-per-hour", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--route-points", type=int, default=5)
+    parser.add_argument("--latency-median", type=float, default=0.0, help="Seconds, log-normal")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate-429", type=float, default=0.0)
+    parser.add_argument("--error-rate-5xx", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--max-attempts", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--transport", default="requests", choices=["requests", "http2"])
+    parser.add_argument("--json", action="store_true", help="Print a JSON report")
+    args = parser.parse_args()
+
+    provider = MDSMockProvider(
+        version=args.version,
+        seed=args.seed,
+        trips_per_hour=args.trips_per_hour,
+        page_size=args.page_size,
+        route_points=args.route_points,
+        latency=MDSMockProvider.lognormal(args.latency_median, args.latency_sigma) if args.latency_median else None,
+        error_rate_429=args.error_rate_429,
+        error_rate_5xx=args.error_rate_5xx,
+        disconnect_rate=args.disconnect_rate,
+    )
+
+    recorder = LatencyRecorder()
+    first_hour = 1578783600
+    windows = [first_hour + 3600 * i for i in range(args.windows)]
+    failures = []
+    trips = []
+
+    # One transport, so the concurrent pulls share the provider's connections
+    transport = MDSTransport.get_transport(args.transport)
+
+    def pull(end_time):
+        config = provider.get_config(max_attempts=args.max_attempts, transport=transport)
+        client = MDSClient(config=config, observers=[recorder])
+        try:
+            result = client.get_trips(start_time=end_time - 3600, end_time=end_time)
+            trips.append(len(result["data"]["trips"]))
+        except MDSPagingException as e:
+            failures.append(str(e))
+
+    with provider:
+        # Warm up the provider's trip cache, so we measure the client
+        for end_time in windows:
+            provider.get_trips(end_time - 3600, end_time)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(pull, windows))
+        wall_time = time.perf_counter() - start
+        server_stats = dict(provider.stats)
+
+    latencies = sorted(recorder.latencies)
+    report = {
+        "version": args.version,
+        "concurrency": args.concurrency,
+        "transport": args.transport,
+        "windows": args.windows,
+        "failed_windows": len(failures),
+        "wall_time": round(wall_time, 3),
+        "requests": len(latencies),
+        "retries": recorder.retries,
+        "pages": recorder.pages,
+        "trips": sum(trips),
+        "pages_per_second": round(recorder.pages / wall_time, 1),
+        "trips_per_second": round(sum(trips) / wall_time, 1),
+        "megabytes_per_second": round(recorder.bytes / 1048576 / wall_time, 2),
+        "latency_ms": {
+            name: round(percentile(latencies, q) * 1000, 2) if latencies else None
+            for name, q in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+        },
+        "server": server_stats,
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"MDS {report['version']}, {report['concurrency']} concurrent clients, {report['windows']} windows")
+    print(f"  wall time        {report['wall_time']} s ({report['failed_windows']} failed windows)")
+    print(f"  requests         {report['requests']} ({report['retries']} retries)")
+    print(f"  throughput       {report['pages_per_second']} pages/s, {report['trips_per_second']} trips/s, "
+          f"{report['megabytes_per_second']} MB/s")
+    print("  latency (ms)     " + ", ".join(f"{k} {v}" for k, v in report["latency_ms"].items()))
+    print(f"  server           {report['server']}")
+
+
+if __name__ == "__main__":
+    main()
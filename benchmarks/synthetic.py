@@ -0,0 +1,112 @@
+"""
+Synthetic MDS data for the benchmarks
+
+Builds trips, pages and an in-process fake transport for the clients'
+"transport" setting, so the client's hot paths can be measured without a network.
+"""
+
+import json
+import random
+import uuid
+
+# Version: (timestamp multiplier, MDS version string)
+VERSIONS = {
+    "0.2.0": (1, "0.2.0"),
+    "0.3.0": (1000, "0.3.0"),
+    "0.4.0": (1000, "0.4.0"),
+}
+
+BASE_URL = "http://provider.test"
+
+
+def make_route(rng, start_time, end_time, route_points):
+    """
+    Returns a route FeatureCollection with `route_points` points between the trip times
+    """
+    lon, lat = -97.74 + rng.uniform(-0.1, 0.1), 30.27 + rng.uniform(-0.1, 0.1)
+    step = (end_time - start_time) / max(route_points - 1, 1)
+    features = []
+    for i in range(route_points):
+        lon += rng.uniform(-0.001, 0.001)
+        lat += rng.uniform(-0.001, 0.001)
+        features.append({
+            "type": "Feature",
+            "properties": {"timestamp": int(start_time + i * step)},
+            "geometry": {"type": "Point", "coordinates": [round(lon, 6), round(lat, 6)]},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def make_trip(rng, version, start_time, route_points):
+    """
+    Returns a trip in the shape of the given MDS version
+    """
+    multiplier = VERSIONS[version][0]
+    duration = rng.randint(120, 1800)
+    trip_start = start_time * multiplier
+    trip_end = (start_time + duration) * multiplier
+    return {
+        "provider_id": "7b7243fc-ea90-465f-81a0-13cc66066ab7",
+        "provider_name": "Synthetic",
+        "device_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "vehicle_id": f"V{rng.randint(0, 9999):04d}",
+        "vehicle_type": rng.choice(["scooter", "bicycle"]),
+        "propulsion_type": ["electric"],
+        "trip_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "trip_duration": duration,
+        "trip_distance": rng.randint(100, 8000),
+        "route": make_route(rng, trip_start, trip_end, route_points),
+        "accuracy": 10,
+        "start_time": trip_start,
+        "end_time": trip_end,
+        "cost": rng.randint(100, 900),
+    }
+
+
+def make_pages(version="0.3.0", pages=10, trips_per_page=100, route_points=10, seed=0):
+    """
+    Returns {url: json body bytes} for `pages` pages linked by `next` links
+    """
+    rng = random.Random(seed)
+    bodies = {}
+    for page in range(pages):
+        url = f"{BASE_URL}/trips" if page == 0 else f"{BASE_URL}/trips?page={page}"
+        next_link = f"{BASE_URL}/trips?page={page + 1}" if page + 1 < pages else None
+        trips = [
+            make_trip(rng, version, 1578780000 + rng.randint(0, 3600), route_points)
+            for _ in range(trips_per_page)
+        ]
+        bodies[url] = json.dumps({
+            "version": VERSIONS[version][1],
+            "data": {"trips": trips},
+            "links": {"next": next_link},
+        }).encode("utf-8")
+    return bodies
+
+
+class FakeResponse:
+    """
+    A response with the attributes the client reads from requests.Response
+    """
+
+    def __init__(self, content, status_code=200):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {"Content-Type": "application/vnd.mds.provider+json"}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeTransport:
+    """
+    Serves pre-built page bodies by URL, to be set as the client's transport
+    """
+
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.requests = 0
+
+    def get(self, url, params=None, **kwargs):
+        self.requests += 1
+        return FakeResponse(self.bodies[url])
@@ -0,0 +1,323 @@
+"""
+Class: MDSAggregate
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to compute trip metrics in a single
+pass over the pages of a pull, without keeping the trips: the number of trips
+per hour, the total distance and duration, the duration percentiles and the
+vehicle types, by provider. The aggregates of windows or providers pulled in
+parallel merge exactly, so they can be computed per window and combined:
+
+    aggregate = MDSTripAggregate()
+    for trips in mds_client.iter_trips(start_time, end_time):
+        aggregate.add("lime", trips)
+    aggregate.get_report()
+
+    # Or as a sink, optionally in front of another sink (threads only, see MDSAggregateSink)
+    sink = MDSAggregateSink(sink=MDSFileSink("/data/trips"))
+    MDSBackfill(providers=providers, sink=sink).run(start_time, end_time)
+    sink.aggregate.get_report()
+
+Percentiles come from MDSQuantileSketch, a sketch with logarithmic buckets
+(as in DDSketch): every estimate is within a relative error of the true value,
+memory grows with the log of the value range only, and merging two sketches
+adds their bucket counts, so it is exact.
+"""
+
+import math
+import threading
+
+from .MDSException import MDSException
+from .MDSSink import MDSSink
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MDSQuantileSketch:
+    __slots__ = (
+        "relative_accuracy",
+        "gamma",
+        "_log_gamma",
+        "buckets",
+        "zero_count",
+        "count",
+        "min",
+        "max",
+    )
+
+    def __init__(self, relative_accuracy=0.01):
+        """
+        Initializes an empty sketch
+        :param float relative_accuracy: The maximum relative error of the quantiles, e.g. 0.01 for 1%
+        """
+        if not 0 < relative_accuracy < 1:
+            raise MDSException("MDSQuantileSketch::__init__() relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        # {bucket index: count}, bucket i holds the values in (gamma^(i-1), gamma^i]
+        self.buckets = {}
+        # Values of zero or less
+        self.zero_count = 0
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value, count=1):
+        """
+        Adds a value
+        :param float value: The value
+        :param int count: The number of times the value is added
+        """
+        if value > 0:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        else:
+            self.zero_count += count
+        self.count += count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """
+        Adds the values of another sketch with the same accuracy
+        :param MDSQuantileSketch other: The other sketch
+        """
+        if other.gamma != self.gamma:
+            raise MDSException("MDSQuantileSketch::merge() The sketches have different accuracies")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def get_quantile(self, quantile):
+        """
+        Returns an estimate of a quantile
+        :param float quantile: The quantile, between 0 and 1 (e.g., 0.5 for the median)
+        :return float: The estimate, or None if the sketch is empty
+        """
+        if not self.count:
+            return None
+        rank = quantile * (self.count - 1)
+        if rank < self.zero_count:
+            return min(max(0, self.min), self.max)
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # The middle of the bucket in relative terms, then kept within the values seen
+                estimate = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def to_dict(self):
+        """
+        Returns the sketch as a JSON-serializable dictionary
+        :return dict:
+        """
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Builds a sketch from the output of to_dict()
+        :param dict data: The dictionary
+        :return MDSQuantileSketch:
+        """
+        sketch = cls(relative_accuracy=data["relative_accuracy"])
+        sketch.buckets = {int(index): count for index, count in data["buckets"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        return sketch
+
+
+class MDSTripAggregate:
+    # The percentiles of the report
+    quantiles = (0.5, 0.9, 0.99)
+
+    def __init__(self, relative_accuracy=0.01):
+        """
+        Initializes empty aggregates
+        :param float relative_accuracy: The maximum relative error of the duration percentiles
+        """
+        self.relative_accuracy = relative_accuracy
+        # {provider: {"trips", "distance", "duration", "hourly", "vehicle_types", "durations"}}
+        self.providers = {}
+
+    def _get_provider(self, provider):
+        aggregate = self.providers.get(provider)
+        if aggregate is None:
+            aggregate = self.providers[provider] = {
+                "trips": 0,
+                "distance": 0,
+                "duration": 0,
+                "hourly": {},
+                "vehicle_types": {},
+                "durations": MDSQuantileSketch(self.relative_accuracy),
+            }
+        return aggregate
+
+    def add(self, provider, trips, time_multiplier=None):
+        """
+        Adds the trips of a page
+        :param str provider: The provider name
+        :param list trips: The trips
+        :param int time_multiplier: (Optional) 1 if the trip times are in seconds, 1000 if in milliseconds,
+            detected from each trip's end_time if None
+        """
+        aggregate = self._get_provider(provider)
+        hourly = aggregate["hourly"]
+        vehicle_types = aggregate["vehicle_types"]
+        durations = aggregate["durations"]
+        distance = 0
+        duration = 0
+
+        for trip in trips:
+            end_time = trip.get("end_time")
+            if end_time is not None:
+                multiplier = time_multiplier or (1000 if end_time > 1e11 else 1)
+                end_time = int(end_time // multiplier)
+                hour = end_time - end_time % 3600
+                hourly[hour] = hourly.get(hour, 0) + 1
+
+            # trip_duration is in seconds in every version
+            trip_duration = trip.get("trip_duration")
+            if trip_duration is not None:
+                duration += trip_duration
+                durations.add(trip_duration)
+
+            distance += trip.get("trip_distance") or 0
+            vehicle_type = trip.get("vehicle_type")
+            vehicle_types[vehicle_type] = vehicle_types.get(vehicle_type, 0) + 1
+
+        aggregate["trips"] += len(trips)
+        aggregate["distance"] += distance
+        aggregate["duration"] += duration
+
+    def merge(self, other):
+        """
+        Adds the aggregates of another MDSTripAggregate, e.g. of another window or process
+        :param MDSTripAggregate other: The other aggregates
+        """
+        for provider, theirs in other.providers.items():
+            ours = self._get_provider(provider)
+            for key in ("trips", "distance", "duration"):
+                ours[key] += theirs[key]
+            for key in ("hourly", "vehicle_types"):
+                for value, count in theirs[key].items():
+                    ours[key][value] = ours[key].get(value, 0) + count
+            ours["durations"].merge(theirs["durations"])
+
+    def get_report(self):
+        """
+        Returns the metrics by provider
+        :return dict: {provider: {"trips", "distance", "duration", "duration_percentiles", "hourly",
+            "vehicle_types"}}, where hourly counts the trips by the unix time of the hour they ended in
+        """
+        return {
+            provider: {
+                "trips": aggregate["trips"],
+                "distance": aggregate["distance"],
+                "duration": aggregate["duration"],
+                "duration_percentiles": {
+                    f"p{quantile * 100:g}": aggregate["durations"].get_quantile(quantile)
+                    for quantile in self.quantiles
+                },
+                "hourly": dict(sorted(aggregate["hourly"].items())),
+                "vehicle_types": aggregate["vehicle_types"],
+            }
+            for provider, aggregate in self.providers.items()
+        }
+
+    def to_dict(self):
+        """
+        Returns the aggregates as a JSON-serializable dictionary, to be merged elsewhere
+        :return dict:
+        """
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "providers": {
+                provider: {
+                    **{key: aggregate[key] for key in ("trips", "distance", "duration", "vehicle_types")},
+                    "hourly": {str(hour): count for hour, count in aggregate["hourly"].items()},
+                    "durations": aggregate["durations"].to_dict(),
+                }
+                for provider, aggregate in self.providers.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Builds aggregates from the output of to_dict()
+        :param dict data: The dictionary
+        :return MDSTripAggregate:
+        """
+        aggregate = cls(relative_accuracy=data["relative_accuracy"])
+        for provider, values in data["providers"].items():
+            aggregate.providers[provider] = {
+                **{key: values[key] for key in ("trips", "distance", "duration")},
+                "vehicle_types": dict(values["vehicle_types"]),
+                "hourly": {int(hour): count for hour, count in values["hourly"].items()},
+                "durations": MDSQuantileSketch.from_dict(values["durations"]),
+            }
+        return aggregate
+
+
+class MDSAggregateSink(MDSSink):
+    def __init__(self, sink=None, aggregate=None):
+        """
+        A sink that aggregates the trips of each window, and passes the pages on to another sink.
+        The aggregates are kept in memory, so backfills must use the thread executor.
+        :param MDSSink sink: (Optional) The sink the pages are written to as they are aggregated
+        :param MDSTripAggregate aggregate: (Optional) The aggregates to add the windows to
+        """
+        self.sink = sink
+        self.aggregate = aggregate or MDSTripAggregate()
+        self._lock = threading.Lock()
+        # The windows already aggregated, a window pulled again is not counted twice
+        self._windows = set()
+
+    def write_window(self, provider, start_time, end_time, pages):
+        window = (provider, int(start_time), int(end_time))
+        # Aggregated aside, a failed or retried pull adds nothing
+        window_aggregate = MDSTripAggregate(self.aggregate.relative_accuracy)
+
+        def aggregate_pages():
+            for page in pages:
+                window_aggregate.add(provider, page)
+                yield page
+
+        if self.sink is None:
+            trips = 0
+            for page in aggregate_pages():
+                trips += len(page)
+        else:
+            trips = self.sink.write_window(provider, start_time, end_time, aggregate_pages())
+
+        with self._lock:
+            if window in self._windows:
+                logger.debug("MDSAggregateSink::write_window() Already aggregated: %s %s-%s", *window)
+            else:
+                self._windows.add(window)
+                self.aggregate.merge(window_aggregate)
+        return trips
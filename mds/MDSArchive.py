@@ -0,0 +1,312 @@
+"""
+Class: MDSArchive
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to keep the raw pages downloaded
+from providers, so normalization logic can be re-run offline without pulling
+the history again.
+
+Pages are compressed and appended to segment files, and an SQLite index maps
+each page to its provider, window (the query of the first page of a pull),
+page number and position in the segments. The recording transport sits under
+MDSClientBase._request and archives every successful page; the replay
+transport serves the archived pages back to the unchanged get_trips code,
+reading them from memory-mapped segments:
+
+    archive = MDSArchive("/data/mds-archive")
+
+    # Record while pulling
+    config["transport"] = archive.get_recording_transport(provider="lime")
+    MDSClient(config=config).get_trips(start_time=start_time, end_time=end_time)
+
+    # Replay, no network involved
+    config["transport"] = archive.get_replay_transport(provider="lime")
+    MDSClient(config=config).get_trips(start_time=start_time, end_time=end_time)
+
+Segment record layout (big endian):
+    b"MDSR" | meta length (uint32) | body length (uint32) | meta (JSON) | body (zlib)
+"""
+
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+
+from .MDSTransport import MDSTransport, MDSTransportResponse
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MDSArchive:
+    record_magic = b"MDSR"
+    record_header = struct.Struct(">4sII")
+    segment_name = "segment-%06d.mds"
+
+    def __init__(self, path, max_segment_bytes=256 * 1024 * 1024, compression_level=6):
+        """
+        Opens (or creates) an archive
+        :param str path: The directory of the archive
+        :param int max_segment_bytes: The size at which a new segment file is started
+        :param int compression_level: The zlib compression level, from 1 (fast) to 9 (small)
+        """
+        self.path = path
+        self.max_segment_bytes = max_segment_bytes
+        self.compression_level = compression_level
+        os.makedirs(path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._segment_file = None
+        self._segment_number = None
+        self._maps = {}
+
+        self._index = sqlite3.connect(os.path.join(path, "index.sqlite"), check_same_thread=False)
+        self._index.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                provider TEXT NOT NULL,
+                window TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                request_key TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                content_type TEXT,
+                recorded_at REAL NOT NULL,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                raw_length INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_request ON pages (provider, request_key);
+            CREATE INDEX IF NOT EXISTS pages_window ON pages (provider, window, page);
+        """)
+
+    def _get_segment_file(self, incoming_bytes):
+        """
+        Returns the segment file to append to, starting a new one when full
+        :param int incoming_bytes: The size of the record about to be written
+        :return file:
+        """
+        if self._segment_file is None:
+            segments = self.get_segments()
+            self._segment_number = segments[-1] if segments else 1
+            self._segment_file = open(self._get_segment_path(self._segment_number), "ab")
+
+        if self._segment_file.tell() > 0 and \
+                self._segment_file.tell() + incoming_bytes > self.max_segment_bytes:
+            self._segment_file.close()
+            self._segment_number += 1
+            self._segment_file = open(self._get_segment_path(self._segment_number), "ab")
+
+        return self._segment_file
+
+    def _get_segment_path(self, number):
+        return os.path.join(self.path, self.segment_name % number)
+
+    def get_segments(self):
+        """
+        Returns the numbers of the existing segment files
+        :return list:
+        """
+        return sorted(
+            int(name[8:14]) for name in os.listdir(self.path)
+            if name.startswith("segment-") and name.endswith(".mds")
+        )
+
+    def append(self, provider, window, page, request_key, status_code, content, content_type=None):
+        """
+        Appends a raw page to the archive
+        :param str provider: The provider name
+        :param str window: The request key of the first page of the pull
+        :param int page: The page number within the pull, starting at 0
+        :param str request_key: The request key of this page
+        :param int status_code: The HTTP status code
+        :param bytes content: The raw response body
+        :param str content_type: The Content-Type of the response
+        """
+        recorded_at = time.time()
+        meta = json.dumps({
+            "provider": provider,
+            "window": window,
+            "page": page,
+            "request_key": request_key,
+            "status_code": status_code,
+            "content_type": content_type,
+            "recorded_at": recorded_at,
+        }).encode("utf-8")
+        body = zlib.compress(content, self.compression_level)
+        header = self.record_header.pack(self.record_magic, len(meta), len(body))
+
+        with self._lock:
+            segment_file = self._get_segment_file(len(header) + len(meta) + len(body))
+            offset = segment_file.tell() + len(header) + len(meta)
+            segment_file.write(header + meta + body)
+            # The index may only point at data that reached the file
+            segment_file.flush()
+            self._index.execute(
+                "INSERT INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (provider, window, page, request_key, status_code, content_type, recorded_at,
+                 self._segment_number, offset, len(body), len(content)),
+            )
+            self._index.commit()
+
+    def read(self, segment, offset, length):
+        """
+        Reads and decompresses a page body from a memory-mapped segment
+        :param int segment: The segment number
+        :param int offset: The offset of the compressed body
+        :param int length: The length of the compressed body
+        :return bytes:
+        """
+        with self._lock:
+            segment_map = self._maps.get(segment)
+            # The segment may have grown since it was mapped
+            if segment_map is None or offset + length > len(segment_map):
+                if segment_map is not None:
+                    segment_map.close()
+                with open(self._get_segment_path(segment), "rb") as segment_file:
+                    segment_map = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[segment] = segment_map
+            compressed = segment_map[offset:offset + length]
+        return zlib.decompress(compressed)
+
+    def get_index(self, provider):
+        """
+        Returns the latest archived page of each request of a provider
+        :param str provider: The provider name
+        :return dict: {request_key: (segment, offset, length, status_code, content_type)}
+        """
+        with self._lock:
+            rows = self._index.execute(
+                "SELECT request_key, segment, offset, length, status_code, content_type "
+                "FROM pages WHERE provider = ? ORDER BY rowid",
+                (provider,),
+            ).fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def get_windows(self, provider):
+        """
+        Returns the archived windows of a provider and their number of pages
+        :param str provider: The provider name
+        :return dict: {window: pages}
+        """
+        with self._lock:
+            rows = self._index.execute(
+                "SELECT window, COUNT(DISTINCT page) FROM pages WHERE provider = ? GROUP BY window ORDER BY window",
+                (provider,),
+            ).fetchall()
+        return dict(rows)
+
+    def get_recording_transport(self, provider, transport=None):
+        """
+        Returns a transport that archives every successful page
+        :param str provider: The provider name the pages are archived under
+        :param MDSTransport transport: The transport that makes the actual requests, MDSRequestsTransport by default
+        :return MDSRecordingTransport:
+        """
+        return MDSRecordingTransport(archive=self, provider=provider, transport=transport)
+
+    def get_replay_transport(self, provider, transport=None):
+        """
+        Returns a transport that serves the archived pages of a provider
+        :param str provider: The provider name
+        :param MDSTransport transport: (Optional) The transport of the token requests (OAuth)
+        :return MDSReplayTransport:
+        """
+        return MDSReplayTransport(archive=self, provider=provider, transport=transport)
+
+    def close(self):
+        """
+        Closes the segment files and the index
+        """
+        with self._lock:
+            if self._segment_file is not None:
+                self._segment_file.close()
+                self._segment_file = None
+            for segment_map in self._maps.values():
+                segment_map.close()
+            self._maps = {}
+            self._index.close()
+
+
+class MDSRecordingTransport(MDSTransport):
+    def __init__(self, archive, provider, transport=None):
+        """
+        Wraps a transport and archives the body of every successful page
+        :param MDSArchive archive: The archive to write to
+        :param str provider: The provider name the pages are archived under
+        :param MDSTransport transport: The transport that makes the actual requests, MDSRequestsTransport by default
+        """
+        self.archive = archive
+        self.provider = provider
+        self.transport = transport or MDSTransport.get_transport()
+        # Each thread follows its own chain of pages
+        self._state = threading.local()
+
+    def get(self, url, params=None, **kwargs):
+        response = self.transport.get(url, params=params, **kwargs)
+        request_key = MDSTransport.get_request_key(url, params)
+
+        # A request with parameters, even none like the vehicles of 0.4.0, starts a new window,
+        # next links (params=None) continue it
+        if params is not None or getattr(self._state, "window", None) is None:
+            self._state.window = request_key
+            self._state.page = 0
+        else:
+            self._state.page += 1
+
+        if response.status_code == 200:
+            self.archive.append(
+                provider=self.provider,
+                window=self._state.window,
+                page=self._state.page,
+                request_key=request_key,
+                status_code=response.status_code,
+                content=response.content,
+                content_type=response.headers.get("Content-Type"),
+            )
+        else:
+            # Retries of this page must not advance the page number
+            self._state.page -= 1
+        return response
+
+    def post(self, url, data=None, **kwargs):
+        # Token requests are not archived, they carry credentials
+        return self.transport.post(url, data=data, **kwargs)
+
+
+class MDSReplayTransport(MDSTransport):
+    def __init__(self, archive, provider, transport=None):
+        """
+        Serves the archived pages of a provider, the index is loaded once
+        :param MDSArchive archive: The archive to read from
+        :param str provider: The provider name
+        :param MDSTransport transport: (Optional) The transport of the token requests (OAuth), which are not archived
+        """
+        self.archive = archive
+        self.provider = provider
+        self.transport = transport
+        self.index = archive.get_index(provider)
+
+    def get(self, url, params=None, **kwargs):
+        entry = self.index.get(MDSTransport.get_request_key(url, params))
+        if entry is None:
+            logger.debug("MDSReplayTransport::get() Not archived: %s", url)
+            return MDSTransportResponse(404, b"Page not found in the archive")
+
+        segment, offset, length, status_code, content_type = entry
+        return MDSTransportResponse(
+            status_code,
+            self.archive.read(segment, offset, length),
+            {"Content-Type": content_type} if content_type else None,
+        )
+
+    def post(self, url, data=None, **kwargs):
+        if self.transport is None:
+            self.transport = MDSTransport.get_transport()
+        return self.transport.post(url, data=data, **kwargs)
@@ -11,10 +11,14 @@ The application requires the requests library:
 """
 
 import base64
-import requests
+
+from .MDSTransport import MDSTransport
+
 # Debug & Logging
 import logging
 
+logger = logging.getLogger(__name__)
+
 
 class MDSAuth:
     __slots__ = (
@@ -24,24 +28,29 @@ class MDSAuth:
         "headers",
         "authenticate",
         "custom_function",
+        "transport",
     )
 
-    def __init__(self, config, custom_function=None):
+    def __init__(self, config, custom_function=None, transport=None):
         """
         Initializes the class and the internal configuration
         :param dict config: The dictionary containing the configuration
         :param function custom_function: A python function to run as a custom authentication
+        :param MDSTransport transport: (Optional) The transport of the token requests, to share the client's connections
         """
         self.config = config
         self.custom_function = custom_function
         self.headers = None
+        self.transport = transport or MDSTransport.get_transport(
+            self.config.get("transport", None), **self.config.get("transport_options", {})
+        )
 
         # We gather the value from the auth_type key in the config dict, assume None.
         auth_type = self.config.get("auth_type", None)
 
         # If provided
         if auth_type:
-            logging.debug(f"MDSAuth::__init__() Authentication method: {auth_type}")
+            logger.debug("MDSAuth::__init__() Authentication method: %s", auth_type)
             # assign to self.authenticate from a key > value array,
             # where the value is a function. The selection is based
             # on the lower case of auth_type
@@ -67,7 +76,7 @@ class MDSAuth:
         It raises an exception if it fails to gather a token.
         :return dict:
         """
-        logging.debug("MDSAuth::mds_oauth() Running OAuth authentication")
+        logger.debug("MDSAuth::mds_oauth() Running OAuth authentication")
         auth_data = self.config.get("auth_data", {})
         token_url = self.config.get("token_url", None)
         request_settings = self.config.get("request", None)
@@ -81,9 +90,9 @@ class MDSAuth:
             except KeyError:
                 request_headers = {}
 
-        logging.debug("MDSAuth::mds_oauth() Making OAuth HTTP Request...")
+        logger.debug("MDSAuth::mds_oauth() Making OAuth HTTP Request...")
         if token_url:
-            response = requests.post(token_url, data=auth_data, headers=request_headers)
+            response = self.transport.post(token_url, data=auth_data, headers=request_headers)
         else:
             raise Exception(
                 "MDSAuth::mds_oauth() No token_url defined in the settings."
@@ -99,7 +108,7 @@ class MDSAuth:
             )
 
         if token:
-            logging.debug("MDSAuth::mds_oauth() Received token: %s[...]" % (token[:6]))
+            logger.debug("MDSAuth::mds_oauth() Received token: [REDACTED]")
             self.headers = {"Authorization": f"Bearer {token}"}
 
             return self.headers
@@ -111,7 +120,7 @@ class MDSAuth:
         Generates headers for token-bearer authentication. Raises an exception if it fails.
         :return dict:
         """
-        logging.debug("MDSAuth::mds_auth_token() Running Token authentication")
+        logger.debug("MDSAuth::mds_auth_token() Running Token authentication")
         self.headers = {"Authorization": f'Bearer {self.config["token"]}'}
         return self.headers
 
@@ -120,7 +129,7 @@ class MDSAuth:
         It generates a basic auth HTTP header, or raises an exception if it fails.
         :return dict:
         """
-        logging.debug("MDSAuth::mds_oauth() Running HTTP Basic authentication")
+        logger.debug("MDSAuth::mds_http_basic() Running HTTP Basic authentication")
         auth_data = self.config.get("auth_data", None)
         if auth_data:
             username = auth_data.get("username", None)
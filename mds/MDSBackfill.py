@@ -0,0 +1,466 @@
+"""
+Class: MDSBackfill
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to pull the trips of one or more
+providers over a long date range. The range is planned into windows in the
+form each MDS version expects (hours for 0.4.0, ranges of a configurable size
+for 0.2.0 and 0.3.0), the windows are pulled in parallel by threads or
+processes and written to a sink. Every completed window is recorded in a
+checkpoint file, so an interrupted backfill picks up where it stopped:
+
+    backfill = MDSBackfill(
+        providers={"lime": lime_config, "bird": bird_config},
+        sink=MDSFileSink("/data/trips"),
+        checkpoint="/data/backfill.checkpoint",
+        workers=8,
+    )
+    summary = backfill.run(start_time=1577836800, end_time=1609459200)
+
+The same is available from the command line:
+
+    $ mds-backfill --config providers.json --start 2020-01-01 --end 2021-01-01 \\
+        --time-zone US/Central --sink /data/trips --checkpoint /data/backfill.checkpoint --workers 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from .MDSClient import MDSClient
+from .MDSException import MDSException
+from .MDSSink import MDSFileSink
+from .MDSTimeZone import MDSTimeZone
+from .MDSVersionProbe import MDSVersionProbe
+from .MDSWindowPlanner import MDSWindowPlanner
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The warm clients of the current worker thread (or process): {provider: MDSClient}
+_worker = threading.local()
+
+
+def _pull_window(provider, config, start_time, end_time, sink, deadline=None, attempts=2, clients=None):
+    """
+    Pulls one window into the sink with the worker's client of the provider
+    :param str provider: The provider name
+    :param dict config: The MDSClient configuration of the provider
+    :param int start_time: The start of the window in unix time
+    :param int end_time: The end of the window in unix time
+    :param MDSSink sink: Where the trips are written
+    :param float deadline: (Optional) The maximum time in seconds allowed for the window
+    :param int attempts: The number of times the window is tried, each retry with a new client
+    :param dict clients: (Optional) The warm clients by provider, those of the worker thread by default
+    :return int: The number of trips written
+    """
+    if clients is None:
+        clients = getattr(_worker, "clients", None)
+        if clients is None:
+            clients = _worker.clients = {}
+
+    for attempt in range(1, attempts + 1):
+        # Clients are reused across windows, authentication included
+        client = clients.get(provider)
+        if client is None:
+            client = clients[provider] = MDSClient(config=config)
+        try:
+            return sink.write_window(
+                provider, start_time, end_time,
+                client.iter_trips(start_time=start_time, end_time=end_time, deadline=deadline),
+            )
+        except MDSException as e:
+            # The token may have expired, the next attempt authenticates again
+            clients.pop(provider, None)
+            if attempt == attempts:
+                raise
+            logger.debug("MDSBackfill::_pull_window() Retrying %s %s-%s: %s", provider, start_time, end_time, e)
+
+
+class MDSBackfillCheckpoint:
+    def __init__(self, path=None):
+        """
+        Records the completed windows of a backfill in an append-only JSON lines file
+        :param str path: The path of the checkpoint file, created if missing, None to keep them in memory
+        """
+        self.path = path
+        self.completed = {}
+        self._file = None
+        if path is None:
+            return
+        if os.path.exists(path):
+            with open(path) as checkpoint:
+                for line in checkpoint:
+                    # A line cut short by a crash is ignored
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.completed[self.get_key(record["provider"], record["start_time"], record["end_time"])] = record
+        self._file = open(path, "a")
+
+    @staticmethod
+    def get_key(provider, start_time, end_time):
+        return provider, int(start_time), int(end_time)
+
+    def is_completed(self, provider, start_time, end_time):
+        """
+        Returns True if the window was completed by this or a previous run
+        :return bool:
+        """
+        return self.get_key(provider, start_time, end_time) in self.completed
+
+    def complete(self, provider, start_time, end_time, trips):
+        """
+        Records a completed window, the record reaches the disk before returning
+        :param str provider: The provider name
+        :param int start_time: The start of the window in unix time
+        :param int end_time: The end of the window in unix time
+        :param int trips: The number of trips written
+        """
+        record = {
+            "provider": provider,
+            "start_time": int(start_time),
+            "end_time": int(end_time),
+            "trips": trips,
+            "completed_at": int(time.time()),
+        }
+        if self._file is not None:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self.completed[self.get_key(provider, start_time, end_time)] = record
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class MDSBackfill:
+    executors = ("thread", "process")
+
+    def __init__(
+        self,
+        providers,
+        sink,
+        checkpoint=None,
+        workers=4,
+        executor="thread",
+        window_size=3600,
+        deadline=None,
+        attempts=2,
+        queue=None,
+        planner=None,
+    ):
+        """
+        Initializes the backfill
+        :param dict providers: The MDSClient configurations by provider name
+        :param MDSSink sink: Where the trips are written
+        :param str checkpoint: (Optional) The path of the checkpoint file, required to resume
+        :param int workers: The number of windows pulled at the same time
+        :param str executor: "thread" or "process"
+        :param int window_size: The size in seconds of the 0.2.0 and 0.3.0 windows (0.4.0 is hourly)
+        :param float deadline: (Optional) The maximum time in seconds allowed for each window
+        :param int attempts: The number of times a window is tried before it is reported as failed
+        :param MDSWindowQueue queue: (Optional) A queue shared with other pulls, whose workers pull the windows
+            instead of the backfill's own pool
+        :param MDSWindowPlanner planner: (Optional) Sizes the 0.2.0 and 0.3.0 windows after the trip densities
+            it learned, and learns from the windows completed
+        """
+        if executor not in self.executors:
+            raise MDSException(f"MDSBackfill::__init__() Unsupported executor: '{executor}'")
+        self.providers = providers
+        self.sink = sink
+        self.checkpoint = checkpoint
+        self.workers = workers
+        self.executor = executor
+        self.window_size = window_size
+        self.deadline = deadline
+        self.attempts = attempts
+        self.queue = queue
+        self.planner = planner
+
+    @staticmethod
+    def plan_windows(version, start_time, end_time, window_size=3600):
+        """
+        Splits a range into the windows of an MDS version
+        :param str version: The MDS version of the provider
+        :param int start_time: The start of the range in unix time
+        :param int end_time: The end of the range in unix time
+        :param int window_size: The size in seconds of the 0.2.0 and 0.3.0 windows
+        :return list: A list of (start_time, end_time) tuples
+        """
+        start_time, end_time = int(start_time), int(end_time)
+        if version not in ("0.2.0", "0.3.0"):
+            # 0.4.0 serves whole hours only, the range is extended to hour boundaries. Any other
+            # version (e.g. "auto" not resolved, see get_version) is planned in hours too, every version serves them
+            first = start_time - start_time % 3600
+            last = end_time if end_time % 3600 == 0 else end_time - end_time % 3600 + 3600
+            return [(hour, hour + 3600) for hour in range(first, last, 3600)]
+        return [
+            (window_start, min(window_start + window_size, end_time))
+            for window_start in range(start_time, end_time, window_size)
+        ]
+
+    @staticmethod
+    def get_version(config):
+        """
+        Returns the MDS version of a provider, the one found by the client when it is "auto"
+        :param dict config: The MDSClient configuration of the provider
+        :return str:
+        """
+        version = config.get("version", "0.2.0")
+        if version != "auto":
+            return version
+        # The version cached by a previous client, or the one a new client finds
+        cached_version = MDSVersionProbe(
+            cache_path=config.get("version_cache", None), ttl=config.get("version_cache_ttl", 86400),
+        ).get_cached(config.get("provider", None) or config.get("mds_api_url", None))
+        return cached_version or MDSClient(config=config).version
+
+    def _plan_adaptive(self, provider, start_time, end_time, completed):
+        """
+        Plans the windows of a provider with the planner, around the windows already completed
+        :param str provider: The provider name
+        :param int start_time: The start of the range in unix time
+        :param int end_time: The end of the range in unix time
+        :param dict completed: The completed windows by (provider, start_time, end_time)
+        :return list: A list of (start_time, end_time) tuples, the completed windows included
+        """
+        start_time, end_time = int(start_time), int(end_time)
+        # Densities change between runs, so the windows of a previous run are kept and the gaps planned
+        done = sorted(
+            (window_start, window_end) for window_provider, window_start, window_end in completed
+            if window_provider == provider and window_start < end_time and window_end > start_time
+        )
+        windows = []
+        position = start_time
+        for window_start, window_end in done:
+            if window_start > position:
+                windows.extend(self.planner.plan_windows(provider, position, window_start))
+            windows.append((window_start, window_end))
+            position = max(position, window_end)
+        if position < end_time:
+            windows.extend(self.planner.plan_windows(provider, position, end_time))
+        return windows
+
+    def plan(self, start_time, end_time, completed=None):
+        """
+        Returns the windows of every provider, newest first for each provider
+        :param int start_time: The start of the range in unix time
+        :param int end_time: The end of the range in unix time
+        :param dict completed: (Optional) The completed windows of the checkpoint, which the windows
+            of the planner are planned around
+        :return list: A list of (provider, start_time, end_time) tuples, providers interleaved
+        """
+        windows = {}
+        for provider, config in self.providers.items():
+            version = self.get_version(config)
+            if self.planner is None or version == "0.4.0":
+                provider_windows = self.plan_windows(version, start_time, end_time, self.window_size)
+            else:
+                provider_windows = self._plan_adaptive(provider, start_time, end_time, completed or {})
+            windows[provider] = provider_windows[::-1]
+        # Interleaved, so every provider progresses at the same pace
+        plan = []
+        for position in range(max(map(len, windows.values()), default=0)):
+            for provider, provider_windows in windows.items():
+                if position < len(provider_windows):
+                    plan.append((provider, *provider_windows[position]))
+        return plan
+
+    def _submit(self, executor, provider, start_time, end_time):
+        """
+        Schedules the pull of a window
+        :param Executor executor: The backfill's pool, or None to use the shared queue
+        :return Future: Resolves to the number of trips written
+        """
+        if executor is None:
+            return self.queue.put(
+                provider, self.providers[provider], start_time, end_time, self.sink,
+                priority=self.queue.BACKFILL, deadline=self.deadline, attempts=self.attempts,
+            )
+        return executor.submit(
+            _pull_window, provider, self.providers[provider], start_time, end_time,
+            self.sink, self.deadline, self.attempts,
+        )
+
+    def run(self, start_time, end_time):
+        """
+        Pulls every window of the range that is not completed yet
+        :param int start_time: The start of the range in unix time
+        :param int end_time: The end of the range in unix time
+        :return dict: A summary with the number of windows planned, skipped, completed, failed and trips
+        """
+        checkpoint = MDSBackfillCheckpoint(self.checkpoint) if self.checkpoint else None
+        plan = self.plan(start_time, end_time, completed=checkpoint.completed if checkpoint else None)
+        pending = [
+            window for window in plan
+            if checkpoint is None or not checkpoint.is_completed(*window)
+        ]
+        summary = {
+            "windows": len(plan),
+            "skipped": len(plan) - len(pending),
+            "completed": 0,
+            "failed": [],
+            "trips": 0,
+        }
+        logger.info(
+            "MDSBackfill::run() %s windows planned, %s already completed", summary["windows"], summary["skipped"]
+        )
+
+        # Without a shared queue, the backfill has its own pool
+        executor = None
+        if self.queue is None:
+            executor_class = ThreadPoolExecutor if self.executor == "thread" else ProcessPoolExecutor
+            executor = executor_class(max_workers=self.workers)
+        futures = {}
+        try:
+            futures = {
+                self._submit(executor, provider, window_start, window_end): (provider, window_start, window_end)
+                for provider, window_start, window_end in pending
+            }
+            # Only this thread writes the checkpoint
+            for future in as_completed(futures):
+                provider, window_start, window_end = futures[future]
+                try:
+                    trips = future.result()
+                except Exception as e:
+                    logger.error(
+                        "MDSBackfill::run() Failed %s %s-%s: %s", provider, window_start, window_end, e
+                    )
+                    summary["failed"].append(
+                        {"provider": provider, "start_time": window_start, "end_time": window_end, "error": str(e)}
+                    )
+                    continue
+                if checkpoint:
+                    checkpoint.complete(provider, window_start, window_end, trips)
+                if self.planner is not None:
+                    self.planner.observe(provider, window_start, window_end, trips)
+                summary["completed"] += 1
+                summary["trips"] += trips
+                logger.info(
+                    "MDSBackfill::run() Completed %s %s-%s: %s trips (%s/%s)",
+                    provider, window_start, window_end, trips, summary["completed"], len(pending),
+                )
+        finally:
+            # The windows not started yet are dropped (shutdown(cancel_futures=True) needs Python 3.9)
+            for future in futures:
+                future.cancel()
+            if executor:
+                executor.shutdown()
+            if checkpoint:
+                checkpoint.close()
+            if self.planner is not None:
+                self.planner.save()
+
+        return summary
+
+
+def load_providers(path, names=None):
+    """
+    Loads the provider configurations of a JSON file, either {name: config}
+    or a list of configurations with a "provider" key
+    :param str path: The path of the JSON file
+    :param list names: (Optional) The providers to keep, all of them by default
+    :return dict: The configurations by provider name
+    """
+    with open(path) as config_file:
+        configs = json.load(config_file)
+    if isinstance(configs, list):
+        configs = {config["provider"]: config for config in configs}
+    else:
+        configs = {name: {"provider": name, **config} for name, config in configs.items()}
+
+    if names:
+        missing = set(names) - set(configs)
+        if missing:
+            raise MDSException(f"load_providers() Providers not found in {path}: {sorted(missing)}")
+        configs = {name: configs[name] for name in names}
+    return configs
+
+
+def parse_time(value, time_zone="UTC"):
+    """
+    Parses a date ("2020-01-31") or an hour ("2020-01-31T13") in a time zone into unix time
+    :param str value: The date or hour
+    :param str time_zone: The time zone of the date (e.g., "US/Central")
+    :return int:
+    """
+    for date_format in ("%Y-%m-%dT%H", "%Y-%m-%d"):
+        try:
+            date_time = datetime.strptime(value, date_format)
+            break
+        except ValueError:
+            continue
+    else:
+        raise argparse.ArgumentTypeError(f"Invalid date, expected YYYY-MM-DD or YYYY-MM-DDTHH: '{value}'")
+    return int(MDSTimeZone(date_time_now=date_time, time_zone=time_zone, offset=0).get_time_end(unix=True))
+
+
+def main(argv=None):
+    """
+    The mds-backfill command
+    :param list argv: (Optional) The command line arguments, sys.argv by default
+    :return int: The exit code, 1 if any window failed
+    """
+    parser = argparse.ArgumentParser(
+        prog="mds-backfill",
+        description="Pulls the trips of MDS providers over a date range, resumable through a checkpoint file.",
+    )
+    parser.add_argument("--config", required=True, help="JSON file with the provider configurations")
+    parser.add_argument("--provider", action="append", help="A provider to backfill (repeatable), all by default")
+    parser.add_argument("--start", required=True, help="Start date, YYYY-MM-DD or YYYY-MM-DDTHH")
+    parser.add_argument("--end", required=True, help="End date (excluded), YYYY-MM-DD or YYYY-MM-DDTHH")
+    parser.add_argument("--time-zone", default="UTC", help="Time zone of the dates, e.g., US/Central")
+    parser.add_argument("--window-hours", type=float, default=1, help="Window size for 0.2.0 and 0.3.0")
+    parser.add_argument(
+        "--densities", help="JSON file of the learned trip densities, sizes the 0.2.0 and 0.3.0 windows after them"
+    )
+    parser.add_argument("--target-trips", type=int, default=5000, help="Trips per window with --densities")
+    parser.add_argument("--workers", type=int, default=4, help="Windows pulled at the same time")
+    parser.add_argument("--executor", choices=MDSBackfill.executors, default="thread")
+    parser.add_argument("--sink", required=True, help="Directory where the trips are written")
+    parser.add_argument("--format", choices=MDSFileSink.formats, default="json", help="Format of the window files")
+    parser.add_argument("--checkpoint", help="Checkpoint file, reusing it resumes the backfill")
+    parser.add_argument("--deadline", type=float, help="Maximum seconds per window")
+    parser.add_argument("--attempts", type=int, default=2, help="Tries per window before it is reported as failed")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Log every window")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    backfill = MDSBackfill(
+        providers=load_providers(args.config, args.provider),
+        sink=MDSFileSink(args.sink, file_format=args.format),
+        checkpoint=args.checkpoint,
+        workers=args.workers,
+        executor=args.executor,
+        window_size=int(args.window_hours * 3600),
+        deadline=args.deadline,
+        attempts=args.attempts,
+        planner=MDSWindowPlanner(
+            args.densities, target_trips=args.target_trips, default_window=int(args.window_hours * 3600),
+        ) if args.densities else None,
+    )
+    summary = backfill.run(
+        start_time=parse_time(args.start, args.time_zone),
+        end_time=parse_time(args.end, args.time_zone),
+    )
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+Class: MDSChangeTracker
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to re-poll recent windows, which
+providers keep filling with late trips, and hand downstream only the trips
+that changed. For each window it stores the validators of every page (ETag,
+Last-Modified and a hash of the page content) and a hash of every trip by
+trip_id, in an SQLite database:
+
+    tracker = MDSChangeTracker("/data/changes.sqlite")
+    for change, trip in tracker.iter_changes(mds_client, "lime", start_time, end_time):
+        if change == "deleted":
+            delete(trip["trip_id"])
+        else:
+            upsert(trip)    # change is "inserted" or "updated"
+
+Pages are requested with If-None-Match and If-Modified-Since, and providers
+that support them answer 304 without a body for the pages that did not
+change. Other pages are downloaded: a page with the same content hash as
+last time is skipped as a whole, otherwise its trips are compared one by one.
+The trips of a window that are not served anymore are reported as deleted
+once the whole window was pulled; a pull that fails reports no deletion and
+stores nothing, so the next one compares against the same state.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def get_content_hash(content):
+    """
+    Returns a hash of JSON content that does not depend on the order of the keys
+    :param content: A trip, or the trips of a page
+    :return str:
+    """
+    return hashlib.blake2b(
+        json.dumps(content, sort_keys=True, separators=(",", ":")).encode("utf-8"), digest_size=16
+    ).hexdigest()
+
+
+class MDSWindowChanges:
+    def __init__(self, pages, trips):
+        """
+        The state of a window while it is pulled again, passed to the client as `conditional`
+        :param dict pages: The pages of the last pull: {page_key: {"etag", "last_modified", "next_link",
+            "hash", "trip_ids"}}
+        :param dict trips: The trip hashes of the last pull: {trip_id: hash}
+        """
+        self.pages = pages
+        self.trips = trips
+        # The state of this pull
+        self.new_pages = {}
+        self.new_trips = {}
+        # The changes of the last page: a list of (change, trip)
+        self.changes = []
+        self.summary = {"pages": 0, "not_modified": 0, "unchanged": 0, "trips": 0, "inserted": 0, "updated": 0}
+
+    def get_validators(self, page_key):
+        """
+        Returns the validators of a page as last downloaded
+        :param str page_key: The key of the request, see MDSTransport.get_request_key
+        :return dict: The "etag", "last_modified" and "next_link" of the page, or None
+        """
+        return self.pages.get(page_key)
+
+    def on_page(self, page_key, data, records, next_link):
+        """
+        Compares a page with its last pull, the changes are kept in self.changes
+        :param str page_key: The key of the request, see MDSTransport.get_request_key
+        :param dict data: The response data as provided by MDSClientBase._request
+        :param list records: The trips of the page, empty if it did not change
+        :param str next_link: The link to the next page, or None
+        """
+        self.summary["pages"] += 1
+        page = self.pages.get(page_key)
+        validators = {
+            "etag": data.get("etag", None),
+            "last_modified": data.get("last_modified", None),
+            "next_link": next_link,
+        }
+
+        if data["response"] == "not_modified" and page is not None:
+            # Nothing was downloaded, the page is as last time
+            self.summary["not_modified"] += 1
+            self.new_pages[page_key] = {**page, **{key: value for key, value in validators.items() if value}}
+            self._keep(page)
+            self.changes = []
+            return
+
+        self.summary["trips"] += len(records)
+        page_hash = get_content_hash(records)
+        if page is not None and page["hash"] == page_hash:
+            # Same content without validators: the trips are not compared one by one
+            self.summary["unchanged"] += 1
+            self.new_pages[page_key] = {**page, **validators}
+            self._keep(page)
+            self.changes = []
+            return
+
+        changes = []
+        trip_ids = []
+        for trip in records:
+            trip_id = trip.get("trip_id")
+            if trip_id is None:
+                continue
+            trip_hash = get_content_hash(trip)
+            previous = self.trips.get(trip_id)
+            if previous is None:
+                if trip_id not in self.new_trips:
+                    changes.append(("inserted", trip))
+            elif previous != trip_hash:
+                changes.append(("updated", trip))
+            self.new_trips[trip_id] = trip_hash
+            trip_ids.append(trip_id)
+        for change, _ in changes:
+            self.summary[change] += 1
+        self.new_pages[page_key] = {**validators, "hash": page_hash, "trip_ids": trip_ids}
+        self.changes = changes
+
+    def _keep(self, page):
+        """
+        Carries the trips of a page that did not change into this pull
+        :param dict page: The page of the last pull
+        """
+        for trip_id in page["trip_ids"]:
+            self.new_trips[trip_id] = self.trips[trip_id]
+
+    def get_deleted(self):
+        """
+        Returns the trips of the last pull that are not served anymore, once the whole window was pulled
+        :return list: The trip ids
+        """
+        return [trip_id for trip_id in self.trips if trip_id not in self.new_trips]
+
+
+class MDSChangeTracker:
+    def __init__(self, path=":memory:"):
+        """
+        Opens (or creates) the database of the window states
+        :param str path: The path of the SQLite database, in memory by default
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS pages (
+                provider TEXT NOT NULL,
+                start_time INTEGER NOT NULL,
+                end_time INTEGER NOT NULL,
+                page_key TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                next_link TEXT,
+                hash TEXT NOT NULL,
+                trip_ids TEXT NOT NULL,
+                PRIMARY KEY (provider, start_time, end_time, page_key)
+            );
+            CREATE TABLE IF NOT EXISTS trips (
+                provider TEXT NOT NULL,
+                start_time INTEGER NOT NULL,
+                end_time INTEGER NOT NULL,
+                trip_id TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                PRIMARY KEY (provider, start_time, end_time, trip_id)
+            );
+        """)
+
+    def _load(self, window):
+        """
+        Returns the state of a window as last pulled
+        :param tuple window: (provider, start_time, end_time)
+        :return MDSWindowChanges:
+        """
+        with self._lock:
+            pages = {
+                page_key: {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "next_link": next_link,
+                    "hash": page_hash,
+                    "trip_ids": json.loads(trip_ids),
+                }
+                for page_key, etag, last_modified, next_link, page_hash, trip_ids in self._connection.execute(
+                    "SELECT page_key, etag, last_modified, next_link, hash, trip_ids FROM pages "
+                    "WHERE provider = ? AND start_time = ? AND end_time = ?",
+                    window,
+                )
+            }
+            trips = dict(self._connection.execute(
+                "SELECT trip_id, hash FROM trips WHERE provider = ? AND start_time = ? AND end_time = ?", window
+            ))
+        return MDSWindowChanges(pages, trips)
+
+    def _store(self, window, changes):
+        """
+        Replaces the state of a window with the one of its last pull
+        :param tuple window: (provider, start_time, end_time)
+        :param MDSWindowChanges changes: The state of the pull
+        """
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                where = "WHERE provider = ? AND start_time = ? AND end_time = ?"
+                connection.execute(f"DELETE FROM pages {where}", window)
+                connection.execute(f"DELETE FROM trips {where}", window)
+                connection.executemany(
+                    "INSERT INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (*window, page_key, page["etag"], page["last_modified"], page["next_link"], page["hash"],
+                         json.dumps(page["trip_ids"]))
+                        for page_key, page in changes.new_pages.items()
+                    ),
+                )
+                connection.executemany(
+                    "INSERT INTO trips VALUES (?, ?, ?, ?, ?)",
+                    ((*window, trip_id, trip_hash) for trip_id, trip_hash in changes.new_trips.items()),
+                )
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def iter_changes(self, mds_client, provider, start_time, end_time, **kwargs):
+        """
+        Pulls a window again and yields the trips that changed since its last pull
+        :param MDSClient mds_client: The client of the provider
+        :param str provider: The provider name
+        :param int start_time: The start of the window in unix time
+        :param int end_time: The end of the window in unix time
+        :param dict kwargs: Any other parameter of MDSClient.iter_trips (e.g., deadline)
+        :return generator: Yields (change, trip) tuples, where change is "inserted", "updated" or "deleted",
+            and the trip of a deletion only has its "trip_id"
+        """
+        window = (provider, int(start_time), int(end_time))
+        changes = self._load(window)
+        for _ in mds_client.iter_trips(start_time=start_time, end_time=end_time, conditional=changes, **kwargs):
+            yield from changes.changes
+
+        deleted = changes.get_deleted()
+        for trip_id in deleted:
+            yield "deleted", {"trip_id": trip_id}
+        self._store(window, changes)
+        logger.info(
+            "MDSChangeTracker::iter_changes() %s %s-%s: %s pages, %s not modified, %s unchanged, "
+            "%s inserted, %s updated, %s deleted",
+            provider, window[1], window[2], changes.summary["pages"], changes.summary["not_modified"],
+            changes.summary["unchanged"], changes.summary["inserted"], changes.summary["updated"], len(deleted),
+        )
+
+    def get_changes(self, mds_client, provider, start_time, end_time, **kwargs):
+        """
+        Pulls a window again and returns the trips that changed since its last pull
+        :return dict: {"inserted": [trip], "updated": [trip], "deleted": [trip_id]}
+        """
+        result = {"inserted": [], "updated": [], "deleted": []}
+        for change, trip in self.iter_changes(mds_client, provider, start_time, end_time, **kwargs):
+            result[change].append(trip["trip_id"] if change == "deleted" else trip)
+        return result
+
+    def close(self):
+        self._connection.close()
@@ -10,12 +10,18 @@ and the actual implementation is unique per MDS client class.
 The application requires the requests library:
     https://pypi.org/project/requests/
 """
+import time
+
 from .clients import *
 from .MDSAuth import MDSAuth
+from .MDSException import MDSException
+from .MDSLogging import MDSLogging
+from .MDSVersionProbe import MDSVersionProbe
 
 # Debug & Logging
 import logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+logger = logging.getLogger(__name__)
 
 
 class MDSClient:
@@ -51,6 +57,19 @@ class MDSClient:
         self.provider = self.config.get("provider", None)
         # Tries to find version in the config, or assumes 0.2.0
         self.version = self.config.get("version", "0.2.0")
+        # "auto" asks the provider once authenticated, unless a recent answer is cached
+        version_probe = None
+        if self.version == "auto":
+            version_probe = MDSVersionProbe(
+                cache_path=self.config.get("version_cache", None),
+                ttl=self.config.get("version_cache_ttl", 86400),
+            )
+            cached_version = version_probe.get_cached(self._get_provider_key())
+            if cached_version is not None:
+                version_probe = None
+            # The newest version is assumed until the provider answers
+            self.version = cached_version or MDSVersionProbe.versions[0]
+            self.config["version"] = self.version
         # Try to find the default_class (an MDS class override) or assume None
         self.custom_client = self.config.get("custom_client", None)
         # Assume the headers to be empty
@@ -62,19 +81,23 @@ class MDSClient:
         # Try to find a custom authentication function, assume None
         self.custom_authentication = custom_authentication
 
-        # Initialize authentication client
-        self.auth_client = MDSAuth(
-            config=self.config, custom_function=self.custom_authentication
-        )
-
         # Initialize MDS Client
         self.mds_client = self.load_mds_client(
             version=self.version, custom=self.custom_client,
         )(config=self.config)
 
+        # Initialize authentication client, it shares the connections of the MDS client
+        self.auth_client = MDSAuth(
+            config=self.config, custom_function=self.custom_authentication,
+            transport=getattr(self.mds_client, "transport", None),
+        )
+
         self._load_custom_headers()
         self._authenticate()
 
+        if version_probe is not None:
+            self._detect_version(version_probe)
+
     @staticmethod
     def load_mds_client(version, custom=None):
         """
@@ -87,49 +110,226 @@ class MDSClient:
         if custom is not None:
             return custom
         # Proceed with normal version check & load class
-        else:
-            return {
-                "0.2.0": MDSClient020,
-                "0.3.0": MDSClient030,
-                "0.4.0": MDSClient040,
-            }.get(version, custom)
+        clients = {
+            "0.2.0": MDSClient020,
+            "0.3.0": MDSClient030,
+            "0.4.0": MDSClient040,
+        }
+        if version not in clients:
+            raise MDSException(
+                f"MDSClient::load_mds_client() Unsupported version: '{version}', "
+                f"expected one of: {', '.join(clients)}, or 'auto'"
+            )
+        return clients[version]
+
+    def _get_provider_key(self):
+        """
+        Returns the key of the provider in the version cache: its name, or its URL
+        :return str:
+        """
+        return self.provider or self.config.get("mds_api_url", None)
+
+    def _detect_version(self, version_probe):
+        """
+        Asks the provider for its version, and replaces the client if it serves another one
+        :param MDSVersionProbe version_probe: The probe, with the cache of the versions found
+        """
+        if not self.authenticated:
+            logger.warning("MDSClient::_detect_version() Not authenticated, assuming version %s", self.version)
+            return
+
+        # A client of each version, sharing the connections of the current one
+        transport = getattr(self.mds_client, "transport", None)
+        clients = {
+            version: self.load_mds_client(version=version)(config={**self.config, "transport": transport})
+            for version in MDSVersionProbe.versions
+        }
+        version = version_probe.get_version(
+            self._get_provider_key(), clients, self.mds_client.get_headers(),
+            timeout=getattr(self.mds_client, "timeout", None),
+        )
+        if version == self.version:
+            return
+
+        logger.debug("MDSClient::_detect_version() Switching from version %s to %s", self.version, version)
+        self.version = version
+        self.config["version"] = version
+        if self.custom_client is None:
+            self.mds_client = clients[version]
+            self._load_custom_headers()
+            self.mds_client.render_settings(headers=self.auth_headers)
+        self.mds_client.set_header("Accept", f"application/vnd.mds.provider+json;version={version[:3]}")
+
+    @staticmethod
+    def _get_options(**options):
+        """
+        Returns the options that are set, so a custom_client that does not take them is called as before
+        :param dict options: The options, None or False when not set
+        :return dict:
+        """
+        return {key: value for key, value in options.items() if value is not None and value is not False}
 
     def _load_custom_headers(self):
-        logging.debug(f"MDSClient::get_trips() Loading custom headers...")
+        logger.debug("MDSClient::_load_custom_headers() Loading custom headers...")
         custom_headers = self.config.get("headers", {})
         for key, value in custom_headers.items():
             self.mds_client.set_header(key=key, value=value)
 
-    def get_trips(self, start_time, end_time):
+    def add_observer(self, observer):
+        """
+        Registers an instance of MDSObserver to be notified of the client's events
+        :param MDSObserver observer: The observer to be registered
+        """
+        self.mds_client.add_observer(observer)
+
+    def get_trips(self, start_time, end_time, deadline=None, profile=False, fields=None, trip_filter=None):
         """
         Returns the trips for the current client
         :param start_time:
         :param end_time:
+        :param float deadline: (Optional) The maximum time in seconds allowed for the whole pull,
+            raises MDSDeadlineException with the partial result and a resume cursor when it expires.
+        :param bool profile: (Optional) If True, the result includes a "profile" report of the pull.
+        :param list fields: (Optional) The keys of the trips to keep, e.g. ["trip_id", "end_time"],
+            the others (such as the route) are dropped as each page is decoded.
+        :param MDSTripFilter trip_filter: (Optional) Drops the trips the provider should have filtered out,
+            the result then includes their number as "filtered".
         :return:
         """
-        logging.debug(f"MDSClient::get_trips() Getting trips for start_time: {start_time}, end_time: {end_time} ")
+        logger.debug(
+            "MDSClient::get_trips() Getting trips for start_time: %s, end_time: %s", start_time, end_time
+        )
         return self.mds_client.get_trips(
-            start_time=start_time, end_time=end_time
+            start_time=start_time, end_time=end_time,
+            **self._get_options(deadline=deadline, profile=profile, fields=fields, trip_filter=trip_filter)
         )
 
+    def iter_trips(
+        self, start_time, end_time, deadline=None, profile=False, fields=None, trip_filter=None, conditional=None
+    ):
+        """
+        Yields the trips of each page as soon as the page is downloaded
+        :param start_time:
+        :param end_time:
+        :param float deadline: (Optional) The maximum time in seconds allowed for the whole pull
+        :param profile: (Optional) True to log a profile of the pull, or an MDSProfiler instance
+        :param list fields: (Optional) The keys of the trips to keep
+        :param MDSTripFilter trip_filter: (Optional) Drops the trips the provider should have filtered out
+        :param conditional: (Optional) Makes conditional requests for the pages downloaded before,
+            see MDSChangeTracker
+        :return generator: Yields a list of trips per page, empty for the pages that did not change
+        """
+        return self.mds_client.iter_trips(
+            start_time=start_time, end_time=end_time,
+            **self._get_options(
+                deadline=deadline, profile=profile, fields=fields, trip_filter=trip_filter, conditional=conditional
+            )
+        )
+
+    def get_status_changes(self, start_time, end_time, deadline=None, profile=False):
+        """
+        Returns the status changes for the current client
+        :param int start_time: The start time in unix format, ignored by 0.4.0 (hourly)
+        :param int end_time: The end time in unix format
+        :param float deadline: (Optional) The maximum time in seconds allowed for the whole pull
+        :param bool profile: (Optional) If True, the result includes a "profile" report of the pull.
+        :return dict:
+        """
+        return self.mds_client.get_status_changes(
+            start_time=start_time, end_time=end_time, **self._get_options(deadline=deadline, profile=profile)
+        )
+
+    def get_endpoint(self, endpoint, start_time=None, end_time=None, deadline=None, profile=False, **kwargs):
+        """
+        Returns every record of an endpoint: "trips" and "status_changes", plus "events",
+        "vehicles" and "telemetry" in 0.4.0
+        :param str endpoint: The endpoint name
+        :param int start_time: The start time in unix format, ignored by hourly endpoints
+        :param int end_time: The end time in unix format
+        :param float deadline: (Optional) The maximum time in seconds allowed for the whole pull
+        :param bool profile: (Optional) If True, the result includes a "profile" report of the pull.
+        :param dict kwargs: Any additional parameters to be taken as HTTP param
+        :return dict:
+        """
+        return self.mds_client.get_endpoint(
+            endpoint, start_time=start_time, end_time=end_time, deadline=deadline, profile=profile, **kwargs
+        )
+
+    def iter_endpoint(self, endpoint, start_time=None, end_time=None, deadline=None, profile=False, **kwargs):
+        """
+        Yields the records of each page of an endpoint as soon as the page is downloaded
+        :param str endpoint: The endpoint name
+        :param int start_time: The start time in unix format, ignored by hourly endpoints
+        :param int end_time: The end time in unix format
+        :param float deadline: (Optional) The maximum time in seconds allowed for the whole pull
+        :param profile: (Optional) True to log a profile of the pull, or an MDSProfiler instance
+        :param dict kwargs: Any additional parameters to be taken as HTTP param
+        :return generator: Yields a list of records per page
+        """
+        return self.mds_client.iter_endpoint(
+            endpoint, start_time=start_time, end_time=end_time, deadline=deadline, profile=profile, **kwargs
+        )
+
+    def get_endpoints(self, endpoints, start_time=None, end_time=None, deadline=None, **kwargs):
+        """
+        Returns every record of several endpoints for the same window, pulled concurrently
+        with the client's authentication, connections and request pacing
+        :param list endpoints: The endpoint names (e.g., ["trips", "status_changes"])
+        :param int start_time: The start time in unix format, ignored by hourly endpoints
+        :param int end_time: The end time in unix format
+        :param float deadline: (Optional) The maximum time in seconds allowed for each pull
+        :param dict kwargs: Any additional parameters to be taken as HTTP param
+        :return dict: The result of each endpoint, by endpoint name
+        """
+        return self.mds_client.get_endpoints(
+            endpoints, start_time=start_time, end_time=end_time, deadline=deadline, **kwargs
+        )
+
+    def resume(self, cursor, result=None, deadline=None, trip_filter=None):
+        """
+        Resumes a pull that failed with an MDSPagingException
+        :param dict cursor: The cursor as provided by MDSPagingException.cursor
+        :param dict result: (Optional) The partial result (MDSPagingException.result) to be extended
+        :param float deadline: (Optional) The maximum time in seconds allowed for the rest of the pull
+        :param MDSTripFilter trip_filter: (Optional) The filter of the failed pull, if any
+        :return dict:
+        """
+        return self.mds_client.resume(cursor=cursor, result=result, deadline=deadline, trip_filter=trip_filter)
+
+    def get_validation(self):
+        """
+        Returns the validation report of the trips pulled so far, if "validation" is configured
+        :return dict: The report of MDSTripValidator, or None
+        """
+        validator = getattr(self.mds_client, "validator", None)
+        return None if validator is None else validator.get_report()
+
     def show_config(self):
         """
-        logging.debugs the current version & configuration of the client
+        Logs the current version & configuration of the client
         :return:
         """
-        logging.debug(f"MDSClient::show_config() Current MDS version loaded: {self.mds_client.version}")
-        logging.debug(self.mds_client.config)
+        logger.debug("MDSClient::show_config() Current MDS version loaded: %s", self.mds_client.version)
+        logger.debug("MDSClient::show_config() Configuration keys: %s", list(self.mds_client.config))
 
     def _authenticate(self):
         """
         It authenticates the client using the provided configuration
         :return:
         """
-        logging.debug("MDSClient::authenticate() Generating headers...")
+        logger.debug("MDSClient::authenticate() Generating headers...")
+        auth_start = time.perf_counter()
         self.auth_headers = self.auth_client.authenticate()
-        logging.debug("MDSClient::authenticate() Checking headers...")
+        if getattr(self.mds_client, "observers", None):
+            self.mds_client._notify(
+                "on_auth",
+                auth_type=self.config.get("auth_type", None),
+                elapsed=time.perf_counter() - auth_start,
+                success=bool(self.auth_headers),
+            )
+        logger.debug("MDSClient::authenticate() Checking headers...")
         if self.auth_headers:
-            logging.debug("MDSClient::authenticate() Authentication succeeded...")
+            logger.debug("MDSClient::authenticate() Authentication succeeded...")
             self.authenticated = True
 
             self.mds_client.set_header(
@@ -137,8 +337,11 @@ class MDSClient:
             )
             self.mds_client.render_settings(headers=self.auth_headers)
 
-            logging.debug("MDSClient::authenticate() Final headers: ")
-            logging.debug(self.mds_client.get_headers())
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "MDSClient::authenticate() Final headers: %s",
+                    MDSLogging.redact_headers(self.mds_client.get_headers())
+                )
 
         else:
-            logging.debug("MDSClient::authenticate() Authentication failed")
+            logger.debug("MDSClient::authenticate() Authentication failed")
@@ -0,0 +1,46 @@
+"""
+Class: MDSException
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The exceptions raised by the MDS client. Paging exceptions carry
+whatever was downloaded before the failure, together with a cursor that points
+at the next page to download, so a long pull can be resumed instead of
+starting over.
+"""
+
+
+class MDSException(Exception):
+    """
+    Base class for all the exceptions raised by the MDS client.
+    """
+    pass
+
+
+class MDSPagingException(MDSException):
+    """
+    Raised when a paged pull cannot be completed (e.g., max attempts reached).
+    It carries the partial result and the cursor of the first page that was
+    not downloaded, which can be handed to the client's resume method.
+    """
+
+    def __init__(self, message, result=None, cursor=None, pages=0):
+        """
+        Initializes the exception
+        :param str message: The error message
+        :param dict result: The partial result, in the same envelope returned by get_trips
+        :param dict cursor: The next page to download: {"mds_endpoint": str, "params": dict or None, "data_key": str},
+            plus "fields" when the pull keeps only some keys of the records
+        :param int pages: The number of pages downloaded before the failure
+        """
+        MDSException.__init__(self, message)
+        self.result = result
+        self.cursor = cursor
+        self.pages = pages
+
+
+class MDSDeadlineException(MDSPagingException):
+    """
+    Raised when the deadline of a paged pull expires before the pull completes.
+    """
+    pass
@@ -0,0 +1,281 @@
+"""
+Class: MDSJobStore
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to distribute window jobs between
+workers running on several processes or nodes. A job is a (provider,
+start_time, end_time) window. A worker leases a job for a limited time,
+heartbeats to extend the lease while pulling, then completes the job or
+releases it. A lease that is not extended expires and the job is leased
+again by another worker, until it runs out of attempts.
+
+Completion is recorded exactly once: complete() only succeeds for the
+current holder of the lease. A worker whose lease expired may still have
+written the window (sinks replace windows, so this is harmless), but its
+completion is refused and reported as such.
+
+MDSJobStore is the interface, MDSSQLiteJobStore stores the jobs in an SQLite
+database. SQLite locking is reliable for processes on one host or on a local
+disk; for several hosts, implement MDSJobStore over a shared database.
+"""
+
+import sqlite3
+import threading
+import time
+import uuid
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MDSJob:
+    __slots__ = (
+        "provider",
+        "start_time",
+        "end_time",
+        "token",
+        "attempts",
+        "lease_expires",
+    )
+
+    def __init__(self, provider, start_time, end_time, token, attempts, lease_expires):
+        """
+        A leased window job
+        :param str provider: The provider name
+        :param int start_time: The start of the window in unix time
+        :param int end_time: The end of the window in unix time
+        :param str token: The lease token, proves the lease is held
+        :param int attempts: The number of times the job was leased, this lease included
+        :param float lease_expires: When the lease expires in unix time
+        """
+        self.provider = provider
+        self.start_time = start_time
+        self.end_time = end_time
+        self.token = token
+        self.attempts = attempts
+        self.lease_expires = lease_expires
+
+
+class MDSJobStore:
+    def add(self, provider, start_time, end_time, priority=1):
+        """
+        Adds a job, adding a job that already exists does nothing
+        :param str provider: The provider name
+        :param int start_time: The start of the window in unix time
+        :param int end_time: The end of the window in unix time
+        :param int priority: Jobs with lower values are leased first
+        :return bool: True if the job was added
+        """
+        raise NotImplementedError
+
+    def lease(self, worker, duration):
+        """
+        Leases the next pending job, or a job whose lease expired
+        :param str worker: The name of the worker
+        :param float duration: The duration of the lease in seconds
+        :return MDSJob: The job, or None if there is nothing to do now
+        """
+        raise NotImplementedError
+
+    def heartbeat(self, job, duration):
+        """
+        Extends a lease
+        :param MDSJob job: The leased job
+        :param float duration: The new duration of the lease in seconds, from now
+        :return bool: False if the lease was lost
+        """
+        raise NotImplementedError
+
+    def release(self, job, error=None):
+        """
+        Gives a job back, to be leased again if it has attempts left
+        :param MDSJob job: The leased job
+        :param str error: (Optional) Why the job was released
+        :return bool: False if the lease was lost
+        """
+        raise NotImplementedError
+
+    def complete(self, job, trips):
+        """
+        Records the completion of a job
+        :param MDSJob job: The leased job
+        :param int trips: The number of trips written
+        :return bool: False if the lease was lost, the completion was not recorded
+        """
+        raise NotImplementedError
+
+    def get_counts(self):
+        """
+        Returns the number of jobs by state: "pending", "leased", "completed" and "failed"
+        :return dict:
+        """
+        raise NotImplementedError
+
+
+class MDSSQLiteJobStore(MDSJobStore):
+    def __init__(self, path, max_attempts=3, clock=time.time):
+        """
+        Opens (or creates) a job database
+        :param str path: The path of the SQLite database
+        :param int max_attempts: The number of leases after which a job that never completed fails
+        :param function clock: Returns the current unix time
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self._lock = threading.Lock()
+        # Transactions are explicit, BEGIN IMMEDIATE takes the write lock before reading
+        self._connection = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS jobs (
+                provider TEXT NOT NULL,
+                start_time INTEGER NOT NULL,
+                end_time INTEGER NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 1,
+                state TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                token TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                trips INTEGER,
+                completed_at REAL,
+                PRIMARY KEY (provider, start_time, end_time)
+            );
+            CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (state, priority, end_time);
+        """)
+
+    def _transaction(self, statements):
+        """
+        Runs a function in a write transaction
+        :param function statements: Takes the connection, its result is returned
+        :return:
+        """
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._connection)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+            return result
+
+    def add(self, provider, start_time, end_time, priority=1):
+        return self._transaction(lambda connection: connection.execute(
+            "INSERT OR IGNORE INTO jobs (provider, start_time, end_time, priority) VALUES (?, ?, ?, ?)",
+            (provider, int(start_time), int(end_time), priority),
+        ).rowcount == 1)
+
+    def add_many(self, jobs, priority=1):
+        """
+        Adds jobs in a single transaction
+        :param list jobs: A list of (provider, start_time, end_time) tuples
+        :param int priority: Jobs with lower values are leased first
+        :return int: The number of jobs added
+        """
+        def insert(connection):
+            added = 0
+            for provider, start_time, end_time in jobs:
+                added += connection.execute(
+                    "INSERT OR IGNORE INTO jobs (provider, start_time, end_time, priority) VALUES (?, ?, ?, ?)",
+                    (provider, int(start_time), int(end_time), priority),
+                ).rowcount
+            return added
+
+        return self._transaction(insert)
+
+    def lease(self, worker, duration):
+        def take(connection):
+            now = self.clock()
+            # Expired leases of jobs without attempts left fail
+            connection.execute(
+                "UPDATE jobs SET state = 'failed', token = NULL, error = COALESCE(error, 'Lease expired') "
+                "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            row = connection.execute(
+                "SELECT provider, start_time, end_time, attempts FROM jobs "
+                "WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?) "
+                "ORDER BY priority, end_time DESC LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            provider, start_time, end_time, attempts = row
+            if attempts and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("MDSSQLiteJobStore::lease() Retrying %s %s-%s", provider, start_time, end_time)
+            job = MDSJob(provider, start_time, end_time, uuid.uuid4().hex, attempts + 1, now + duration)
+            connection.execute(
+                "UPDATE jobs SET state = 'leased', worker = ?, token = ?, lease_expires = ?, attempts = ? "
+                "WHERE provider = ? AND start_time = ? AND end_time = ?",
+                (worker, job.token, job.lease_expires, job.attempts, provider, start_time, end_time),
+            )
+            return job
+
+        return self._transaction(take)
+
+    def _update_leased(self, job, assignments, values):
+        """
+        Updates a job only while its lease is held
+        :return bool: True if the job was updated
+        """
+        return self._transaction(lambda connection: connection.execute(
+            f"UPDATE jobs SET {assignments} "
+            "WHERE provider = ? AND start_time = ? AND end_time = ? AND state = 'leased' AND token = ?",
+            (*values, job.provider, job.start_time, job.end_time, job.token),
+        ).rowcount == 1)
+
+    def heartbeat(self, job, duration):
+        lease_expires = self.clock() + duration
+        if not self._update_leased(job, "lease_expires = ?", (lease_expires,)):
+            return False
+        job.lease_expires = lease_expires
+        return True
+
+    def release(self, job, error=None):
+        state = "pending" if job.attempts < self.max_attempts else "failed"
+        return self._update_leased(job, "state = ?, token = NULL, error = ?", (state, error))
+
+    def complete(self, job, trips):
+        return self._update_leased(
+            job,
+            "state = 'completed', token = NULL, error = NULL, trips = ?, completed_at = ?",
+            (trips, self.clock()),
+        )
+
+    def get_counts(self):
+        with self._lock:
+            rows = self._connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {"pending": 0, "leased": 0, "completed": 0, "failed": 0}
+        counts.update(rows)
+        return counts
+
+    def get_failed(self):
+        """
+        Returns the jobs that ran out of attempts
+        :return list: A list of (provider, start_time, end_time, error) tuples
+        """
+        with self._lock:
+            return self._connection.execute(
+                "SELECT provider, start_time, end_time, error FROM jobs WHERE state = 'failed' "
+                "ORDER BY provider, start_time"
+            ).fetchall()
+
+    def retry_failed(self):
+        """
+        Makes the failed jobs pending again, with their attempts reset
+        :return int: The number of jobs
+        """
+        return self._transaction(lambda connection: connection.execute(
+            "UPDATE jobs SET state = 'pending', attempts = 0 WHERE state = 'failed'"
+        ).rowcount)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
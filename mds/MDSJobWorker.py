@@ -0,0 +1,242 @@
+"""
+Class: MDSJobWorker
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to pull the window jobs of an
+MDSJobStore, so a backfill can be spread over several processes or nodes.
+Each thread of a worker leases a job, extends its lease in the background
+while pulling the window into the sink, then completes or releases it:
+
+    store = MDSSQLiteJobStore("/shared/jobs.sqlite")
+    store.add_many(MDSBackfill(providers=providers, sink=None).plan(start_time, end_time))
+
+    # On every node
+    MDSJobWorker(store, providers=providers, sink=MDSFileSink("/shared/trips")).run(threads=4)
+
+The same is available from the command line:
+
+    $ mds-jobs add --jobs /shared/jobs.sqlite --config providers.json --start 2020-01-01 --end 2021-01-01
+    $ mds-jobs work --jobs /shared/jobs.sqlite --config providers.json --sink /shared/trips --threads 4
+    $ mds-jobs status --jobs /shared/jobs.sqlite
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+
+from .MDSBackfill import MDSBackfill, _pull_window, load_providers, parse_time
+from .MDSJobStore import MDSSQLiteJobStore
+from .MDSSink import MDSFileSink
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MDSJobWorker:
+    def __init__(self, store, providers, sink, name=None, lease_duration=300, heartbeat_interval=60, deadline=None):
+        """
+        Initializes the worker
+        :param MDSJobStore store: Where the jobs are leased from
+        :param dict providers: The MDSClient configurations by provider name
+        :param MDSSink sink: Where the trips are written
+        :param str name: (Optional) The name of the worker, the host name and process id by default
+        :param float lease_duration: The duration of a lease in seconds
+        :param float heartbeat_interval: The time in seconds between lease extensions, below lease_duration
+        :param float deadline: (Optional) The maximum time in seconds allowed for each window
+        """
+        self.store = store
+        self.providers = providers
+        self.sink = sink
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_duration = lease_duration
+        self.heartbeat_interval = heartbeat_interval
+        self.deadline = deadline
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self.summary = {"completed": 0, "released": 0, "lost": 0, "trips": 0}
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self.summary[key] += value
+
+    def _heartbeat(self, job, done):
+        """
+        Extends the lease of a job until the pull is done or the lease is lost
+        :param MDSJob job: The leased job
+        :param threading.Event done: Set when the pull is done
+        """
+        while not done.wait(self.heartbeat_interval):
+            if not self.store.heartbeat(job, self.lease_duration):
+                logger.warning(
+                    "MDSJobWorker::_heartbeat() Lease lost: %s %s-%s", job.provider, job.start_time, job.end_time
+                )
+                return
+
+    def run_job(self, job, clients=None):
+        """
+        Pulls a leased job and completes or releases it
+        :param MDSJob job: The leased job
+        :param dict clients: (Optional) The warm clients of the thread by provider
+        :return bool: True if the completion was recorded
+        """
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, done), daemon=True)
+        heartbeat.start()
+        try:
+            config = self.providers[job.provider]
+            trips = _pull_window(
+                job.provider, config, job.start_time, job.end_time, self.sink,
+                deadline=self.deadline, attempts=1, clients=clients,
+            )
+        except Exception as e:
+            done.set()
+            heartbeat.join()
+            logger.error(
+                "MDSJobWorker::run_job() Failed %s %s-%s (attempt %s): %s",
+                job.provider, job.start_time, job.end_time, job.attempts, e,
+            )
+            self.store.release(job, error=str(e))
+            self._count("released")
+            return False
+
+        done.set()
+        heartbeat.join()
+        if not self.store.complete(job, trips):
+            # Another worker holds the job now, its completion is the one recorded
+            logger.warning(
+                "MDSJobWorker::run_job() Completion refused, lease lost: %s %s-%s",
+                job.provider, job.start_time, job.end_time,
+            )
+            self._count("lost")
+            return False
+
+        self._count("completed")
+        self._count("trips", trips)
+        logger.info("MDSJobWorker::run_job() Completed %s %s-%s: %s trips", job.provider, job.start_time, job.end_time, trips)
+        return True
+
+    def _work(self, wait):
+        """
+        The loop of a worker thread
+        :param float wait: The seconds to wait when there is no job, None to stop instead
+        """
+        clients = {}
+        while not self._stopped.is_set():
+            job = self.store.lease(f"{self.name}-{threading.current_thread().name}", self.lease_duration)
+            if job is None:
+                if wait is None:
+                    return
+                self._stopped.wait(wait)
+                continue
+            self.run_job(job, clients=clients)
+
+    def run(self, threads=1, wait=None):
+        """
+        Pulls jobs until there are none left, or until stop() is called
+        :param int threads: The number of jobs pulled at the same time
+        :param float wait: (Optional) If set, the seconds to wait for new jobs instead of stopping
+        :return dict: The number of jobs completed, released and lost, and the trips written
+        """
+        workers = [
+            threading.Thread(target=self._work, args=(wait,), name=f"worker{position}")
+            for position in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            self.stop()
+            for worker in workers:
+                worker.join()
+        return dict(self.summary)
+
+    def stop(self):
+        """
+        Stops the worker once the jobs being pulled are done
+        """
+        self._stopped.set()
+
+
+def main(argv=None):
+    """
+    The mds-jobs command
+    :param list argv: (Optional) The command line arguments, sys.argv by default
+    :return int: The exit code
+    """
+    parser = argparse.ArgumentParser(prog="mds-jobs", description="Distributes MDS window jobs between workers.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Plans a date range into jobs")
+    add.add_argument("--jobs", required=True, help="The SQLite job database")
+    add.add_argument("--config", required=True, help="JSON file with the provider configurations")
+    add.add_argument("--provider", action="append", help="A provider (repeatable), all by default")
+    add.add_argument("--start", required=True, help="Start date, YYYY-MM-DD or YYYY-MM-DDTHH")
+    add.add_argument("--end", required=True, help="End date (excluded), YYYY-MM-DD or YYYY-MM-DDTHH")
+    add.add_argument("--time-zone", default="UTC", help="Time zone of the dates, e.g., US/Central")
+    add.add_argument("--window-hours", type=float, default=1, help="Window size for 0.2.0 and 0.3.0")
+    add.add_argument("--priority", type=int, default=1, help="Jobs with lower values are leased first")
+
+    work = commands.add_parser("work", help="Pulls jobs until there are none left")
+    work.add_argument("--jobs", required=True, help="The SQLite job database")
+    work.add_argument("--config", required=True, help="JSON file with the provider configurations")
+    work.add_argument("--sink", required=True, help="Directory where the trips are written")
+    work.add_argument("--format", choices=MDSFileSink.formats, default="json", help="Format of the window files")
+    work.add_argument("--threads", type=int, default=1, help="Jobs pulled at the same time")
+    work.add_argument("--lease", type=float, default=300, help="Lease duration in seconds")
+    work.add_argument("--wait", type=float, help="Wait for new jobs, polling every N seconds, instead of stopping")
+    work.add_argument("--deadline", type=float, help="Maximum seconds per window")
+    work.add_argument("--max-attempts", type=int, default=3, help="Leases before a job fails")
+    work.add_argument("--verbose", "-v", action="store_true", help="Log every job")
+
+    status = commands.add_parser("status", help="Shows the number of jobs by state and the failed jobs")
+    status.add_argument("--jobs", required=True, help="The SQLite job database")
+    status.add_argument("--retry-failed", action="store_true", help="Makes the failed jobs pending again")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "add":
+        store = MDSSQLiteJobStore(args.jobs)
+        plan = MDSBackfill(
+            providers=load_providers(args.config, args.provider),
+            sink=None,
+            window_size=int(args.window_hours * 3600),
+        ).plan(parse_time(args.start, args.time_zone), parse_time(args.end, args.time_zone))
+        added = store.add_many(plan, priority=args.priority)
+        print(json.dumps({"planned": len(plan), "added": added}))
+    elif args.command == "work":
+        logging.basicConfig(
+            level=logging.INFO if args.verbose else logging.WARNING,
+            format="%(asctime)s - %(levelname)s - %(threadName)s - %(message)s",
+        )
+        store = MDSSQLiteJobStore(args.jobs, max_attempts=args.max_attempts)
+        worker = MDSJobWorker(
+            store,
+            providers=load_providers(args.config),
+            sink=MDSFileSink(args.sink, file_format=args.format),
+            lease_duration=args.lease,
+            heartbeat_interval=args.lease / 5,
+            deadline=args.deadline,
+        )
+        print(json.dumps(worker.run(threads=args.threads, wait=args.wait)))
+    else:
+        store = MDSSQLiteJobStore(args.jobs)
+        retried = store.retry_failed() if args.retry_failed else 0
+        print(json.dumps({
+            **store.get_counts(),
+            "failed_jobs": store.get_failed(),
+            "retried": retried,
+        }, indent=2))
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Class: MDSLogging
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: Logging helpers for the MDS client. The library never configures
+the root logger, all of its messages go to the "mds" logger and its children
+and are only formatted when DEBUG is enabled, for example:
+
+    logging.getLogger("mds").setLevel(logging.DEBUG)
+
+For large pulls, the "mds" logger can hand its records to a background thread
+so the paging loop never waits on slow handlers (files, network):
+
+    listener = MDSLogging.enable_async_logging(logging.StreamHandler())
+    ...
+    MDSLogging.disable_async_logging()
+"""
+
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+class MDSLogging:
+    # The name of the logger all the library's loggers descend from
+    logger_name = "mds"
+
+    # Headers whose values must never be logged (lower case)
+    sensitive_headers = frozenset({
+        "authorization",
+        "proxy-authorization",
+        "cookie",
+        "set-cookie",
+        "x-api-key",
+    })
+
+    # The current async logging state: (queue handler, listener, previous level, previous propagate)
+    _async_state = None
+
+    @staticmethod
+    def redact_headers(headers):
+        """
+        Returns a copy of the headers that is safe to log, credentials are masked
+        :param dict headers: The HTTP headers
+        :return dict:
+        """
+        if not headers:
+            return headers
+
+        redacted = {}
+        for key, value in headers.items():
+            if key.lower() in MDSLogging.sensitive_headers:
+                # Keep the scheme (e.g., "Bearer") as it helps debugging
+                scheme = str(value).split(" ", 1)[0] if " " in str(value) else ""
+                value = f"{scheme} [REDACTED]".strip()
+            redacted[key] = value
+        return redacted
+
+    @staticmethod
+    def enable_async_logging(*handlers, level=logging.DEBUG):
+        """
+        Routes the "mds" logger through a QueueHandler, the given handlers run
+        in a background thread. The records do not propagate to the root handlers
+        meanwhile, they would be emitted on the calling thread as well.
+        :param list handlers: The handlers that will emit the records (e.g., logging.StreamHandler())
+        :param int level: The level of the "mds" logger
+        :return QueueListener: The running listener
+        """
+        MDSLogging.disable_async_logging()
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+        logger = logging.getLogger(MDSLogging.logger_name)
+        previous_level, previous_propagate = logger.level, logger.propagate
+        logger.addHandler(queue_handler)
+        logger.setLevel(level)
+        logger.propagate = False
+        listener.start()
+
+        MDSLogging._async_state = (queue_handler, listener, previous_level, previous_propagate)
+        return listener
+
+    @staticmethod
+    def disable_async_logging():
+        """
+        Stops the background logging thread (if any), flushing pending records,
+        and restores the level and propagation of the "mds" logger.
+        """
+        if MDSLogging._async_state is None:
+            return
+
+        queue_handler, listener, previous_level, previous_propagate = MDSLogging._async_state
+        logger = logging.getLogger(MDSLogging.logger_name)
+        logger.removeHandler(queue_handler)
+        logger.setLevel(previous_level)
+        logger.propagate = previous_propagate
+        listener.stop()
+        MDSLogging._async_state = None
@@ -0,0 +1,206 @@
+"""
+Class: MDSMetrics
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to aggregate the events of the MDS
+client in memory (counters and histograms per provider) and to export them
+in the Prometheus text exposition format, for example:
+
+    metrics = MDSMetrics()
+    mds_client = MDSClient(config=provider_configuration, observers=[metrics])
+    mds_client.get_trips(start_time=start_time, end_time=end_time)
+    print(metrics.to_prometheus())
+"""
+
+import threading
+from bisect import bisect_left
+
+from .MDSObserver import MDSObserver
+
+
+class MDSHistogram:
+    __slots__ = (
+        "buckets",
+        "counts",
+        "sum",
+        "count",
+    )
+
+    def __init__(self, buckets):
+        """
+        Initializes an empty histogram
+        :param tuple buckets: The sorted upper bounds of the buckets, +Inf is implicit
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        """
+        Adds a value to the histogram
+        :param float value: The value to be added
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def get_cumulative_counts(self):
+        """
+        Returns the cumulative count per bucket, including +Inf
+        :return list: A list of (upper bound, count) tuples
+        """
+        cumulative = 0
+        output = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            output.append((bound, cumulative))
+        return output
+
+
+class MDSMetrics(MDSObserver):
+    # Upper bounds of the histogram buckets
+    duration_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    bytes_buckets = tuple(1024 * 4 ** i for i in range(9))  # 1 KiB to 64 MiB
+    records_buckets = (0, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+    auth_buckets = duration_buckets
+
+    # name: (type, help)
+    descriptions = {
+        "mds_requests_total": ("counter", "HTTP requests made, by status code."),
+        "mds_retries_total": ("counter", "HTTP requests retried after a failure."),
+        "mds_request_duration_seconds": ("histogram", "Duration of the HTTP requests."),
+        "mds_response_bytes": ("histogram", "Size of the HTTP response bodies, after decompression."),
+        "mds_response_wire_bytes": ("histogram", "Size of the HTTP response bodies as transferred."),
+        "mds_pages_total": ("counter", "Pages downloaded."),
+        "mds_page_records": ("histogram", "Records found per page."),
+        "mds_records_total": ("counter", "Records downloaded."),
+        "mds_paging_steps_total": ("counter", "Next links followed."),
+        "mds_auth_total": ("counter", "Authentications, by outcome."),
+        "mds_auth_duration_seconds": ("histogram", "Duration of the authentications."),
+    }
+
+    def __init__(self):
+        """
+        Initializes an empty aggregator
+        """
+        # The client may emit events from several threads
+        self._lock = threading.Lock()
+        # {metric_name: {labels_tuple: value or MDSHistogram}}
+        self._metrics = {name: {} for name in self.descriptions}
+
+    def _increment(self, name, labels, value=1):
+        """
+        Increments a counter
+        :param str name: The name of the counter
+        :param tuple labels: A tuple of (label, value) tuples
+        :param int value: The amount to add
+        """
+        with self._lock:
+            series = self._metrics[name]
+            series[labels] = series.get(labels, 0) + value
+
+    def _observe(self, name, labels, value, buckets):
+        """
+        Adds a value to a histogram
+        :param str name: The name of the histogram
+        :param tuple labels: A tuple of (label, value) tuples
+        :param float value: The value to be added
+        :param tuple buckets: The buckets to use if the histogram does not exist yet
+        """
+        with self._lock:
+            series = self._metrics[name]
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = MDSHistogram(buckets)
+            histogram.observe(value)
+
+    def get_value(self, name, **labels):
+        """
+        Returns the current value of a series, mostly useful in tests.
+        :param str name: The name of the metric
+        :param dict labels: The labels of the series (e.g., provider="lime")
+        :return: An int for counters, an MDSHistogram for histograms, or None
+        """
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        return self._metrics[name].get(key)
+
+    @staticmethod
+    def _labels(provider, **kwargs):
+        """
+        Builds the hashable label set of a series
+        :param str provider: The provider name
+        :param dict kwargs: Any additional labels
+        :return tuple:
+        """
+        return tuple(sorted({"provider": str(provider), **{k: str(v) for k, v in kwargs.items()}}.items()))
+
+    def on_request_end(self, provider, status_code, elapsed, bytes_received, wire_bytes=0, **kwargs):
+        labels = self._labels(provider)
+        self._increment("mds_requests_total", self._labels(provider, status_code=status_code))
+        self._observe("mds_request_duration_seconds", labels, elapsed, self.duration_buckets)
+        self._observe("mds_response_bytes", labels, bytes_received, self.bytes_buckets)
+        self._observe("mds_response_wire_bytes", labels, wire_bytes, self.bytes_buckets)
+
+    def on_retry(self, provider, **kwargs):
+        self._increment("mds_retries_total", self._labels(provider))
+
+    def on_page(self, provider, data_key, records, **kwargs):
+        labels = self._labels(provider, data_key=data_key)
+        self._increment("mds_pages_total", labels)
+        self._increment("mds_records_total", labels, records)
+        self._observe("mds_page_records", labels, records, self.records_buckets)
+
+    def on_paging_step(self, provider, **kwargs):
+        self._increment("mds_paging_steps_total", self._labels(provider))
+
+    def on_auth(self, provider, elapsed, success, **kwargs):
+        self._increment("mds_auth_total", self._labels(provider, success=str(success).lower()))
+        self._observe("mds_auth_duration_seconds", self._labels(provider), elapsed, self.auth_buckets)
+
+    @staticmethod
+    def _format_labels(labels):
+        """
+        Renders a label set, escaping the values as required by Prometheus
+        :param tuple labels: A tuple of (label, value) tuples
+        :return str:
+        """
+        escaped = (
+            (key, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+            for key, value in labels
+        )
+        return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+    @staticmethod
+    def _format_bound(bound):
+        """
+        Renders the upper bound of a bucket
+        :param float bound: The upper bound
+        :return str:
+        """
+        return "+Inf" if bound == float("inf") else str(bound)
+
+    def to_prometheus(self):
+        """
+        Exports the current metrics in the Prometheus text exposition format
+        :return str:
+        """
+        lines = []
+        with self._lock:
+            for name, (metric_type, description) in self.descriptions.items():
+                series = self._metrics[name]
+                if not series:
+                    continue
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in sorted(series.items()):
+                    if metric_type == "counter":
+                        lines.append(f"{name}{self._format_labels(labels)} {value}")
+                        continue
+                    for bound, count in value.get_cumulative_counts():
+                        bucket_labels = labels + (("le", self._format_bound(bound)),)
+                        lines.append(f"{name}_bucket{self._format_labels(bucket_labels)} {count}")
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {value.sum}")
+                    lines.append(f"{name}_count{self._format_labels(labels)} {value.count}")
+        return "\n".join(lines) + "\n"
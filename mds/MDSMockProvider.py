@@ -0,0 +1,525 @@
+"""
+Class: MDSMockProvider
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to provide a local stand-in for an
+MDS provider, so paging, retries and concurrency can be tested and benchmarked
+without a real operator. It serves the /trips and /status_changes endpoints
+in the shape of MDS 0.2.0, 0.3.0 or 0.4.0 with `links.next` paging, version headers and OAuth,
+Bearer or Basic authentication. Trips are generated deterministically from a
+seed, and latency, 429/5xx responses and mid-stream disconnects can be
+injected:
+
+    with MDSMockProvider(version="0.3.0", seed=1, error_rate_5xx=0.05) as provider:
+        mds_client = MDSClient(config=provider.get_config())
+        trips = mds_client.get_trips(start_time=start_time, end_time=end_time)
+
+It only requires the standard library.
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from .MDSException import MDSException
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MDSMockProvider:
+    # version: (name of the time params, timestamp multiplier)
+    versions = {
+        "0.2.0": (("start_time", "end_time"), 1),
+        "0.3.0": (("min_end_time", "max_end_time"), 1000),
+        "0.4.0": (("end_time",), 1000),
+    }
+    # The status changes are queried by event time: start_time and end_time, or event_time in 0.4.0
+    status_change_params = {
+        "0.2.0": ("start_time", "end_time"),
+        "0.3.0": ("start_time", "end_time"),
+        "0.4.0": ("event_time",),
+    }
+    # The number of generated hours kept, the least recently served are generated again if requested
+    max_cached_hours = 48
+
+    def __init__(
+        self,
+        version="0.3.0",
+        seed=0,
+        trips_per_hour=100,
+        page_size=100,
+        route_points=5,
+        auth_type=None,
+        token="mock-token",
+        username="mock-user",
+        password="mock-password",
+        latency=None,
+        error_rate_429=0.0,
+        error_rate_5xx=0.0,
+        disconnect_rate=0.0,
+        compress=False,
+        etags=False,
+        host="127.0.0.1",
+        port=0,
+    ):
+        """
+        Initializes the stand-in provider, call start() or use it as a context manager
+        :param str version: The MDS version to serve: "0.2.0", "0.3.0" or "0.4.0"
+        :param int seed: The seed of the generated trips and the injected faults
+        :param int trips_per_hour: The number of trips ending in each hour
+        :param int page_size: The maximum number of trips per page
+        :param int route_points: The number of points in the route of each trip
+        :param str auth_type: None, "OAuth", "Bearer" or "Basic"
+        :param str token: The valid bearer token (also issued by the OAuth token endpoint)
+        :param str username: The valid Basic username (also the OAuth client_id)
+        :param str password: The valid Basic password (also the OAuth client_secret)
+        :param latency: The response latency: None, seconds, a (low, high) tuple for a uniform
+            distribution, or a function taking a random.Random and returning seconds (see lognormal)
+        :param float error_rate_429: The probability of a 429 Too Many Requests response
+        :param float error_rate_5xx: The probability of a 500, 502 or 503 response
+        :param float disconnect_rate: The probability of closing the connection mid-body
+        :param bool compress: If True, pages are gzip-compressed for clients accepting gzip
+        :param bool etags: If True, pages have an ETag, and a request with If-None-Match gets a 304 if it matches
+        :param str host: The interface to listen on
+        :param int port: The port to listen on, 0 picks a free port
+        """
+        if version not in self.versions:
+            raise MDSException(f"MDSMockProvider::__init__() Unsupported version: '{version}'")
+
+        self.version = version
+        self.seed = seed
+        self.trips_per_hour = trips_per_hour
+        self.page_size = page_size
+        self.route_points = route_points
+        self.auth_type = auth_type.lower() if auth_type else None
+        self.token = token
+        self.username = username
+        self.password = password
+        self.latency = latency
+        self.error_rate_429 = error_rate_429
+        self.error_rate_5xx = error_rate_5xx
+        self.disconnect_rate = disconnect_rate
+        self.compress = compress
+        self.etags = etags
+        self.host = host
+        self.port = port
+
+        # The faults are drawn from their own generator, shared by the server threads
+        self._fault_rng = random.Random(f"{seed}-faults")
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        # {hour: trips} of the recently served hours, generating an hour is much slower than serving it
+        self._hours = OrderedDict()
+        self.stats = {}
+        self.reset_stats()
+
+    @staticmethod
+    def lognormal(median, sigma):
+        """
+        Returns a latency function with a log-normal distribution (long tail)
+        :param float median: The median latency in seconds
+        :param float sigma: The shape parameter, larger values give a longer tail
+        :return function:
+        """
+        return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+    def reset_stats(self):
+        """
+        Clears the request and fault counters
+        """
+        with self._lock:
+            self.stats = {
+                "requests": 0,
+                "pages": 0,
+                "unauthorized": 0,
+                "not_acceptable": 0,
+                "not_modified": 0,
+                "429": 0,
+                "5xx": 0,
+                "disconnects": 0,
+            }
+
+    def _count(self, key):
+        """
+        Increments a counter of self.stats
+        :param str key: The name of the counter
+        """
+        with self._lock:
+            self.stats[key] += 1
+
+    @property
+    def url(self):
+        """
+        The base URL of the running provider
+        :return str:
+        """
+        return f"http://{self.host}:{self._server.server_address[1]}"
+
+    def start(self):
+        """
+        Starts serving in a background thread
+        :return MDSMockProvider: self
+        """
+        provider = self
+
+        class Handler(MDSMockProviderHandler):
+            pass
+
+        Handler.provider = provider
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.debug("MDSMockProvider::start() Serving MDS %s at %s", self.version, self.url)
+        return self
+
+    def stop(self):
+        """
+        Stops the server
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def get_config(self, **kwargs):
+        """
+        Returns an MDSClient configuration pointing at this provider
+        :param dict kwargs: Any settings to add or override
+        :return dict:
+        """
+        config = {
+            "provider": f"mock-{self.version}",
+            "mds_api_url": self.url,
+            "version": self.version,
+            "delay": 0,
+            "max_attempts": 3,
+            "paging": True,
+            "timeout": 10,
+        }
+        if self.auth_type == "oauth":
+            config.update({
+                "auth_type": "OAuth",
+                "token_url": f"{self.url}/token",
+                "auth_data": {
+                    "client_id": self.username,
+                    "client_secret": self.password,
+                    "grant_type": "client_credentials",
+                },
+                "auth_token_res_key": "access_token",
+            })
+        elif self.auth_type == "basic":
+            config.update({
+                "auth_type": "Basic",
+                "auth_data": {"username": self.username, "password": self.password},
+            })
+        else:
+            # The client requires an authentication method, any token works without auth
+            config.update({"auth_type": "Bearer", "token": self.token})
+        return {**config, **kwargs}
+
+    def get_window(self, query, endpoint="trips"):
+        """
+        Parses the time window out of the query parameters
+        :param dict query: The query parameters, as provided by parse_qs
+        :param str endpoint: "trips" or "status_changes"
+        :return tuple: The (start, end) unix timestamps in seconds
+        """
+        names, multiplier = self.versions[self.version]
+        if endpoint == "status_changes":
+            names = self.status_change_params[self.version]
+        if self.version == "0.4.0":
+            hour = datetime.strptime(query[names[0]][0], "%Y-%m-%dT%H").replace(tzinfo=timezone.utc)
+            start = int(hour.timestamp())
+            return start, start + 3600
+        return (
+            int(query[names[0]][0]) // multiplier,
+            int(query[names[1]][0]) // multiplier,
+        )
+
+    def get_trips(self, start, end):
+        """
+        Returns the trips that end within a window, always the same for a given seed
+        :param int start: The start of the window in unix time (seconds)
+        :param int end: The end of the window in unix time (seconds)
+        :return list:
+        """
+        trips = []
+        for hour in range(start - start % 3600, end, 3600):
+            for trip in self._get_hour_trips(hour):
+                if start <= trip["_end"] < end:
+                    trips.append(trip["trip"])
+        return trips
+
+    def get_status_changes(self, start, end):
+        """
+        Returns the status changes of a window: a vehicle becomes available at the end of each trip
+        :param int start: The start of the window in unix time (seconds)
+        :param int end: The end of the window in unix time (seconds)
+        :return list:
+        """
+        return [
+            {
+                "provider_id": trip["provider_id"],
+                "provider_name": trip["provider_name"],
+                "device_id": trip["device_id"],
+                "vehicle_id": trip["vehicle_id"],
+                "vehicle_type": trip["vehicle_type"],
+                "propulsion_type": trip["propulsion_type"],
+                "event_type": "available",
+                "event_type_reason": "trip_end",
+                "event_time": trip["end_time"],
+                "event_location": trip["route"]["features"][-1],
+                "associated_trip": trip["trip_id"],
+            }
+            for trip in self.get_trips(start, end)
+        ]
+
+    def _get_hour_trips(self, hour):
+        """
+        Generates the trips ending within an hour
+        :param int hour: The start of the hour in unix time (seconds)
+        :return list: A list of {"_end": end time in seconds, "trip": dict}
+        """
+        with self._lock:
+            trips = self._hours.get(hour)
+            if trips is not None:
+                self._hours.move_to_end(hour)
+                return trips
+
+        trips = self._generate_hour_trips(hour)
+        with self._lock:
+            # Another thread may have generated the hour meanwhile, its trips are kept
+            trips = self._hours.setdefault(hour, trips)
+            self._hours.move_to_end(hour)
+            while len(self._hours) > self.max_cached_hours:
+                self._hours.popitem(last=False)
+        return trips
+
+    def _generate_hour_trips(self, hour):
+        """
+        Generates the trips ending within an hour, from a generator seeded by the hour
+        :param int hour: The start of the hour in unix time (seconds)
+        :return list: A list of {"_end": end time in seconds, "trip": dict}
+        """
+        rng = random.Random(f"{self.seed}-{hour}")
+        multiplier = self.versions[self.version][1]
+        trips = []
+        for _ in range(self.trips_per_hour):
+            end_time = hour + rng.randrange(3600)
+            duration = rng.randint(60, 1800)
+            start_time = end_time - duration
+            lon, lat = -97.74 + rng.uniform(-0.1, 0.1), 30.27 + rng.uniform(-0.1, 0.1)
+            features = []
+            for i in range(self.route_points):
+                lon += rng.uniform(-0.002, 0.002)
+                lat += rng.uniform(-0.002, 0.002)
+                timestamp = start_time + duration * i // max(self.route_points - 1, 1)
+                features.append({
+                    "type": "Feature",
+                    "properties": {"timestamp": timestamp * multiplier},
+                    "geometry": {"type": "Point", "coordinates": [round(lon, 6), round(lat, 6)]},
+                })
+            trips.append({"_end": end_time, "trip": {
+                "provider_id": str(uuid.UUID(int=self.seed % 2 ** 128)),
+                "provider_name": "Mock Provider",
+                "device_id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "vehicle_id": f"MOCK{rng.randrange(10000):04d}",
+                "vehicle_type": rng.choice(["scooter", "bicycle"]),
+                "propulsion_type": ["electric"],
+                "trip_id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "trip_duration": duration,
+                "trip_distance": rng.randint(100, 8000),
+                "route": {"type": "FeatureCollection", "features": features},
+                "accuracy": rng.choice([5, 10, 15]),
+                "start_time": start_time * multiplier,
+                "end_time": end_time * multiplier,
+                "cost": rng.randint(100, 900),
+            }})
+        return trips
+
+    def draw_fault(self):
+        """
+        Draws the latency and the fault of the next response
+        :return tuple: (latency in seconds, fault) where fault is None, 429, 5xx code or "disconnect"
+        """
+        with self._lock:
+            rng = self._fault_rng
+            if self.latency is None:
+                latency = 0
+            elif callable(self.latency):
+                latency = self.latency(rng)
+            elif isinstance(self.latency, (tuple, list)):
+                latency = rng.uniform(*self.latency)
+            else:
+                latency = self.latency
+
+            draw = rng.random()
+            if draw < self.error_rate_429:
+                fault = 429
+            elif draw < self.error_rate_429 + self.error_rate_5xx:
+                fault = rng.choice([500, 502, 503])
+            elif draw < self.error_rate_429 + self.error_rate_5xx + self.disconnect_rate:
+                fault = "disconnect"
+            else:
+                fault = None
+        return max(latency, 0), fault
+
+    def is_authorized(self, authorization):
+        """
+        Checks the Authorization header of a request
+        :param str authorization: The header value
+        :return bool:
+        """
+        if self.auth_type is None:
+            return True
+        if self.auth_type == "basic":
+            expected = base64.b64encode(f"{self.username}:{self.password}".encode("utf-8")).decode("utf-8")
+            return authorization == f"Basic {expected}"
+        return authorization == f"Bearer {self.token}"
+
+
+class MDSMockProviderHandler(BaseHTTPRequestHandler):
+    # Keep connections alive, as real providers do
+    protocol_version = "HTTP/1.1"
+    # Set by MDSMockProvider.start()
+    provider = None
+
+    def log_message(self, format, *args):
+        logger.debug("MDSMockProviderHandler %s", format % args)
+
+    def _send_json(self, status, body, headers=None, content_type="application/json", compress=False):
+        content = json.dumps(body).encode("utf-8")
+        headers = dict(headers or {})
+        if compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+            content = gzip.compress(content, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_POST(self):
+        provider = self.provider
+        provider._count("requests")
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+
+        if urlsplit(self.path).path != "/token" or provider.auth_type != "oauth":
+            return self._send_json(404, {"error": "not_found"})
+
+        if form.get("client_id", [None])[0] != provider.username or \
+                form.get("client_secret", [None])[0] != provider.password:
+            provider._count("unauthorized")
+            return self._send_json(401, {"error": "invalid_client"})
+
+        return self._send_json(200, {"access_token": provider.token, "token_type": "bearer", "expires_in": 3600})
+
+    def do_GET(self):
+        provider = self.provider
+        provider._count("requests")
+        url = urlsplit(self.path)
+
+        endpoint = url.path.strip("/")
+        if endpoint not in ("trips", "status_changes"):
+            return self._send_json(404, {"error": "not_found"})
+
+        if not provider.is_authorized(self.headers.get("Authorization")):
+            provider._count("unauthorized")
+            return self._send_json(401, {"error": "unauthorized"})
+
+        # Providers answer 406 when the requested version is not served
+        accept = self.headers.get("Accept", "")
+        if "version=" in accept and accept.split("version=")[1][:3] != provider.version[:3]:
+            provider._count("not_acceptable")
+            return self._send_json(406, {"error": "not_acceptable", "supported": [provider.version[:3]]})
+
+        latency, fault = provider.draw_fault()
+        if latency:
+            time.sleep(latency)
+
+        if fault == 429:
+            provider._count("429")
+            return self._send_json(429, {"error": "too_many_requests"}, headers={"Retry-After": "1"})
+        if isinstance(fault, int):
+            provider._count("5xx")
+            return self._send_json(fault, {"error": "server_error"})
+
+        query = parse_qs(url.query)
+        try:
+            start, end = provider.get_window(query, endpoint)
+        except (KeyError, ValueError):
+            return self._send_json(400, {"error": "bad_param"})
+
+        page = int(query.get("page", ["0"])[0])
+        if endpoint == "trips":
+            records = provider.get_trips(start, end)
+        else:
+            records = provider.get_status_changes(start, end)
+        page_records = records[page * provider.page_size:(page + 1) * provider.page_size]
+
+        next_link = None
+        if (page + 1) * provider.page_size < len(records):
+            next_query = {key: values[0] for key, values in query.items()}
+            next_query["page"] = page + 1
+            next_link = f"{provider.url}/{endpoint}?{urlencode(next_query)}"
+
+        body = {
+            "version": provider.version,
+            "data": {endpoint: page_records},
+            "links": {"next": next_link},
+        }
+        content_type = f"application/vnd.mds.provider+json;version={provider.version[:3]}"
+
+        if fault == "disconnect":
+            # Promise the whole body, send half of it and hang up
+            provider._count("disconnects")
+            content = json.dumps(body).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content[:len(content) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        headers = None
+        if provider.etags:
+            etag = '"%s"' % hashlib.sha1(json.dumps(body).encode("utf-8")).hexdigest()[:20]
+            if self.headers.get("If-None-Match") == etag:
+                provider._count("not_modified")
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            headers = {"ETag": etag}
+
+        provider._count("pages")
+        return self._send_json(200, body, headers=headers, content_type=content_type, compress=provider.compress)
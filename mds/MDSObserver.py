@@ -0,0 +1,94 @@
+"""
+Class: MDSObserver
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to provide the instrumentation
+interface of the MDS client. Subclass it and override the events you care
+about, then pass your instances in the "observers" list of the configuration:
+
+    MDSClient(config=provider_configuration, observers=[MyObserver()])
+
+Every event receives keyword arguments only, always including `provider`
+(the "provider" value of the configuration). When no observer is registered
+the client does not compute any of the event data.
+"""
+
+
+class MDSObserver:
+    def on_request_start(self, provider, mds_endpoint, attempt, **kwargs):
+        """
+        Called right before an HTTP request is made
+        :param str provider: The provider name as found in the configuration
+        :param str mds_endpoint: The URL being requested
+        :param int attempt: The attempt number, starting at 1
+        """
+        pass
+
+    def on_request_end(self, provider, mds_endpoint, attempt, status_code, elapsed, bytes_received, wire_bytes, **kwargs):
+        """
+        Called after an HTTP request completes, successfully or not
+        :param str provider: The provider name as found in the configuration
+        :param str mds_endpoint: The URL requested
+        :param int attempt: The attempt number, starting at 1
+        :param int status_code: The HTTP status code, or -1 if there was no response
+        :param float elapsed: The duration of the request in seconds
+        :param int bytes_received: The size of the response body in bytes, after decompression
+        :param int wire_bytes: The size of the response body as transferred, before decompression
+        :param str content_encoding: (When a response was received) The Content-Encoding, "identity" if none
+        :param float ttfb: (When a response was received) Seconds until the headers arrived, connection included
+        :param float download: (When a response was received) Seconds spent downloading the body
+        :param float decode: (When a response was received) Seconds spent decoding the JSON body
+        """
+        pass
+
+    def on_retry(self, provider, mds_endpoint, attempt, message, **kwargs):
+        """
+        Called when a failed request is about to be retried
+        :param str provider: The provider name as found in the configuration
+        :param str mds_endpoint: The URL that failed
+        :param int attempt: The attempt number that failed
+        :param str message: The error message
+        """
+        pass
+
+    def on_sleep(self, provider, seconds, kind, **kwargs):
+        """
+        Called after the client waited before making a request
+        :param str provider: The provider name as found in the configuration
+        :param float seconds: The time waited in seconds
+        :param str kind: "delay" before a first attempt, "backoff" before a retry
+        """
+        pass
+
+    def on_page(self, provider, mds_endpoint, data_key, page, records, elapsed, **kwargs):
+        """
+        Called after a page has been downloaded and its records gathered
+        :param str provider: The provider name as found in the configuration
+        :param str mds_endpoint: The URL of the page
+        :param str data_key: The kind of records (e.g., "trips")
+        :param int page: The page number within the pull, starting at 1
+        :param int records: The number of records found in the page
+        :param float elapsed: The time in seconds spent on the page, retries included
+        :param float extract: The time in seconds spent gathering the records from the page
+        """
+        pass
+
+    def on_paging_step(self, provider, next_link, page, **kwargs):
+        """
+        Called when the client follows a `next` link
+        :param str provider: The provider name as found in the configuration
+        :param str next_link: The URL of the next page
+        :param int page: The number of the page that provided the link
+        """
+        pass
+
+    def on_auth(self, provider, auth_type, elapsed, success, **kwargs):
+        """
+        Called after the client (re)authenticates
+        :param str provider: The provider name as found in the configuration
+        :param str auth_type: The authentication method (e.g., "OAuth")
+        :param float elapsed: The duration of the authentication in seconds
+        :param bool success: True if authentication headers were generated
+        """
+        pass
@@ -0,0 +1,155 @@
+"""
+Class: MDSProfiler
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to profile a single pull. It is an
+MDSObserver that splits the wall time of the pull into phases and reports
+throughput and peak memory as a JSON-serializable dictionary:
+
+    {
+        "provider": "lime",
+        "wall_time": 12.5,
+        "phases": {"ttfb": 7.1, "download": 2.3, "decode": 1.2, "extract": 0.01,
+                   "delay": 1.0, "backoff": 0.0, "other": 0.89},
+        "pages": 10, "requests": 11, "retries": 1, "records": 10000,
+        "bytes": 52428800, "wire_bytes": 5242880, "compression_ratio": 10.0,
+        "pages_per_second": 0.8, "megabytes_per_second": 4.0, "records_per_second": 800.0,
+        "peak_memory_bytes": 73400320
+    }
+
+The "ttfb" phase goes from sending the request to receiving the response
+headers, so it includes the connection time. "bytes" counts the decoded
+bodies and "wire_bytes" what was transferred, before decompression. Peak
+memory is measured with tracemalloc, which slows allocations down while the
+pull is profiled. Tracing is shared by the pulls profiled at the same time,
+so their peaks cover each other's allocations.
+"""
+
+import threading
+import time
+import tracemalloc
+
+from .MDSObserver import MDSObserver
+
+
+class MDSProfiler(MDSObserver):
+    # The phases of a pull, in the order they happen
+    phases = ("ttfb", "download", "decode", "extract", "delay", "backoff")
+
+    # tracemalloc is process-wide: the number of running profilers tracing with it, when a profiler started it
+    _tracers = 0
+    _tracing_lock = threading.Lock()
+
+    def __init__(self, trace_memory=True):
+        """
+        Initializes the profiler
+        :param bool trace_memory: If True, the peak memory of the pull is measured with tracemalloc
+        """
+        self.trace_memory = trace_memory
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        """
+        Clears the counters of the profiler
+        """
+        self.provider = None
+        self.started_at = None
+        self.stopped_at = None
+        self.peak_memory = None
+        self._started_tracing = False
+        self.totals = {phase: 0.0 for phase in self.phases}
+        self.counters = {"pages": 0, "requests": 0, "retries": 0, "records": 0, "bytes": 0, "wire_bytes": 0}
+
+    def start(self, provider=None):
+        """
+        Starts profiling a pull
+        :param str provider: The provider name to be included in the report
+        """
+        self._reset()
+        self.provider = provider
+        if self.trace_memory:
+            with MDSProfiler._tracing_lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    MDSProfiler._tracers = 1
+                    self._started_tracing = True
+                else:
+                    if MDSProfiler._tracers:
+                        # Started by another profiler, the last one to stop stops it
+                        MDSProfiler._tracers += 1
+                        self._started_tracing = True
+                    # Python 3.9+, the peak of older versions also covers what was traced before
+                    if hasattr(tracemalloc, "reset_peak"):
+                        tracemalloc.reset_peak()
+        self.started_at = time.perf_counter()
+
+    def stop(self):
+        """
+        Stops profiling the pull
+        :return dict: The profiling report
+        """
+        self.stopped_at = time.perf_counter()
+        if self.trace_memory:
+            with MDSProfiler._tracing_lock:
+                if tracemalloc.is_tracing():
+                    self.peak_memory = tracemalloc.get_traced_memory()[1]
+                if self._started_tracing:
+                    self._started_tracing = False
+                    MDSProfiler._tracers -= 1
+                    if MDSProfiler._tracers == 0:
+                        tracemalloc.stop()
+        return self.get_report()
+
+    def get_report(self):
+        """
+        Returns the profiling report of the pull
+        :return dict:
+        """
+        stopped_at = self.stopped_at if self.stopped_at is not None else time.perf_counter()
+        wall_time = stopped_at - self.started_at if self.started_at is not None else 0.0
+
+        with self._lock:
+            phases = {phase: round(total, 6) for phase, total in self.totals.items()}
+            counters = dict(self.counters)
+
+        phases["other"] = round(max(wall_time - sum(phases.values()), 0.0), 6)
+
+        def per_second(value):
+            return round(value / wall_time, 3) if wall_time > 0 else None
+
+        return {
+            "provider": self.provider,
+            "wall_time": round(wall_time, 6),
+            "phases": phases,
+            **counters,
+            "compression_ratio": round(counters["bytes"] / counters["wire_bytes"], 3)
+            if counters["wire_bytes"] else None,
+            "pages_per_second": per_second(counters["pages"]),
+            "megabytes_per_second": per_second(counters["bytes"] / 1048576),
+            "records_per_second": per_second(counters["records"]),
+            "peak_memory_bytes": self.peak_memory,
+        }
+
+    def on_request_end(self, bytes_received, wire_bytes=0, **kwargs):
+        with self._lock:
+            self.counters["requests"] += 1
+            self.counters["bytes"] += bytes_received
+            self.counters["wire_bytes"] += wire_bytes
+            for phase in ("ttfb", "download", "decode"):
+                self.totals[phase] += kwargs.get(phase, 0.0)
+
+    def on_retry(self, **kwargs):
+        with self._lock:
+            self.counters["retries"] += 1
+
+    def on_sleep(self, seconds, kind, **kwargs):
+        with self._lock:
+            self.totals[kind] += seconds
+
+    def on_page(self, records, extract=0.0, **kwargs):
+        with self._lock:
+            self.counters["pages"] += 1
+            self.counters["records"] += records
+            self.totals["extract"] += extract
@@ -0,0 +1,304 @@
+"""
+Class: MDSScheduler
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to pull every provider hour by
+hour, as a long-running process instead of a cron job. Each provider has its
+own thread and keeps its client, authentication included, between runs. A
+provider wakes up after each hour boundary, once its lag (the time it needs
+to publish an hour) and a jitter have passed, so the providers do not all
+start at the same second. On each wake-up the newest hour is pulled first,
+then the hours missed within the catch-up period:
+
+    scheduler = MDSScheduler(
+        providers={"lime": {**lime_config, "lag": 600}, "bird": bird_config},
+        sink=MDSFileSink("/data/trips"),
+        checkpoint="/data/scheduler.checkpoint",
+    )
+    scheduler.run()  # Until scheduler.stop() is called
+
+The same is available from the command line, optionally with a backfill
+sharing the workers of the live hours (see MDSWindowQueue):
+
+    $ mds-scheduler --config providers.json --sink /data/trips --checkpoint /data/scheduler.checkpoint
+    $ mds-scheduler --config providers.json --sink /data/trips --checkpoint /data/scheduler.checkpoint \
+        --workers 8 --backfill-start 2020-01-01 --backfill-end 2021-01-01 --backfill-checkpoint /data/backfill.checkpoint
+"""
+
+import argparse
+import random
+import signal
+import sys
+import threading
+import time
+
+from .MDSBackfill import MDSBackfill, MDSBackfillCheckpoint, _pull_window, load_providers, parse_time
+from .MDSSink import MDSFileSink
+from .MDSWindowQueue import MDSWindowQueue
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MDSScheduler:
+    def __init__(
+        self,
+        providers,
+        sink,
+        checkpoint=None,
+        lag=300,
+        jitter=60,
+        catch_up=24,
+        deadline=None,
+        attempts=2,
+        queue=None,
+        clock=time.time,
+    ):
+        """
+        Initializes the scheduler
+        :param dict providers: The MDSClient configurations by provider name, a "lag" key overrides the lag
+        :param MDSSink sink: Where the trips are written
+        :param str checkpoint: (Optional) The path of the checkpoint file, completed hours are kept in memory if None
+        :param int lag: The seconds to wait after an hour ends before pulling it
+        :param int jitter: The maximum random seconds added to the lag, to stagger the providers
+        :param int catch_up: The number of past hours checked for missing data on each run
+        :param float deadline: (Optional) The maximum time in seconds allowed for each hour
+        :param int attempts: The number of times an hour is tried on each run
+        :param MDSWindowQueue queue: (Optional) A queue shared with backfills, whose workers pull the hours
+            with the live priority, the provider threads then only schedule and record them
+        :param function clock: Returns the current unix time
+        """
+        self.providers = providers
+        self.sink = sink
+        self.checkpoint = MDSBackfillCheckpoint(checkpoint)
+        self.lag = lag
+        self.jitter = jitter
+        self.catch_up = catch_up
+        self.deadline = deadline
+        self.attempts = attempts
+        self.queue = queue
+        self.clock = clock
+
+        # The warm clients by provider, each one only used by its provider's thread
+        self.clients = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def get_lag(self, provider):
+        """
+        Returns the lag of a provider in seconds
+        :param str provider: The provider name
+        :return int:
+        """
+        return self.providers[provider].get("lag", self.lag)
+
+    def get_jitter(self, provider, hour):
+        """
+        Returns the jitter of a provider for an hour, the same on every host and restart
+        :param str provider: The provider name
+        :param int hour: The end of the hour in unix time
+        :return float:
+        """
+        return random.Random(f"{provider}-{hour}").uniform(0, self.jitter)
+
+    def get_next_run(self, provider, now):
+        """
+        Returns when a provider should run next: after the next hour boundary, its lag and its jitter
+        :param str provider: The provider name
+        :param float now: The current unix time
+        :return float:
+        """
+        lag = self.get_lag(provider)
+        hour = int(now - lag) - int(now - lag) % 3600 + 3600
+        return hour + lag + self.get_jitter(provider, hour)
+
+    def get_pending_hours(self, provider, now):
+        """
+        Returns the hours of a provider that are published but not pulled yet, newest first
+        :param str provider: The provider name
+        :param float now: The current unix time
+        :return list: A list of (start_time, end_time) tuples
+        """
+        latest = int(now - self.get_lag(provider))
+        latest -= latest % 3600
+        version = self.providers[provider].get("version", "0.2.0")
+        windows = MDSBackfill.plan_windows(version, latest - self.catch_up * 3600, latest)
+        with self._lock:
+            return [
+                window for window in reversed(windows)
+                if not self.checkpoint.is_completed(provider, *window)
+            ]
+
+    def run_provider(self, provider, now=None):
+        """
+        Pulls the pending hours of a provider, newest first
+        :param str provider: The provider name
+        :param float now: (Optional) The current unix time, the clock by default
+        :return dict: The number of hours completed and failed, and the trips written
+        """
+        now = self.clock() if now is None else now
+        summary = {"completed": 0, "failed": 0, "trips": 0}
+        pending = self.get_pending_hours(provider, now)
+
+        futures = []
+        if self.queue is not None:
+            # The shared workers pull them ahead of any backfill window
+            futures = [
+                self.queue.put(
+                    provider, self.providers[provider], start_time, end_time, self.sink,
+                    priority=self.queue.LIVE, deadline=self.deadline, attempts=self.attempts,
+                )
+                for start_time, end_time in pending
+            ]
+
+        for position, (start_time, end_time) in enumerate(pending):
+            if self._stopped.is_set():
+                break
+            try:
+                if futures:
+                    trips = futures[position].result()
+                else:
+                    trips = _pull_window(
+                        provider, self.providers[provider], start_time, end_time, self.sink,
+                        deadline=self.deadline, attempts=self.attempts, clients=self.clients,
+                    )
+            except Exception as e:
+                # Left pending, the next run tries again
+                logger.error("MDSScheduler::run_provider() Failed %s %s-%s: %s", provider, start_time, end_time, e)
+                summary["failed"] += 1
+                continue
+            with self._lock:
+                self.checkpoint.complete(provider, start_time, end_time, trips)
+            summary["completed"] += 1
+            summary["trips"] += trips
+            logger.info(
+                "MDSScheduler::run_provider() Completed %s %s-%s: %s trips", provider, start_time, end_time, trips
+            )
+
+        # Stopped, the hours still queued are left for the next start
+        for future in futures:
+            future.cancel()
+        return summary
+
+    def _run_provider_forever(self, provider):
+        """
+        The loop of a provider's thread: runs at start-up (staggered), then after every hour boundary
+        :param str provider: The provider name
+        """
+        next_run = self.clock() + self.get_jitter(provider, 0)
+        while not self._stopped.wait(max(next_run - self.clock(), 0)):
+            try:
+                self.run_provider(provider)
+            except Exception as e:
+                # The provider is tried again at the next run, the thread must not die
+                logger.exception("MDSScheduler::_run_provider_forever() Run of %s failed: %s", provider, e)
+            next_run = self.get_next_run(provider, self.clock())
+            logger.debug("MDSScheduler::_run_provider_forever() Next run of %s at %s", provider, next_run)
+
+    def run(self):
+        """
+        Runs every provider until stop() is called
+        """
+        self._stopped.clear()
+        threads = [
+            threading.Thread(target=self._run_provider_forever, args=(provider,), name=f"mds-{provider}", daemon=True)
+            for provider in self.providers
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            # Let the hours being pulled complete
+            self.stop()
+            for thread in threads:
+                thread.join()
+        with self._lock:
+            self.checkpoint.close()
+
+    def stop(self):
+        """
+        Stops the scheduler once the windows being pulled are completed
+        """
+        self._stopped.set()
+
+
+def main(argv=None):
+    """
+    The mds-scheduler command
+    :param list argv: (Optional) The command line arguments, sys.argv by default
+    :return int: The exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog="mds-scheduler",
+        description="Pulls every hour of MDS providers as it gets published, and catches up missed hours.",
+    )
+    parser.add_argument("--config", required=True, help="JSON file with the provider configurations")
+    parser.add_argument("--provider", action="append", help="A provider to pull (repeatable), all by default")
+    parser.add_argument("--sink", required=True, help="Directory where the trips are written")
+    parser.add_argument("--format", choices=MDSFileSink.formats, default="json", help="Format of the window files")
+    parser.add_argument("--checkpoint", help="Checkpoint file of the completed hours")
+    parser.add_argument("--lag", type=int, default=300, help="Seconds after the hour before pulling it")
+    parser.add_argument("--jitter", type=int, default=60, help="Maximum random seconds added to the lag")
+    parser.add_argument("--catch-up-hours", type=int, default=24, help="Past hours checked for missing data")
+    parser.add_argument("--deadline", type=float, help="Maximum seconds per hour")
+    parser.add_argument("--workers", type=int, help="Pull through a pool of workers shared with the backfill")
+    parser.add_argument("--max-in-flight", type=int, help="Maximum windows of one provider pulled at the same time")
+    parser.add_argument("--backfill-start", help="Also backfill from this date, YYYY-MM-DD or YYYY-MM-DDTHH")
+    parser.add_argument("--backfill-end", help="End date (excluded) of the backfill")
+    parser.add_argument("--backfill-checkpoint", help="Checkpoint file of the backfill")
+    parser.add_argument("--time-zone", default="UTC", help="Time zone of the backfill dates, e.g., US/Central")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Log every hour")
+    args = parser.parse_args(argv)
+    if (args.backfill_start or args.backfill_end) and not (args.backfill_start and args.backfill_end and args.workers):
+        parser.error("--backfill-start and --backfill-end go together, and require --workers")
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(threadName)s - %(message)s",
+    )
+
+    providers = load_providers(args.config, args.provider)
+    sink = MDSFileSink(args.sink, file_format=args.format)
+
+    queue = None
+    if args.workers:
+        queue = MDSWindowQueue(max_in_flight=args.max_in_flight)
+        queue.start(workers=args.workers)
+
+    scheduler = MDSScheduler(
+        providers=providers,
+        sink=sink,
+        checkpoint=args.checkpoint,
+        lag=args.lag,
+        jitter=args.jitter,
+        catch_up=args.catch_up_hours,
+        deadline=args.deadline,
+        queue=queue,
+    )
+
+    if args.backfill_start:
+        # The backfill only gets the workers the live hours leave free
+        backfill = MDSBackfill(
+            providers=providers, sink=sink, checkpoint=args.backfill_checkpoint, deadline=args.deadline, queue=queue,
+        )
+        threading.Thread(
+            target=backfill.run,
+            args=(parse_time(args.backfill_start, args.time_zone), parse_time(args.backfill_end, args.time_zone)),
+            name="mds-backfill",
+            daemon=True,
+        ).start()
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop())
+    scheduler.run()
+    if queue:
+        queue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Class: MDSSink
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to define where the trips of a
+window go once downloaded. A sink receives the pages of one window as they
+are downloaded, so a window never needs to fit in memory at once:
+
+    sink = MDSFileSink("/data/trips", file_format="jsonl")
+    trips = sink.write_window("lime", start_time, end_time, mds_client.iter_trips(start_time, end_time))
+
+Sinks must be picklable to be used with process-based backfills.
+"""
+
+import contextlib
+import json
+import os
+import tempfile
+
+from .MDSException import MDSException
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The umask of the process, read once as reading it means setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class MDSSink:
+    def write_window(self, provider, start_time, end_time, pages):
+        """
+        Stores the trips of a window, writing it again replaces it
+        :param str provider: The provider name
+        :param int start_time: The start of the window in unix time
+        :param int end_time: The end of the window in unix time
+        :param iterable pages: Yields a list of trips per page
+        :return int: The number of trips written
+        """
+        raise NotImplementedError
+
+
+class MDSFileSink(MDSSink):
+    formats = ("json", "jsonl")
+
+    def __init__(self, path, file_format="json"):
+        """
+        Writes one file per window: <path>/<provider>/<start_time>-<end_time>.<format>
+        :param str path: The directory of the files
+        :param str file_format: "json" for an MDS-like {"data": {"trips": [...]}} document,
+            "jsonl" for one trip per line
+        """
+        if file_format not in self.formats:
+            raise MDSException(f"MDSFileSink::__init__() Unsupported format: '{file_format}'")
+        self.path = path
+        self.file_format = file_format
+
+    def get_file_path(self, provider, start_time, end_time):
+        """
+        Returns the path of the file of a window
+        :param str provider: The provider name
+        :param int start_time: The start of the window in unix time
+        :param int end_time: The end of the window in unix time
+        :return str:
+        """
+        return os.path.join(self.path, provider, f"{int(start_time)}-{int(end_time)}.{self.file_format}")
+
+    def write_window(self, provider, start_time, end_time, pages):
+        file_path = self.get_file_path(provider, start_time, end_time)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        # Written aside and renamed, a window file is either complete or absent. The temporary
+        # file is unique, the same window may be written by two threads at once (e.g., re-queued)
+        descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".tmp")
+        trips = 0
+        try:
+            # mkstemp creates the file readable by its owner only, the window file gets the usual mode
+            os.chmod(temporary_path, 0o666 & ~_UMASK)
+            with os.fdopen(descriptor, "w") as output:
+                if self.file_format == "jsonl":
+                    for page in pages:
+                        for trip in page:
+                            output.write(json.dumps(trip))
+                            output.write("\n")
+                        trips += len(page)
+                else:
+                    records = [trip for page in pages for trip in page]
+                    json.dump({"data": {"trips": records}}, output)
+                    trips = len(records)
+            os.replace(temporary_path, file_path)
+        except BaseException:
+            # A failed pull leaves nothing behind
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temporary_path)
+            raise
+
+        logger.debug("MDSFileSink::write_window() %s trips written to %s", trips, file_path)
+        return trips
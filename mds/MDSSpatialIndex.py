@@ -0,0 +1,276 @@
+"""
+Class: MDSSpatialIndex
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to bin the origins and destinations
+of trips into cells, for equity and district reporting, page by page. The
+first and last points of each route are read into NumPy arrays and the cells
+of a whole page are computed at once, as geohashes or as the cells of a
+fixed grid. The index keeps the number of origins and destinations by cell,
+and the trip ids that started or ended in each cell:
+
+    index = MDSSpatialIndex(geohash_precision=6)
+    for trips in mds_client.iter_trips(start_time, end_time):
+        index.add(trips)
+    index.get_counts()                      # {"9v6kpm": {"origins": 31, "destinations": 12}, ...}
+    index.get_trips("9v6kpm", "origins")    # The ids of the trips that started in the cell
+    index.get_cell(-97.7431, 30.2672)       # The cell of a point
+
+    # Or a grid of 0.01 degree cells, named "column:row" from (-180, -90)
+    index = MDSSpatialIndex(cell_size=0.01)
+
+NumPy is required:
+    pip install atd-mds-client[spatial]
+"""
+
+import threading
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .MDSException import MDSException
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MDSSpatialIndex:
+    # The geohash alphabet
+    base32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+    kinds = ("origins", "destinations")
+
+    def __init__(self, geohash_precision=None, cell_size=None):
+        """
+        Initializes an empty index, binning by geohash or by a fixed grid
+        :param int geohash_precision: (Optional) The number of geohash characters, between 1 and 12
+        :param float cell_size: (Optional) The size of the grid cells in degrees, if geohash_precision is None
+        """
+        if np is None:
+            raise MDSException(
+                "MDSSpatialIndex::__init__() numpy is required: pip install atd-mds-client[spatial]"
+            )
+        if (geohash_precision is None) == (cell_size is None):
+            raise MDSException("MDSSpatialIndex::__init__() Either geohash_precision or cell_size is required")
+        if geohash_precision is not None and not 1 <= geohash_precision <= 12:
+            raise MDSException("MDSSpatialIndex::__init__() geohash_precision must be between 1 and 12")
+        if cell_size is not None and not 0 < cell_size <= 180:
+            raise MDSException("MDSSpatialIndex::__init__() cell_size must be between 0 and 180 degrees")
+
+        self.geohash_precision = geohash_precision
+        self.cell_size = cell_size
+        if geohash_precision is not None:
+            self._alphabet = np.frombuffer(self.base32.encode(), dtype=np.uint8)
+            bits = 5 * geohash_precision
+            # Longitude takes the even bits, so the extra bit of an odd total
+            self._lon_bits = (bits + 1) // 2
+            self._lat_bits = bits // 2
+        else:
+            self._columns = int(np.ceil(360 / cell_size))
+            self._rows = int(np.ceil(180 / cell_size))
+
+        self._lock = threading.Lock()
+        # {"origins": {cell: count}, "destinations": {cell: count}}
+        self.counts = {kind: {} for kind in self.kinds}
+        # The trip ids in the order they were added, and the positions of the trips of each cell in it:
+        # {"origins": {cell: array("q")}, "destinations": {cell: array("q")}}, which the garbage collector skips
+        self._trip_ids = []
+        self._positions = {kind: {} for kind in self.kinds}
+        # The trips without a usable route
+        self.skipped = 0
+
+    @staticmethod
+    def get_points(trips):
+        """
+        Reads the first and last points of the routes
+        :param list trips: The trips
+        :return tuple: (trip_ids, starts, ends), a list of ids and two (n, 2) float arrays
+            of longitudes and latitudes, NaN where a trip has no usable route
+        """
+        coordinates = []
+        missing = (float("nan"), float("nan"), float("nan"), float("nan"))
+        for trip in trips:
+            try:
+                features = trip["route"]["features"]
+                start = features[0]["geometry"]["coordinates"]
+                end = features[-1]["geometry"]["coordinates"]
+                coordinates.append((start[0], start[1], end[0], end[1]))
+            except (KeyError, IndexError, TypeError):
+                coordinates.append(missing)
+
+        points = np.array(coordinates, dtype=np.float64).reshape(-1, 4)
+        trip_ids = [trip.get("trip_id") for trip in trips]
+        return trip_ids, points[:, 0:2], points[:, 2:4]
+
+    def get_codes(self, lons, lats):
+        """
+        Returns the integer codes of the cells of points, computed for all the points at once
+        :param numpy.ndarray lons: The longitudes
+        :param numpy.ndarray lats: The latitudes
+        :return numpy.ndarray: The int64 codes, -1 for the points that are invalid or out of range
+        """
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        valid = (lons >= -180) & (lons <= 180) & (lats >= -90) & (lats <= 90)
+
+        if self.geohash_precision is not None:
+            # The position of the point in a 2^bits grid, as the bisections of a geohash would find it
+            lon_index = np.floor((lons + 180) / 360 * (1 << self._lon_bits))
+            lat_index = np.floor((lats + 90) / 180 * (1 << self._lat_bits))
+            lon_index = np.clip(np.nan_to_num(lon_index), 0, (1 << self._lon_bits) - 1).astype(np.int64)
+            lat_index = np.clip(np.nan_to_num(lat_index), 0, (1 << self._lat_bits) - 1).astype(np.int64)
+            # Interleaves the bits, longitude first
+            codes = np.zeros(lons.shape, dtype=np.int64)
+            for bit in range(self._lon_bits + self._lat_bits):
+                if bit % 2 == 0:
+                    value = (lon_index >> (self._lon_bits - 1 - bit // 2)) & 1
+                else:
+                    value = (lat_index >> (self._lat_bits - 1 - bit // 2)) & 1
+                codes = (codes << 1) | value
+        else:
+            column = np.floor((lons + 180) / self.cell_size)
+            row = np.floor((lats + 90) / self.cell_size)
+            column = np.clip(np.nan_to_num(column), 0, self._columns - 1).astype(np.int64)
+            row = np.clip(np.nan_to_num(row), 0, self._rows - 1).astype(np.int64)
+            codes = column * self._rows + row
+
+        codes[~valid] = -1
+        return codes
+
+    def _get_names(self, codes):
+        """
+        Returns the names of cells from their codes
+        :param numpy.ndarray codes: The codes, 0 or more
+        :return list: The geohashes, or "column:row" for grid cells
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        if self.geohash_precision is not None:
+            # One character per 5 bits, looked up for all the codes at once
+            shifts = 5 * np.arange(self.geohash_precision - 1, -1, -1, dtype=np.int64)
+            characters = self._alphabet[(codes[:, None] >> shifts) & 31]
+            return characters.view(f"S{self.geohash_precision}").ravel().astype(str).tolist()
+        return [f"{column}:{row}" for column, row in zip((codes // self._rows).tolist(), (codes % self._rows).tolist())]
+
+    def get_cells(self, lons, lats):
+        """
+        Returns the names of the cells of points
+        :param numpy.ndarray lons: The longitudes
+        :param numpy.ndarray lats: The latitudes
+        :return list: The cell names, None for the points that are invalid or out of range
+        """
+        codes = self.get_codes(lons, lats)
+        # Only the distinct cells are named
+        unique, inverse = np.unique(codes, return_inverse=True)
+        names = self._get_names(np.maximum(unique, 0))
+        if len(unique) and unique[0] < 0:
+            names[0] = None
+        return [names[position] for position in inverse.ravel().tolist()]
+
+    def get_cell(self, lon, lat):
+        """
+        Returns the name of the cell of a point
+        :param float lon: The longitude
+        :param float lat: The latitude
+        :return str: The cell name, None if the point is invalid
+        """
+        return self.get_cells([lon], [lat])[0]
+
+    def get_cell_bounds(self, cell):
+        """
+        Returns the bounds of a cell
+        :param str cell: The cell name
+        :return tuple: (min_lon, min_lat, max_lon, max_lat)
+        """
+        if self.geohash_precision is not None:
+            code = 0
+            for character in cell:
+                code = (code << 5) | self.base32.index(character)
+            lon_index = lat_index = 0
+            for bit in range(self._lon_bits + self._lat_bits):
+                value = (code >> (self._lon_bits + self._lat_bits - 1 - bit)) & 1
+                if bit % 2 == 0:
+                    lon_index = (lon_index << 1) | value
+                else:
+                    lat_index = (lat_index << 1) | value
+            width = 360 / (1 << self._lon_bits)
+            height = 180 / (1 << self._lat_bits)
+            min_lon, min_lat = lon_index * width - 180, lat_index * height - 90
+            return min_lon, min_lat, min_lon + width, min_lat + height
+
+        column, row = (int(value) for value in cell.split(":"))
+        min_lon, min_lat = column * self.cell_size - 180, row * self.cell_size - 90
+        return min_lon, min_lat, min(min_lon + self.cell_size, 180), min(min_lat + self.cell_size, 90)
+
+    def add(self, trips):
+        """
+        Bins the origins and destinations of the trips of a page
+        :param list trips: The trips
+        :return int: The number of trips binned
+        """
+        if not trips:
+            return 0
+        trip_ids, starts, ends = self.get_points(trips)
+        binned = {}
+        for kind, points in zip(self.kinds, (starts, ends)):
+            codes = self.get_codes(points[:, 0], points[:, 1])
+            # Groups the trips by cell: sorted by code, then sliced where the code changes
+            order = np.argsort(codes, kind="stable")
+            unique, first, counts = np.unique(codes[order], return_index=True, return_counts=True)
+            valid = unique >= 0
+            binned[kind] = (order, self._get_names(unique[valid]), first[valid].tolist(), counts[valid].tolist())
+
+        skipped = int(np.count_nonzero(np.isnan(starts[:, 0])))
+        with self._lock:
+            offset = len(self._trip_ids)
+            self._trip_ids.extend(trip_ids)
+            for kind, (order, cells, first, counts) in binned.items():
+                kind_counts = self.counts[kind]
+                kind_positions = self._positions[kind]
+                positions = order + offset
+                for cell, start, count in zip(cells, first, counts):
+                    kind_counts[cell] = kind_counts.get(cell, 0) + count
+                    cell_positions = kind_positions.get(cell)
+                    if cell_positions is None:
+                        cell_positions = kind_positions[cell] = array("q")
+                    cell_positions.frombytes(positions[start:start + count].tobytes())
+            self.skipped += skipped
+
+        if skipped and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("MDSSpatialIndex::add() %s trips without a usable route", skipped)
+        return len(trips) - skipped
+
+    def get_counts(self):
+        """
+        Returns the number of origins and destinations by cell
+        :return dict: {cell: {"origins": int, "destinations": int}}
+        """
+        with self._lock:
+            cells = set(self.counts["origins"]) | set(self.counts["destinations"])
+            return {
+                cell: {kind: self.counts[kind].get(cell, 0) for kind in self.kinds}
+                for cell in sorted(cells)
+            }
+
+    def get_trips(self, cell, kind=None):
+        """
+        Returns the ids of the trips that started or ended in a cell
+        :param str cell: The cell name
+        :param str kind: (Optional) "origins" or "destinations", both if None
+        :return list: The trip ids
+        """
+        if kind is not None and kind not in self.kinds:
+            raise MDSException(f"MDSSpatialIndex::get_trips() Invalid kind: {kind}")
+        with self._lock:
+            if kind is not None:
+                positions = self._positions[kind].get(cell, ())
+            else:
+                positions = sorted(
+                    set(self._positions["origins"].get(cell, ())) | set(self._positions["destinations"].get(cell, ()))
+                )
+            trip_ids = self._trip_ids
+            return [trip_ids[position] for position in positions]
@@ -4,15 +4,51 @@ Class: MDSTimeZone
 Author: Austin Transportation Department, Data and Technology Services
 
 Description: The purpose of this class is to generate time-zone aware
-python date-times that can be passed to the MDS client.
+python date-times that can be passed to the MDS client, and to plan the
+query windows of a date range in local time (see get_windows).
 
 The application requires the pytz library:
     https://pypi.org/project/pytz/
 """
 
+from array import array
+from bisect import bisect_right
 from datetime import datetime, timedelta
+from functools import lru_cache
 import pytz
 
+from .MDSException import MDSException
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _get_epoch(date_time):
+    """
+    Returns the seconds since the unix epoch of a naive date time, read as UTC
+    :param datetime date_time: The naive date time
+    :return int:
+    """
+    return (date_time - _EPOCH) // timedelta(seconds=1)
+
+
+@lru_cache(maxsize=32)
+def _get_offsets(time_zone):
+    """
+    Returns the UTC offsets of a time zone, as a list of transitions in unix time
+    and the list of offsets in seconds that start at each transition
+    :param str time_zone: The time zone name
+    :return tuple:
+    """
+    tz = pytz.timezone(time_zone)
+    transitions = getattr(tz, "_utc_transition_times", None)
+    if not transitions:
+        # Fixed offset zones, UTC included
+        return [float("-inf")], [int(tz.utcoffset(datetime(2000, 1, 1)).total_seconds())]
+    return (
+        [float("-inf")] + [_get_epoch(transition) for transition in transitions[1:]],
+        [int(info[0].total_seconds()) for info in tz._transition_info],
+    )
+
 
 class MDSTimeZone:
     def __init__(
@@ -46,13 +82,16 @@ class MDSTimeZone:
         for key, value in kwargs.items():
             setattr(self, key, value)
 
-    def get_time(self, offset=0, date_time_now=datetime.now()):
+    def get_time(self, offset=0, date_time_now=None):
         """
         Builds a time object
         :param int offset:The offset to be applied in seconds
         :param datetime date_time_now: The date time object to use, or default to now.
         :return:
         """
+        # Evaluated on each call, a default argument would be the time the module was imported
+        if date_time_now is None:
+            date_time_now = datetime.now()
 
         # If the offset is positive, the delta is negative (go back in time)
         # Else, the delta is positive (we go forward in time)
@@ -97,3 +136,68 @@ class MDSTimeZone:
         tz_aware_output = tz_aware_time_end.astimezone(pytz.UTC) if utc else tz_aware_time_end
         # Use current format, or Unix Epoch if indicated
         return tz_aware_output.timestamp() if unix else tz_aware_output
+
+    @staticmethod
+    def get_windows(start_time, end_time, step=3600, time_zone="UTC", milliseconds=False):
+        """
+        Plans the windows of a range in local time, e.g. the hours or days of a year in US/Central.
+        The window boundaries are the instants when the local clock shows start_time plus a
+        multiple of step. When the clocks go back, the repeated boundaries are kept, so hourly
+        windows stay one hour long; when they go forward, the skipped boundaries are moved to
+        the transition, and the windows left empty are dropped.
+        :param datetime start_time: The start of the range, naive in local time
+        :param datetime end_time: The end of the range, naive in local time
+        :param int step: The size of the windows in local clock seconds, e.g., 86400 for days
+        :param str time_zone: The time zone name, e.g., US/Central
+        :param bool milliseconds: If True, the windows are in unix milliseconds instead of seconds
+        :return tuple: Two arrays of the same length, the window starts and ends in unix time (UTC)
+        """
+        if step <= 0:
+            raise MDSException("MDSTimeZone::get_windows() step must be positive")
+
+        transitions, offsets = _get_offsets(time_zone)
+        local_start = _get_epoch(start_time)
+        local_end = _get_epoch(end_time)
+
+        def get_first(local_time):
+            # The first boundary at or after a local time
+            return local_start + -((local_start - local_time) // step) * step
+
+        boundaries = array("q")
+
+        def add_gap_boundary(segment, segment_end, offset):
+            # The boundaries in the local times skipped when the clocks go forward are moved to the transition
+            if segment + 1 >= len(offsets) or offsets[segment + 1] <= offset:
+                return
+            first = get_first(max(segment_end + offset, local_start))
+            if first < segment_end + offsets[segment + 1] and first <= local_end:
+                if not boundaries or boundaries[-1] != segment_end:
+                    boundaries.append(int(segment_end))
+        # Offsets are within a day, so the segment of the start is at most one transition back
+        segment = max(bisect_right(transitions, local_start - 86400) - 1, 0)
+        while segment < len(offsets):
+            offset = offsets[segment]
+            segment_end = transitions[segment + 1] if segment + 1 < len(transitions) else float("inf")
+            if segment_end + offset <= local_start:
+                # The start itself may be skipped by the clocks going forward
+                add_gap_boundary(segment, segment_end, offset)
+                segment += 1
+                continue
+
+            # The local times this offset covers
+            first = get_first(max(transitions[segment] + offset, local_start))
+            last = min(segment_end + offset - 1, local_end)
+            if first <= last:
+                if boundaries and boundaries[-1] == first - offset:
+                    first += step
+                boundaries.extend(range(first - offset, last - offset + 1, step))
+
+            if segment_end == float("inf") or segment_end + offset > local_end:
+                break
+
+            add_gap_boundary(segment, segment_end, offset)
+            segment += 1
+
+        if milliseconds:
+            boundaries = array("q", [boundary * 1000 for boundary in boundaries])
+        return boundaries[:-1], boundaries[1:]
@@ -0,0 +1,195 @@
+"""
+Class: MDSTransport
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to define how the client talks
+HTTP. MDSClientBase._request and MDSAuth only call get() and post() on their
+transport, so the backend can be picked per provider in the configuration:
+
+    "transport": "requests"   # Default, a requests.Session with a connection pool
+    "transport": "http2"      # httpx, concurrent requests share one HTTP/2 connection
+    "transport": MDSMemoryTransport(...)  # Any MDSTransport instance (tests, replay)
+
+Options for the backend go in "transport_options" (e.g., {"pool_size": 20}).
+A response only needs `status_code`, `content`, `headers` and `json()`.
+
+The HTTP/2 backend requires httpx with HTTP/2 support:
+    pip install atd-mds-client[http2]
+"""
+
+import json
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .MDSException import MDSException
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MDSTransport:
+    @staticmethod
+    def get_transport(transport=None, **options):
+        """
+        Returns a transport from its name, or the given transport instance
+        :param transport: None or "requests" for MDSRequestsTransport, "http2" for MDSHttpxTransport,
+            or any object with get() and post() methods
+        :param dict options: The options of the transport class
+        :return MDSTransport:
+        """
+        if transport is None or transport == "requests":
+            return MDSRequestsTransport(**options)
+        if transport == "http2":
+            return MDSHttpxTransport(**options)
+        if isinstance(transport, str):
+            raise MDSException(f"MDSTransport::get_transport() Unknown transport: '{transport}'")
+        return transport
+
+    @staticmethod
+    def get_request_key(url, params=None):
+        """
+        Returns the canonical form of a request: its URL with the parameters sorted and appended
+        :param str url: The URL of the request
+        :param dict params: The URI parameters of the request, if any
+        :return str:
+        """
+        if not params:
+            return url
+        return f"{url}{'&' if '?' in url else '?'}{urlencode(sorted(params.items()))}"
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        """
+        Makes a GET request
+        :param str url: The URL of the request
+        :param dict params: (Optional) URI parameters to add to the URL
+        :param dict headers: (Optional) The HTTP headers
+        :param float timeout: (Optional) The timeout in seconds, None waits forever
+        :param bool stream: (Optional) If True, the body may be downloaded when `content` is read
+        :return object: A response with status_code, content, headers and json()
+        """
+        raise NotImplementedError
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        """
+        Makes a POST request with a form-encoded body
+        :param str url: The URL of the request
+        :param dict data: (Optional) The form fields
+        :param dict headers: (Optional) The HTTP headers
+        :param float timeout: (Optional) The timeout in seconds, None waits forever
+        :return object: A response with status_code, content, headers and json()
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Closes the connections of the transport, if any
+        """
+        pass
+
+
+class MDSTransportResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        """
+        A response built in memory, with the attributes the client reads from requests.Response
+        :param int status_code: The HTTP status code
+        :param content: The response body, bytes or a JSON-serializable object
+        :param dict headers: (Optional) The HTTP headers
+        """
+        if not isinstance(content, bytes):
+            content = json.dumps(content).encode("utf-8")
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class MDSRequestsTransport(MDSTransport):
+    def __init__(self, pool_size=10):
+        """
+        Makes the requests through a requests.Session, so connections are kept alive and reused
+        :param int pool_size: The maximum number of connections kept per host
+        """
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        return self.session.get(url, params=params, headers=headers, timeout=timeout, stream=stream)
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        return self.session.post(url, data=data, headers=headers, timeout=timeout)
+
+    def close(self):
+        self.session.close()
+
+
+class MDSHttpxTransport(MDSTransport):
+    def __init__(self, http2=True, max_connections=None):
+        """
+        Makes the requests through an httpx.Client. Over https, concurrent requests to
+        a provider are multiplexed on a single HTTP/2 connection.
+        :param bool http2: If True, HTTP/2 is negotiated with the servers supporting it
+        :param int max_connections: (Optional) The maximum number of connections, None for no limit
+        """
+        try:
+            import httpx
+            self.client = httpx.Client(http2=http2, limits=httpx.Limits(max_connections=max_connections))
+        except ImportError as e:
+            raise MDSException(
+                "MDSHttpxTransport::__init__() httpx with HTTP/2 support is required: "
+                "pip install atd-mds-client[http2]"
+            ) from e
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        # httpx downloads the whole body before returning
+        return self.client.get(url, params=params, headers=headers, timeout=timeout)
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        return self.client.post(url, data=data, headers=headers, timeout=timeout)
+
+    def close(self):
+        self.client.close()
+
+
+class MDSMemoryTransport(MDSTransport):
+    def __init__(self):
+        """
+        Serves responses registered in memory, for tests and replays. Every request
+        is kept in `requests` as (method, request key, headers).
+        """
+        self.routes = {}
+        self.requests = []
+
+    def add(self, method, url, response, params=None):
+        """
+        Registers the response of a request
+        :param str method: "GET" or "POST"
+        :param str url: The URL of the request
+        :param response: An MDSTransportResponse, or a function taking (method, url, params, headers)
+            and returning one
+        :param dict params: (Optional) The URI parameters of the request
+        """
+        self.routes[(method.upper(), self.get_request_key(url, params))] = response
+
+    def _respond(self, method, url, params, headers):
+        request_key = self.get_request_key(url, params)
+        self.requests.append((method, request_key, headers))
+        response = self.routes.get((method, request_key))
+        if response is None:
+            logger.debug("MDSMemoryTransport::_respond() No route for %s %s", method, request_key)
+            return MDSTransportResponse(404, b"Not found")
+        return response(method, url, params, headers) if callable(response) else response
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        return self._respond("GET", url, params, headers)
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        return self._respond("POST", url, None, headers)
@@ -0,0 +1,138 @@
+"""
+Class: MDSTripFilter
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to filter trips on the client side,
+as pages are downloaded, for providers that ignore the bbox, device_id and
+vehicle_id query parameters. The parameters the provider understands are
+still sent, and every trip the provider should have left out is dropped
+and counted:
+
+    trip_filter = MDSTripFilter(
+        device_ids=["a9b5...", "c07f..."],
+        bbox=(-97.75, 30.26, -97.73, 30.28),
+    )
+    trips = mds_client.get_trips(start_time=start_time, end_time=end_time, trip_filter=trip_filter)
+    trips["filtered"]      # The number of trips dropped by this pull
+    trip_filter.dropped    # {"device_id": 120, "bbox": 4}, for every pull so far
+
+A trip is kept if it passes every criterion:
+    - device_ids, vehicle_ids: its device_id, vehicle_id is in the set
+    - min_end_time, max_end_time: its end time is within [min_end_time, max_end_time), in unix seconds
+    - bbox: the first or the last point of its route is within (min_lon, min_lat, max_lon, max_lat)
+"""
+
+import threading
+
+from .MDSException import MDSException
+
+
+class MDSTripFilter:
+    def __init__(self, device_ids=None, vehicle_ids=None, min_end_time=None, max_end_time=None, bbox=None):
+        """
+        Initializes the filter, criteria left as None are not checked
+        :param list device_ids: (Optional) The device ids to keep
+        :param list vehicle_ids: (Optional) The vehicle ids to keep
+        :param int min_end_time: (Optional) The earliest end time to keep, in unix seconds
+        :param int max_end_time: (Optional) The end time to keep trips before, in unix seconds
+        :param tuple bbox: (Optional) (min_lon, min_lat, max_lon, max_lat) of the start or end point
+        """
+        self.device_ids = None if device_ids is None else frozenset(device_ids)
+        self.vehicle_ids = None if vehicle_ids is None else frozenset(vehicle_ids)
+        self.min_end_time = min_end_time
+        self.max_end_time = max_end_time
+        if bbox is not None:
+            bbox = tuple(float(value) for value in bbox)
+            if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+                raise MDSException(f"MDSTripFilter::__init__() Invalid bbox: {bbox}")
+        self.bbox = bbox
+
+        self._lock = threading.Lock()
+        # The number of trips received, and dropped by criterion
+        self.received = 0
+        self.dropped = {}
+
+    def get_params(self):
+        """
+        Returns the query parameters the provider may apply itself: a single device or vehicle, and the bbox
+        :return dict:
+        """
+        params = {}
+        if self.device_ids is not None and len(self.device_ids) == 1:
+            params["device_id"] = next(iter(self.device_ids))
+        if self.vehicle_ids is not None and len(self.vehicle_ids) == 1:
+            params["vehicle_id"] = next(iter(self.vehicle_ids))
+        if self.bbox is not None:
+            params["bbox"] = ",".join(str(value) for value in self.bbox)
+        return params
+
+    def _get_checks(self, time_multiplier):
+        """
+        Returns the checks of the criteria that are set, cheapest first
+        :param int time_multiplier: 1 if trip times are in seconds, 1000 if in milliseconds
+        :return list: A list of (criterion, function taking a trip and returning True to keep it)
+        """
+        checks = []
+        if self.device_ids is not None:
+            device_ids = self.device_ids
+            checks.append(("device_id", lambda trip: trip.get("device_id") in device_ids))
+        if self.vehicle_ids is not None:
+            vehicle_ids = self.vehicle_ids
+            checks.append(("vehicle_id", lambda trip: trip.get("vehicle_id") in vehicle_ids))
+        if self.min_end_time is not None or self.max_end_time is not None:
+            low = float("-inf") if self.min_end_time is None else self.min_end_time * time_multiplier
+            high = float("inf") if self.max_end_time is None else self.max_end_time * time_multiplier
+            checks.append(("end_time", lambda trip: low <= trip.get("end_time", low - 1) < high))
+        if self.bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = self.bbox
+
+            def in_bbox(trip):
+                try:
+                    features = trip["route"]["features"]
+                    lon, lat = features[0]["geometry"]["coordinates"][:2]
+                    if min_lon <= lon <= max_lon and min_lat <= lat <= max_lat:
+                        return True
+                    lon, lat = features[-1]["geometry"]["coordinates"][:2]
+                    return min_lon <= lon <= max_lon and min_lat <= lat <= max_lat
+                except (KeyError, IndexError, TypeError, ValueError):
+                    # A trip without a usable route cannot be placed
+                    return False
+
+            checks.append(("bbox", in_bbox))
+        return checks
+
+    def apply(self, trips, time_multiplier=1):
+        """
+        Filters the trips of a page
+        :param list trips: The trips
+        :param int time_multiplier: 1 if trip times are in seconds, 1000 if in milliseconds
+        :return list: The trips kept
+        """
+        checks = self._get_checks(time_multiplier)
+        if not checks:
+            return trips
+
+        kept = []
+        dropped = {}
+        for trip in trips:
+            for criterion, check in checks:
+                if not check(trip):
+                    dropped[criterion] = dropped.get(criterion, 0) + 1
+                    break
+            else:
+                kept.append(trip)
+
+        with self._lock:
+            self.received += len(trips)
+            for criterion, count in dropped.items():
+                self.dropped[criterion] = self.dropped.get(criterion, 0) + count
+        return kept
+
+    def get_dropped(self):
+        """
+        Returns the total number of trips dropped so far
+        :return int:
+        """
+        with self._lock:
+            return sum(self.dropped.values())
@@ -0,0 +1,287 @@
+"""
+Class: MDSTripSorter
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to iterate over the trips of many
+windows and providers ordered by end_time, with a fixed amount of memory.
+Pages do not arrive in that order, and sorting a month of trips at once does
+not fit in memory. The sorter keeps the trips it receives as sorted runs:
+when the trips held in memory exceed `memory_budget` bytes, they are sorted
+and written to a temporary file. Iterating merges every run (k-way, with
+heapq.merge), reading one trip of each run at a time.
+
+    with MDSTripSorter(memory_budget=256 * 1024 * 1024) as sorter:
+        for start_time, end_time in windows:
+            sorter.write_window("lime", start_time, end_time, mds_client.iter_trips(start_time, end_time))
+        for trip in sorter.iter_trips():
+            ...
+
+The sorter is an MDSSink, so a backfill can write its windows to it (thread
+executor only), optionally passing the pages on to another sink. A window
+written again replaces its trips, and a window that fails adds none. The end
+times of every version are compared in seconds; trips without one come last.
+"""
+
+import heapq
+import json
+import os
+import sys
+import tempfile
+import threading
+from operator import itemgetter
+
+from .MDSException import MDSException
+from .MDSSink import MDSSink
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MDSTripSorter(MDSSink):
+    # The memory of a trip held besides its JSON line (counted with sys.getsizeof, header included):
+    # its key, and the tuple and list slot holding them
+    _entry_overhead = sys.getsizeof(0.0) + sys.getsizeof((0.0, "")) + 8
+
+    def __init__(self, memory_budget=64 * 1024 * 1024, directory=None, max_runs=128, sink=None):
+        """
+        Initializes an empty sorter, call close() or use it as a context manager to remove its files
+        :param int memory_budget: The number of bytes of trips held in memory before they are written to a run
+        :param str directory: (Optional) The directory of the temporary files, the system's by default
+        :param int max_runs: The number of runs merged at once, more runs are merged in several passes
+        :param MDSSink sink: (Optional) The sink the pages are passed on to as they are sorted
+        """
+        if memory_budget <= 0:
+            raise MDSException("MDSTripSorter::__init__() memory_budget must be positive")
+        if max_runs < 2:
+            raise MDSException("MDSTripSorter::__init__() max_runs must be at least 2")
+        self.memory_budget = memory_budget
+        self.max_runs = max_runs
+        self.sink = sink
+        self._directory = tempfile.TemporaryDirectory(prefix="mds-sort-", dir=directory)
+        self._lock = threading.Lock()
+        self._counter = 0
+        # {window: [run]}, a run being the path of a file or a sorted list held in memory
+        self._runs = {}
+        # {window: number of trips}
+        self._trips = {}
+        # The bytes held in memory, by the windows being written and the runs kept in memory
+        self._memory = 0
+        self.stats = {"spilled_runs": 0, "spilled_bytes": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Removes the temporary files
+        """
+        with self._lock:
+            self._runs = {}
+            self._trips = {}
+            self._memory = 0
+        self._directory.cleanup()
+
+    @staticmethod
+    def _get_key(trip):
+        """
+        Returns the sort key of a trip: its end time in seconds
+        :param dict trip: The trip
+        :return float:
+        """
+        end_time = trip.get("end_time")
+        if end_time is None:
+            return float("inf")
+        # 0.3.0 and 0.4.0 are in milliseconds
+        return end_time / 1000 if end_time > 1e11 else float(end_time)
+
+    def _get_path(self):
+        with self._lock:
+            self._counter += 1
+            counter = self._counter
+        return os.path.join(self._directory.name, f"{counter:08d}.run")
+
+    def _spill(self, entries):
+        """
+        Sorts trips and writes them to a run file, one "key<TAB>trip" line each
+        :param list entries: A list of (key, line) tuples
+        :return str: The path of the run
+        """
+        entries.sort(key=itemgetter(0))
+        path = self._get_path()
+        size = 0
+        with open(path, "w") as file:
+            for key, line in entries:
+                size += file.write(f"{key!r}\t{line}\n")
+        with self._lock:
+            self.stats["spilled_runs"] += 1
+            self.stats["spilled_bytes"] += size
+        logger.debug("MDSTripSorter::_spill() %s trips written to %s", len(entries), path)
+        return path
+
+    def _spill_memory_runs(self):
+        """
+        Writes the runs of the completed windows held in memory to files
+        """
+        with self._lock:
+            held = [
+                (window, position, run)
+                for window, runs in self._runs.items()
+                for position, run in enumerate(runs)
+                if isinstance(run, list)
+            ]
+        for window, position, run in held:
+            path = self._spill(run)
+            with self._lock:
+                runs = self._runs.get(window)
+                # The window may have been written again meanwhile
+                if runs is not None and position < len(runs) and runs[position] is run:
+                    runs[position] = path
+                    self._memory -= self._get_size(run)
+                else:
+                    os.remove(path)
+
+    def _get_size(self, entries):
+        return sum(sys.getsizeof(line) for _, line in entries) + len(entries) * self._entry_overhead
+
+    def _release(self, runs):
+        """
+        Removes the runs of a window, held in memory or in files
+        :param list runs: The runs
+        """
+        for run in runs:
+            if isinstance(run, list):
+                with self._lock:
+                    self._memory -= self._get_size(run)
+            else:
+                try:
+                    os.remove(run)
+                except FileNotFoundError:
+                    pass
+
+    def write_window(self, provider, start_time, end_time, pages):
+        """
+        Adds the trips of a window, writing it again replaces its trips
+        :param str provider: The provider name
+        :param int start_time: The start of the window in unix time
+        :param int end_time: The end of the window in unix time
+        :param iterable pages: Yields a list of trips per page
+        :return int: The number of trips written
+        """
+        window = (provider, int(start_time), int(end_time))
+        runs = []
+        entries = []
+        held = 0
+        trips = 0
+
+        def sort_pages():
+            nonlocal entries, held, trips
+            for page in pages:
+                size = 0
+                for trip in page:
+                    line = json.dumps(trip, separators=(",", ":"))
+                    entries.append((self._get_key(trip), line))
+                    size += sys.getsizeof(line) + self._entry_overhead
+                trips += len(page)
+                held += size
+                with self._lock:
+                    self._memory += size
+                    over_budget = self._memory > self.memory_budget
+                if over_budget:
+                    # The completed windows go first, then this one if still over budget
+                    self._spill_memory_runs()
+                    with self._lock:
+                        over_budget = self._memory > self.memory_budget
+                    if over_budget and entries:
+                        runs.append(self._spill(entries))
+                        with self._lock:
+                            self._memory -= held
+                        entries, held = [], 0
+                yield page
+
+        try:
+            if self.sink is None:
+                for _ in sort_pages():
+                    pass
+            else:
+                self.sink.write_window(provider, start_time, end_time, sort_pages())
+        except BaseException:
+            # A failed pull adds nothing
+            self._release(runs)
+            with self._lock:
+                self._memory -= held
+            raise
+
+        if entries:
+            # Kept in memory until the budget is needed
+            entries.sort(key=itemgetter(0))
+            runs.append(entries)
+        with self._lock:
+            replaced = self._runs.pop(window, [])
+            self._runs[window] = runs
+            self._trips[window] = trips
+        if replaced:
+            logger.debug("MDSTripSorter::write_window() Replacing %s %s-%s", *window)
+            self._release(replaced)
+        return trips
+
+    def get_trip_count(self):
+        """
+        Returns the number of trips of the windows written
+        :return int:
+        """
+        with self._lock:
+            return sum(self._trips.values())
+
+    @staticmethod
+    def _read_run(run):
+        """
+        Yields the (key, line) tuples of a run, in order
+        :param run: The path of a run file, or a sorted list
+        :return generator:
+        """
+        if isinstance(run, list):
+            yield from run
+            return
+        with open(run) as file:
+            for line in file:
+                key, _, trip = line.partition("\t")
+                yield float(key), trip
+
+    def _merge_runs(self, runs):
+        return heapq.merge(*[self._read_run(run) for run in runs], key=itemgetter(0))
+
+    def iter_trips(self):
+        """
+        Yields the trips of every window ordered by end_time, do not write windows meanwhile
+        :return generator: Yields one trip at a time
+        """
+        with self._lock:
+            runs = [run for _, window_runs in sorted(self._runs.items()) for run in window_runs]
+
+        # Too many runs are merged into fewer first, so few files are open at once
+        merged = []
+        try:
+            while len(runs) > self.max_runs:
+                group, runs = runs[:self.max_runs], runs[self.max_runs:]
+                path = self._get_path()
+                with open(path, "w") as file:
+                    for key, line in self._merge_runs(group):
+                        file.write(f"{key!r}\t{line.rstrip()}\n")
+                merged.append(path)
+                runs.append(path)
+                logger.debug("MDSTripSorter::iter_trips() %s runs merged into %s", len(group), path)
+
+            for _, line in self._merge_runs(runs):
+                yield json.loads(line)
+        finally:
+            for path in merged:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,297 @@
+"""
+Class: MDSValidator
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to check the trips of a provider
+against the trips schema of its MDS version (0.2.0, 0.3.0 and 0.4.0) as the
+pages are downloaded. The schema of each version is compiled once into plain
+checks and cached, and the violations are counted instead of raised, so the
+pull goes on and the report tells what the provider got wrong:
+
+    validator = MDSTripValidator("0.3.0", mode="sampled", sample_rate=0.05)
+    for trips in mds_client.iter_trips(start_time, end_time):
+        validator.validate(trips)
+    validator.get_report()
+    # {"trips": 10422, "checked": 521, "invalid": 3, "violations": {"vehicle_type: invalid value": 3}, ...}
+
+The client validates its trips when "validation" is in its configuration:
+
+    "validation": "full"            # Every trip
+    "validation": "first_page"      # The trips of the first page of every pull
+    "validation": {"mode": "sampled", "sample_rate": 0.01}   # 1% of the trips
+"""
+
+import random
+import re
+import threading
+from functools import lru_cache
+
+from .MDSException import MDSException
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+_UUID = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+
+_PROPULSION_TYPES = ("human", "electric_assist", "electric", "combustion")
+
+# The trips schema of each version: {field: (kind, required, allowed values)}, where kind is one of
+# "uuid", "string", "integer", "seconds", "milliseconds", "vehicle_type", "propulsion_type" or "route"
+_TRIP_SCHEMAS = {
+    "0.2.0": {
+        "provider_id": ("uuid", True, None),
+        "provider_name": ("string", True, None),
+        "device_id": ("uuid", True, None),
+        "vehicle_id": ("string", True, None),
+        "vehicle_type": ("vehicle_type", True, ("bicycle", "scooter")),
+        "propulsion_type": ("propulsion_type", True, _PROPULSION_TYPES),
+        "trip_id": ("uuid", True, None),
+        "trip_duration": ("integer", True, None),
+        "trip_distance": ("integer", True, None),
+        "route": ("route", True, None),
+        "accuracy": ("integer", True, None),
+        "start_time": ("seconds", True, None),
+        "end_time": ("seconds", True, None),
+        "parking_verification_url": ("string", False, None),
+        "standard_cost": ("integer", False, None),
+        "actual_cost": ("integer", False, None),
+    },
+}
+_TRIP_SCHEMAS["0.3.0"] = {
+    **_TRIP_SCHEMAS["0.2.0"],
+    "vehicle_type": ("vehicle_type", True, ("bicycle", "car", "scooter")),
+    "start_time": ("milliseconds", True, None),
+    "end_time": ("milliseconds", True, None),
+    "publication_time": ("milliseconds", False, None),
+}
+_TRIP_SCHEMAS["0.4.0"] = {
+    **_TRIP_SCHEMAS["0.3.0"],
+    "vehicle_type": ("vehicle_type", True, ("bicycle", "car", "scooter", "moped")),
+    "currency": ("string", False, None),
+}
+
+# Times in seconds are below this value, times in milliseconds above it (it is March 1973 in milliseconds)
+_MILLISECONDS = 10 ** 11
+
+
+def _is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_route(route):
+    """
+    Returns True if a route is a FeatureCollection of timestamped points
+    """
+    if not isinstance(route, dict) or route.get("type") != "FeatureCollection":
+        return False
+    features = route.get("features")
+    if not isinstance(features, list) or not features:
+        return False
+    for feature in features:
+        try:
+            geometry = feature["geometry"]
+            if (
+                feature["type"] != "Feature"
+                or geometry["type"] != "Point"
+                or len(geometry["coordinates"]) < 2
+                or "timestamp" not in feature["properties"]
+            ):
+                return False
+        except (KeyError, TypeError):
+            return False
+    return True
+
+
+def _get_value_check(kind, values):
+    """
+    Returns the check of the values of a field
+    :param str kind: The kind of the field
+    :param tuple values: (Optional) The allowed values
+    :return tuple: (function taking the value and returning True if it is valid, problem)
+    """
+    if kind == "uuid":
+        match = _UUID.match
+        return (lambda value: isinstance(value, str) and match(value) is not None), "not a UUID"
+    if kind == "string":
+        return (lambda value: isinstance(value, str)), "not a string"
+    if kind == "integer":
+        return _is_integer, "not an integer"
+    if kind == "seconds":
+        return (
+            lambda value: isinstance(value, (int, float)) and not isinstance(value, bool) and 0 <= value < _MILLISECONDS
+        ), "not a timestamp in seconds"
+    if kind == "milliseconds":
+        return (lambda value: _is_integer(value) and value >= _MILLISECONDS), "not a timestamp in milliseconds"
+    if kind == "vehicle_type":
+        allowed = frozenset(values)
+        return (lambda value: isinstance(value, str) and value in allowed), "invalid value"
+    if kind == "propulsion_type":
+        allowed = frozenset(values)
+        return (
+            lambda value: isinstance(value, list) and len(value) > 0
+            and all(isinstance(item, str) and item in allowed for item in value)
+        ), "invalid value"
+    if kind == "route":
+        return _is_route, "not a FeatureCollection of points"
+    raise MDSException(f"MDSValidator::_get_value_check() Unknown kind: {kind}")
+
+
+@lru_cache(maxsize=None)
+def get_trip_checks(version):
+    """
+    Compiles the trips schema of a version into checks, once per version
+    :param str version: The MDS version, e.g. "0.3.0"
+    :return tuple: A tuple of (field, required, function taking the value and returning True if valid,
+        violation when missing, violation when invalid)
+    """
+    schema = _TRIP_SCHEMAS.get(version)
+    if schema is None:
+        raise MDSException(
+            f"MDSValidator::get_trip_checks() No trips schema for version {version}, "
+            f"expected one of: {', '.join(sorted(_TRIP_SCHEMAS))}"
+        )
+    checks = []
+    for field, (kind, required, values) in schema.items():
+        check, problem = _get_value_check(kind, values)
+        checks.append((field, required, check, f"{field}: missing", f"{field}: {problem}"))
+    return tuple(checks)
+
+
+class MDSTripValidator:
+    modes = ("full", "sampled", "first_page")
+
+    def __init__(self, version, mode="full", sample_rate=0.01, seed=None):
+        """
+        Initializes a validator with empty counters
+        :param str version: The MDS version of the trips, "0.2.0", "0.3.0" or "0.4.0"
+        :param str mode: "full" checks every trip, "sampled" a share of the trips of every page,
+            "first_page" the trips of the first page of every pull
+        :param float sample_rate: The share of the trips checked in "sampled" mode, e.g. 0.05 for 5%
+        :param int seed: (Optional) The seed of the sampling
+        """
+        if mode not in self.modes:
+            raise MDSException(f"MDSTripValidator::__init__() Invalid mode: {mode}, expected one of: {self.modes}")
+        if not 0 < sample_rate <= 1:
+            raise MDSException("MDSTripValidator::__init__() sample_rate must be between 0 and 1")
+        self.version = version
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self._checks = get_trip_checks(version)
+        self._random = random.Random(seed)
+        # The share of a trip to be sampled that did not fit in the previous pages
+        self._carry = 0.0
+        self._lock = threading.Lock()
+        self.trips = 0
+        self.checked = 0
+        self.invalid = 0
+        self.pages = 0
+        self.violations = {}
+
+    @classmethod
+    def from_config(cls, version, validation):
+        """
+        Builds a validator from the "validation" setting of a client configuration
+        :param str version: The MDS version of the client
+        :param validation: A mode name, or a dictionary of the constructor parameters
+        :return MDSTripValidator:
+        """
+        if isinstance(validation, str):
+            return cls(version, mode=validation)
+        return cls(version, **validation)
+
+    def _sample(self, trips):
+        """
+        Returns the trips to check in "sampled" mode, so the share of the trips checked over
+        many small pages stays at sample_rate
+        :param list trips: The trips of a page
+        :return list:
+        """
+        with self._lock:
+            self._carry += len(trips) * self.sample_rate
+            count = min(int(self._carry), len(trips))
+            self._carry -= count
+            if count == len(trips):
+                return trips
+            return self._random.sample(trips, count)
+
+    def check(self, trip):
+        """
+        Returns the violations of a trip
+        :param dict trip: The trip
+        :return list: The violations, e.g. ["trip_id: missing", "vehicle_type: invalid value"]
+        """
+        if not isinstance(trip, dict):
+            return ["trip: not an object"]
+        violations = []
+        for field, required, check, missing, invalid in self._checks:
+            value = trip.get(field)
+            if value is None:
+                if required:
+                    violations.append(missing)
+            elif not check(value):
+                violations.append(invalid)
+        start_time, end_time = trip.get("start_time"), trip.get("end_time")
+        if (
+            _is_integer(start_time) and _is_integer(end_time) and end_time < start_time
+            # Times in the wrong unit are reported as such
+            and not any(violation.startswith(("start_time", "end_time")) for violation in violations)
+        ):
+            violations.append("end_time: before start_time")
+        return violations
+
+    def validate(self, trips, first_page=True):
+        """
+        Checks the trips of a page according to the mode, and counts the violations
+        :param list trips: The trips of a page
+        :param bool first_page: If the page is the first of its pull, for the "first_page" mode
+        :return int: The number of invalid trips found in the page
+        """
+        if self.mode == "full":
+            sample = trips
+        elif self.mode == "sampled":
+            sample = self._sample(trips)
+        else:
+            sample = trips if first_page else ()
+
+        invalid = 0
+        violations = {}
+        check = self.check
+        for trip in sample:
+            found = check(trip)
+            if found:
+                invalid += 1
+                for violation in found:
+                    violations[violation] = violations.get(violation, 0) + 1
+
+        with self._lock:
+            self.pages += 1
+            self.trips += len(trips)
+            self.checked += len(sample)
+            self.invalid += invalid
+            for violation, count in violations.items():
+                self.violations[violation] = self.violations.get(violation, 0) + count
+
+        if invalid and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("MDSTripValidator::validate() %s invalid trips: %s", invalid, violations)
+        return invalid
+
+    def get_report(self):
+        """
+        Returns the counters of the validator
+        :return dict: {"version", "mode", "pages", "trips", "checked", "invalid", "invalid_rate", "violations"},
+            where invalid_rate is the share of the trips checked that are invalid
+        """
+        with self._lock:
+            return {
+                "version": self.version,
+                "mode": self.mode,
+                "pages": self.pages,
+                "trips": self.trips,
+                "checked": self.checked,
+                "invalid": self.invalid,
+                "invalid_rate": self.invalid / self.checked if self.checked else 0.0,
+                "violations": dict(sorted(self.violations.items(), key=lambda item: -item[1])),
+            }
@@ -0,0 +1,165 @@
+"""
+Class: MDSVersionProbe
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to find the MDS version a provider
+serves, so a client is not built with the parameters of another version
+after the provider upgrades. The probe asks for the trips of a one second
+window with the Accept header of each version, newest first: providers
+answer 406 to the versions they do not serve, and the `version` of the
+payload tells which one they answered with. The versions found are cached
+on disk by provider, for `ttl` seconds.
+
+The probe is opt-in, with "version": "auto" in the client configuration:
+
+    mds_client = MDSClient(config={
+        "provider": "lime",
+        "mds_api_url": "https://...",
+        "version": "auto",
+        "version_cache": "/var/cache/mds/versions.json",   # Optional
+        "version_cache_ttl": 86400,                          # Optional, in seconds
+        ...
+    })
+    mds_client.version   # "0.4.0"
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from .MDSException import MDSException
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MDSVersionProbe:
+    # The versions a client exists for, newest first
+    versions = ("0.4.0", "0.3.0", "0.2.0")
+
+    # The cache used when none is configured
+    default_cache_path = os.path.join(os.path.expanduser("~"), ".cache", "atd-mds-client", "versions.json")
+
+    _lock = threading.Lock()
+
+    def __init__(self, cache_path=None, ttl=86400):
+        """
+        Initializes the probe
+        :param str cache_path: (Optional) The JSON file of the versions found, by provider
+        :param float ttl: The number of seconds a version found is trusted before probing again
+        """
+        self.cache_path = cache_path or self.default_cache_path
+        self.ttl = ttl
+
+    @classmethod
+    def get_known_version(cls, version):
+        """
+        Returns the version of the client that serves a version, e.g. "0.3.0" for "0.3.1"
+        :param str version: A version as given by a provider or a configuration
+        :return str: The client version, or None if there is no client for it
+        """
+        if not isinstance(version, str):
+            return None
+        for known in cls.versions:
+            if version == known or version.startswith(known[:4]):
+                return known
+        return None
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("MDSVersionProbe::_read_cache() Ignoring unreadable cache %s: %s", self.cache_path, e)
+            return {}
+
+    def get_cached(self, provider):
+        """
+        Returns the version cached for a provider, if it has not expired
+        :param str provider: The provider name or URL
+        :return str: The version, or None
+        """
+        with self._lock:
+            entry = self._read_cache().get(provider)
+        if entry and time.time() - entry.get("detected_at", 0) < self.ttl:
+            return self.get_known_version(entry.get("version"))
+        return None
+
+    def set_cached(self, provider, version):
+        """
+        Caches the version of a provider, the file is replaced atomically
+        :param str provider: The provider name or URL
+        :param str version: The version
+        """
+        with self._lock:
+            cache = self._read_cache()
+            cache[provider] = {"version": version, "detected_at": int(time.time())}
+            directory = os.path.dirname(self.cache_path) or "."
+            try:
+                os.makedirs(directory, exist_ok=True)
+                descriptor, path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                with os.fdopen(descriptor, "w") as file:
+                    json.dump(cache, file, indent=2, sort_keys=True)
+                os.replace(path, self.cache_path)
+            except OSError as e:
+                # The probe runs again next time
+                logger.warning("MDSVersionProbe::set_cached() Cannot write %s: %s", self.cache_path, e)
+
+    def probe(self, clients, headers, timeout=None):
+        """
+        Asks the provider for the trips of a one second window, with the Accept header of each version
+        :param dict clients: A client of each version by version, sharing the provider URL and transport
+        :param dict headers: The headers of the client, authentication included
+        :param float timeout: (Optional) The timeout of each request in seconds
+        :return str: The version the provider serves
+        """
+        # One second, an hour ago, so 0.4.0 asks for a past hour
+        end_time = int(time.time()) - 3600
+        refused = []
+        for version in self.versions:
+            client = clients[version]
+            url = client._get_endpoint_url("trips")
+            params = client._get_params("trips", end_time - 1, end_time)
+            probe_headers = {**headers, "Accept": f"application/vnd.mds.provider+json;version={version[:3]}"}
+            response = client.transport.get(url, params=params, headers=probe_headers, timeout=timeout)
+            if response.status_code == 406:
+                refused.append(version)
+                continue
+            if response.status_code != 200:
+                raise MDSException(
+                    f"MDSVersionProbe::probe() The provider answered {response.status_code} to version {version}"
+                )
+            try:
+                served = response.json().get("version")
+            except ValueError:
+                served = None
+            # Providers that ignore the Accept header say which version they answered with
+            detected = self.get_known_version(served) if served else version
+            if detected is None:
+                raise MDSException(f"MDSVersionProbe::probe() The provider serves an unsupported version: {served}")
+            logger.info("MDSVersionProbe::probe() %s serves MDS %s", url, detected)
+            return detected
+
+        raise MDSException(f"MDSVersionProbe::probe() The provider refused every version: {', '.join(refused)}")
+
+    def get_version(self, provider, clients, headers, timeout=None):
+        """
+        Returns the cached version of a provider, or probes and caches it
+        :param str provider: The provider name or URL, the key of the cache
+        :param dict clients: A client of each version by version, sharing the provider URL and transport
+        :param dict headers: The headers of the client, authentication included
+        :param float timeout: (Optional) The timeout of each request in seconds
+        :return str: The version
+        """
+        version = self.get_cached(provider)
+        if version is None:
+            version = self.probe(clients, headers, timeout=timeout)
+            self.set_cached(provider, version)
+        return version
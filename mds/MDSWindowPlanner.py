@@ -0,0 +1,204 @@
+"""
+Class: MDSWindowPlanner
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to size the windows of 0.2.0 and
+0.3.0 pulls after the trip density of each provider, instead of a fixed
+window size that is too large for busy hours (hundreds of pages pulled one
+after the other) and too small for quiet ones (requests returning nothing).
+The planner learns the trips per second of each provider by hour of the day
+(UTC) from the windows pulled, stores them in a JSON file so the next runs
+start from what was learned, and plans windows of about `target_trips`:
+dense hours are split into short windows and quiet hours merged into long ones.
+
+    planner = MDSWindowPlanner("/data/densities.json", target_trips=5000)
+    for trips in planner.iter_trips(mds_client, "lime", start_time, end_time):
+        ...
+    planner.save()
+
+    # Or in a backfill, which records the completed windows in the planner
+    MDSBackfill(providers=providers, sink=sink, planner=planner).run(start_time, end_time)
+
+Window boundaries are multiples of `min_window` seconds, so windows planned
+with different densities never overlap.
+"""
+
+import json
+import os
+import tempfile
+import threading
+
+from .MDSException import MDSException
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MDSWindowPlanner:
+    def __init__(
+        self, path=None, target_trips=5000, min_window=300, max_window=86400, default_window=3600, smoothing=0.3
+    ):
+        """
+        Initializes the planner with the densities stored in a file, if any
+        :param str path: (Optional) The JSON file of the densities, None to keep them in memory
+        :param int target_trips: The number of trips a window is planned for
+        :param int min_window: The smallest window in seconds, windows start and end on its multiples
+        :param int max_window: The largest window in seconds
+        :param int default_window: The window size in seconds of the hours without a density yet
+        :param float smoothing: The weight of a new observation in the moving average of a density, 0 to 1
+        """
+        if not 0 < min_window <= default_window <= max_window:
+            raise MDSException("MDSWindowPlanner::__init__() Expected 0 < min_window <= default_window <= max_window")
+        if not 0 < smoothing <= 1:
+            raise MDSException("MDSWindowPlanner::__init__() smoothing must be between 0 and 1")
+        self.path = path
+        self.target_trips = target_trips
+        self.min_window = min_window
+        self.max_window = max_window
+        self.default_window = default_window
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        # {provider: {hour of the day: {"trips_per_second": float, "samples": int}}}
+        self.densities = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as file:
+                stored = json.load(file)
+            self.densities = {
+                provider: {int(hour): density for hour, density in hours.items()}
+                for provider, hours in stored.items()
+            }
+
+    def save(self):
+        """
+        Writes the densities to the file, which is replaced atomically
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            stored = {
+                provider: {str(hour): dict(density) for hour, density in sorted(hours.items())}
+                for provider, hours in self.densities.items()
+            }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(descriptor, "w") as file:
+            json.dump(stored, file, indent=2, sort_keys=True)
+        os.replace(path, self.path)
+
+    def observe(self, provider, start_time, end_time, trips):
+        """
+        Records the number of trips of a window pulled, in the densities of the hours it overlaps
+        :param str provider: The provider name
+        :param int start_time: The start of the window in unix time
+        :param int end_time: The end of the window in unix time
+        :param int trips: The number of trips of the window
+        """
+        start_time, end_time = int(start_time), int(end_time)
+        if end_time <= start_time:
+            return
+        # The trips are assumed evenly spread over the window
+        trips_per_second = trips / (end_time - start_time)
+        with self._lock:
+            hours = self.densities.setdefault(provider, {})
+            hour_start = start_time - start_time % 3600
+            while hour_start < end_time:
+                overlap = min(end_time, hour_start + 3600) - max(start_time, hour_start)
+                hour = hour_start // 3600 % 24
+                density = hours.get(hour)
+                if density is None:
+                    hours[hour] = {"trips_per_second": trips_per_second, "samples": 1}
+                else:
+                    # A window covering part of the hour moves the average less
+                    weight = self.smoothing * overlap / 3600
+                    density["trips_per_second"] += weight * (trips_per_second - density["trips_per_second"])
+                    density["samples"] += 1
+                hour_start += 3600
+
+    def _get_density(self, hours, time):
+        density = hours.get(int(time) // 3600 % 24)
+        if density is None:
+            # The hours not pulled yet are assumed to be as dense as the average hour
+            return sum(density["trips_per_second"] for density in hours.values()) / len(hours)
+        return density["trips_per_second"]
+
+    def get_density(self, provider, time):
+        """
+        Returns the trips per second learned for a provider at a time
+        :param str provider: The provider name
+        :param int time: The unix time
+        :return float: The trips per second, None if nothing was learned for the provider
+        """
+        with self._lock:
+            hours = self.densities.get(provider)
+            return self._get_density(hours, time) if hours else None
+
+    def next_window(self, provider, start_time, end_time):
+        """
+        Returns the end of the window starting at start_time
+        :param str provider: The provider name
+        :param int start_time: The start of the window in unix time
+        :param int end_time: The end of the range in unix time
+        :return int: The end of the window, end_time at most
+        """
+        aligned_start = start_time - start_time % self.min_window
+        limit = min(aligned_start + self.max_window, end_time)
+        # Windows end on multiples of min_window, so the first one may be shorter
+        window_end = aligned_start + self.min_window
+        with self._lock:
+            hours = self.densities.get(provider)
+            if not hours:
+                return min(aligned_start + self.default_window, limit)
+
+            # Adds min_window steps until the expected trips reach the target
+            expected = 0
+            while window_end < limit:
+                step_start = max(start_time, window_end - self.min_window)
+                expected += self._get_density(hours, step_start) * (window_end - step_start)
+                if expected >= self.target_trips:
+                    break
+                window_end += self.min_window
+        return min(window_end, limit)
+
+    def plan_windows(self, provider, start_time, end_time):
+        """
+        Splits a range into windows of about target_trips trips each
+        :param str provider: The provider name
+        :param int start_time: The start of the range in unix time
+        :param int end_time: The end of the range in unix time
+        :return list: A list of (start_time, end_time) tuples
+        """
+        start_time, end_time = int(start_time), int(end_time)
+        windows = []
+        while start_time < end_time:
+            window_end = self.next_window(provider, start_time, end_time)
+            windows.append((start_time, window_end))
+            start_time = window_end
+        return windows
+
+    def iter_trips(self, mds_client, provider, start_time, end_time, **kwargs):
+        """
+        Pulls a range window by window, each planned with what the previous ones taught
+        :param MDSClient mds_client: A client of a 0.2.0 or 0.3.0 provider
+        :param str provider: The provider name
+        :param int start_time: The start of the range in unix time
+        :param int end_time: The end of the range in unix time
+        :param dict kwargs: Any other parameter of MDSClient.iter_trips
+        :return generator: Yields a list of trips per page
+        """
+        if getattr(mds_client, "version", None) == "0.4.0":
+            raise MDSException("MDSWindowPlanner::iter_trips() 0.4.0 serves whole hours, windows cannot be planned")
+        start_time, end_time = int(start_time), int(end_time)
+        while start_time < end_time:
+            window_end = self.next_window(provider, start_time, end_time)
+            trips = 0
+            for page in mds_client.iter_trips(start_time=start_time, end_time=window_end, **kwargs):
+                trips += len(page)
+                yield page
+            self.observe(provider, start_time, window_end, trips)
+            logger.debug(
+                "MDSWindowPlanner::iter_trips() %s %s-%s: %s trips", provider, start_time, window_end, trips
+            )
+            start_time = window_end
@@ -0,0 +1,264 @@
+"""
+Class: MDSWindowQueue
+
+Author: Austin Transportation Department, Data and Technology Services
+
+Description: The purpose of this class is to share one pool of worker
+threads between the live pulls and the backfills of every provider. Each
+window is queued with a priority and pulled by the first free worker:
+
+    - Live windows (MDSWindowQueue.LIVE) always go before backfill windows
+      (MDSWindowQueue.BACKFILL). Windows being pulled are never interrupted,
+      a live window waits at most for one worker to finish its window.
+    - Within a priority, the provider with the fewest windows being pulled
+      goes first, then the one served least recently, so a provider with a
+      large backlog cannot starve the others.
+    - Within a provider, the newest window goes first.
+
+    queue = MDSWindowQueue(max_in_flight=2)
+    queue.start(workers=8)
+    backfill = MDSBackfill(providers=providers, sink=sink, queue=queue)
+    scheduler = MDSScheduler(providers=providers, sink=sink, queue=queue)
+
+put() returns a concurrent.futures.Future of the number of trips written, so
+a caller can wait for its own windows only. Queueing a window that is
+already pending returns its future, and promotes it if the new priority is
+higher.
+"""
+
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+
+from .MDSBackfill import MDSBackfill, _pull_window
+
+# Debug & Logging
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MDSWindowJob:
+    __slots__ = (
+        "provider",
+        "config",
+        "start_time",
+        "end_time",
+        "priority",
+        "sink",
+        "deadline",
+        "attempts",
+        "future",
+    )
+
+    def __init__(self, provider, config, start_time, end_time, priority, sink, deadline=None, attempts=2):
+        """
+        A window waiting in the queue
+        :param str provider: The provider name
+        :param dict config: The MDSClient configuration of the provider
+        :param int start_time: The start of the window in unix time
+        :param int end_time: The end of the window in unix time
+        :param int priority: MDSWindowQueue.LIVE or MDSWindowQueue.BACKFILL
+        :param MDSSink sink: Where the trips are written
+        :param float deadline: (Optional) The maximum time in seconds allowed for the window
+        :param int attempts: The number of times the window is tried
+        """
+        self.provider = provider
+        self.config = config
+        self.start_time = int(start_time)
+        self.end_time = int(end_time)
+        self.priority = priority
+        self.sink = sink
+        self.deadline = deadline
+        self.attempts = attempts
+        self.future = Future()
+
+
+class MDSWindowQueue:
+    LIVE = 0
+    BACKFILL = 1
+
+    def __init__(self, max_in_flight=None):
+        """
+        Initializes an empty queue
+        :param int max_in_flight: (Optional) The maximum number of windows of one provider pulled at the same time
+        """
+        self.max_in_flight = max_in_flight
+        self._condition = threading.Condition()
+        # {priority: {provider: heap of (-end_time, sequence, job)}}
+        self._pending = {}
+        # {(provider, start_time, end_time): job}, the jobs not taken by a worker yet
+        self._jobs = {}
+        self._in_flight = {}
+        self._last_served = {}
+        self._sequence = itertools.count()
+        self._closed = False
+        self._workers = []
+
+    def put(self, provider, config, start_time, end_time, sink, priority=BACKFILL, deadline=None, attempts=2):
+        """
+        Queues a window
+        :param str provider: The provider name
+        :param dict config: The MDSClient configuration of the provider
+        :param int start_time: The start of the window in unix time
+        :param int end_time: The end of the window in unix time
+        :param MDSSink sink: Where the trips are written
+        :param int priority: MDSWindowQueue.LIVE or MDSWindowQueue.BACKFILL
+        :param float deadline: (Optional) The maximum time in seconds allowed for the window
+        :param int attempts: The number of times the window is tried
+        :return Future: Resolves to the number of trips written, or to the exception of the pull
+        """
+        key = (provider, int(start_time), int(end_time))
+        with self._condition:
+            job = self._jobs.get(key)
+            if job is not None:
+                if priority < job.priority:
+                    # Promoted, the entry left in the lower priority is skipped when reached
+                    job.priority = priority
+                    self._push(job)
+                    self._condition.notify()
+                return job.future
+
+            job = MDSWindowJob(provider, config, start_time, end_time, priority, sink, deadline, attempts)
+            self._jobs[key] = job
+            self._push(job)
+            self._condition.notify()
+            return job.future
+
+    def put_range(self, provider, config, start_time, end_time, sink, priority=BACKFILL, window_size=3600, **kwargs):
+        """
+        Queues the windows of a range, planned for the provider's MDS version
+        :param str provider: The provider name
+        :param dict config: The MDSClient configuration of the provider
+        :param int start_time: The start of the range in unix time
+        :param int end_time: The end of the range in unix time
+        :param MDSSink sink: Where the trips are written
+        :param int priority: MDSWindowQueue.LIVE or MDSWindowQueue.BACKFILL
+        :param int window_size: The size in seconds of the 0.2.0 and 0.3.0 windows (0.4.0 is hourly)
+        :param dict kwargs: The deadline and attempts of the windows
+        :return dict: The futures by (start_time, end_time)
+        """
+        windows = MDSBackfill.plan_windows(MDSBackfill.get_version(config), start_time, end_time, window_size)
+        return {
+            window: self.put(provider, config, *window, sink=sink, priority=priority, **kwargs)
+            for window in windows
+        }
+
+    def _push(self, job):
+        heap = self._pending.setdefault(job.priority, {}).setdefault(job.provider, [])
+        heapq.heappush(heap, (-job.end_time, next(self._sequence), job))
+
+    def _pop(self):
+        """
+        Takes the next job, see the class description for the order
+        :return MDSWindowJob: The job, or None if no job can be pulled now
+        """
+        for priority in sorted(self._pending):
+            candidates = []
+            for provider, heap in self._pending[priority].items():
+                # Drop the entries of jobs promoted to another priority
+                while heap and heap[0][2].priority != priority:
+                    heapq.heappop(heap)
+                if not heap:
+                    continue
+                in_flight = self._in_flight.get(provider, 0)
+                if self.max_in_flight is not None and in_flight >= self.max_in_flight:
+                    continue
+                candidates.append((in_flight, self._last_served.get(provider, -1), provider))
+
+            if candidates:
+                provider = min(candidates)[2]
+                job = heapq.heappop(self._pending[priority][provider])[2]
+                del self._jobs[(job.provider, job.start_time, job.end_time)]
+                self._in_flight[provider] = self._in_flight.get(provider, 0) + 1
+                self._last_served[provider] = next(self._sequence)
+                return job
+        return None
+
+    def get(self, timeout=None):
+        """
+        Waits for the next job
+        :param float timeout: (Optional) The maximum time to wait in seconds
+        :return MDSWindowJob: The job, or None if the queue was closed or the timeout expired
+        """
+        with self._condition:
+            while not self._closed:
+                job = self._pop()
+                if job is not None:
+                    return job
+                if not self._condition.wait(timeout):
+                    return None
+            return None
+
+    def task_done(self, job):
+        """
+        Marks a job returned by get() as finished
+        :param MDSWindowJob job: The job
+        """
+        with self._condition:
+            self._in_flight[job.provider] -= 1
+            # A provider at its limit may take a job again
+            self._condition.notify()
+
+    def get_pending(self):
+        """
+        Returns the number of jobs waiting by priority
+        :return dict:
+        """
+        with self._condition:
+            pending = {}
+            for job in self._jobs.values():
+                pending[job.priority] = pending.get(job.priority, 0) + 1
+            return pending
+
+    def _work(self):
+        """
+        The loop of a worker thread
+        """
+        while True:
+            job = self.get()
+            if job is None:
+                return
+            if not job.future.set_running_or_notify_cancel():
+                self.task_done(job)
+                continue
+            try:
+                job.future.set_result(_pull_window(
+                    job.provider, job.config, job.start_time, job.end_time, job.sink,
+                    deadline=job.deadline, attempts=job.attempts,
+                ))
+            except Exception as e:
+                logger.debug(
+                    "MDSWindowQueue::_work() Failed %s %s-%s: %s", job.provider, job.start_time, job.end_time, e
+                )
+                job.future.set_exception(e)
+            finally:
+                self.task_done(job)
+
+    def start(self, workers=4):
+        """
+        Starts worker threads pulling the queued windows, each keeps one client per provider
+        :param int workers: The number of worker threads
+        """
+        for _ in range(workers):
+            thread = threading.Thread(target=self._work, name="mds-window-worker", daemon=True)
+            thread.start()
+            self._workers.append(thread)
+
+    def close(self, wait=True):
+        """
+        Stops the workers once their current window is pulled, pending windows are cancelled
+        :param bool wait: If True, waits for the workers to stop
+        """
+        with self._condition:
+            self._closed = True
+            for job in self._jobs.values():
+                job.future.cancel()
+            self._jobs = {}
+            self._pending = {}
+            self._condition.notify_all()
+        if wait:
+            for thread in self._workers:
+                thread.join()
+        self._workers = []
@@ -1,3 +1,36 @@
+import logging
+
 from .MDSClient import MDSClient
 from .MDSAuth import MDSAuth
 from .MDSTimeZone import MDSTimeZone
+from .MDSVersionProbe import MDSVersionProbe
+from .MDSException import MDSException, MDSPagingException, MDSDeadlineException
+from .MDSObserver import MDSObserver
+from .MDSMetrics import MDSMetrics
+from .MDSLogging import MDSLogging
+from .MDSProfiler import MDSProfiler
+from .MDSMockProvider import MDSMockProvider
+from .MDSTripFilter import MDSTripFilter
+from .MDSValidator import MDSTripValidator
+from .MDSChangeTracker import MDSChangeTracker
+from .MDSTransport import (
+    MDSTransport,
+    MDSTransportResponse,
+    MDSRequestsTransport,
+    MDSHttpxTransport,
+    MDSMemoryTransport,
+)
+from .MDSArchive import MDSArchive, MDSRecordingTransport, MDSReplayTransport
+from .MDSSink import MDSSink, MDSFileSink
+from .MDSAggregate import MDSQuantileSketch, MDSTripAggregate, MDSAggregateSink
+from .MDSTripSorter import MDSTripSorter
+from .MDSSpatialIndex import MDSSpatialIndex
+from .MDSBackfill import MDSBackfill
+from .MDSWindowPlanner import MDSWindowPlanner
+from .MDSScheduler import MDSScheduler
+from .MDSWindowQueue import MDSWindowQueue
+from .MDSJobStore import MDSJobStore, MDSSQLiteJobStore
+from .MDSJobWorker import MDSJobWorker
+
+# The library does not configure logging, applications do
+logging.getLogger(__name__).addHandler(logging.NullHandler())
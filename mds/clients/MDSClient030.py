@@ -16,9 +16,7 @@ from .MDSClientBase import MDSClientBase
 # Debug & Logging
 import logging
 
-logging.basicConfig(
-    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+logger = logging.getLogger(__name__)
 
 
 class MDSClient030(MDSClientBase):
@@ -39,6 +37,15 @@ class MDSClient030(MDSClientBase):
         "vehicle_id": "vehicle_id",
     }
 
+    # The endpoints of this version and the key of their records
+    endpoints = {
+        "trips": "trips",
+        "status_changes": "status_changes",
+    }
+
+    # The record times are in milliseconds
+    time_multiplier = 1000
+
     def __init__(self, config):
         MDSClientBase.__init__(self, config)
 
@@ -90,6 +97,8 @@ class MDSClient030(MDSClientBase):
         self,
         start_time,
         end_time,
+        deadline=None,
+        profile=False,
         **kwargs,
     ):
         """
@@ -98,90 +107,57 @@ class MDSClient030(MDSClientBase):
         :param int end_time: The end time in unix format
         :param str vehicle_id: (Optional) The vehicle ID
         :param str bbox: (Optional) Specify a bounding box (e.g., bbox="-122.4183,37.7758,-122.4120,37.7858")
-        :param bool paging: (Optional) An override to paging. Set to True to enable it.
+        :param float deadline: (Optional) The maximum time in seconds allowed for the whole pull,
+            raises MDSDeadlineException with the partial result and a resume cursor when it expires.
+        :param bool profile: (Optional) If True, the envelope includes a "profile" report of the pull.
+        :param list fields: (Optional) The keys of the trips to keep (e.g., ["trip_id", "end_time"]).
+        :param MDSTripFilter trip_filter: (Optional) Drops the trips the provider should have filtered out.
         :return dict:
         """
-        logging.debug(
-            "MDSClient030::get_trips() Getting trips: %s %s "
-            % (start_time, end_time)
+        logger.debug(
+            "MDSClient030::get_trips() Getting trips: %s %s", start_time, end_time
         )
+        return self.get_endpoint("trips", start_time, end_time, deadline=deadline, profile=profile, **kwargs)
 
-        self._load_params(
-            start_time=start_time,
-            end_time=end_time
-        )
+    def iter_trips(self, start_time, end_time, deadline=None, profile=False, **kwargs):
+        """
+        Yields the trips of each page as soon as the page is downloaded
+        :param int start_time: The start time in unix format
+        :param int end_time: The end time in unix format
+        :param float deadline: (Optional) The maximum time in seconds allowed for the whole pull
+        :param profile: (Optional) True to log a profile of the pull, or an MDSProfiler instance
+        :param list fields: (Optional) The keys of the trips to keep (e.g., ["trip_id", "end_time"])
+        :param MDSTripFilter trip_filter: (Optional) Drops the trips the provider should have filtered out
+        :param conditional: (Optional) Makes conditional requests for the pages downloaded before
+        :return generator: Yields a list of trips per page
+        """
+        return self.iter_endpoint("trips", start_time, end_time, deadline=deadline, profile=profile, **kwargs)
 
-        # Out trips accumulator
-        trips_accumulator = []
-        # Contains our MDS endpoint with /trips path
-        current_endpoint = f"{self.mds_endpoint}/trips"
-        # A flag whose value is True if there is more data to download
-        has_next_link = False
-
-        # Start an endless loop
-        while True:
-
-            # 1. Make the HTTP Request
-            data = self._request(
-                mds_endpoint=current_endpoint,
-                headers=self.headers,
-                params=None if has_next_link else self.params,
-            )
-
-            # 2. Check if we have a next link
-            has_next_link = self._has_next_link(data)
-
-            # 3. If the data has trips, process them.
-            if self._has_trips(data):
-                # Gather the trips from `data`
-                trips = data["payload"]["data"]["trips"]
-                # Append the trips to the current list
-                trips_accumulator += trips
-                # Wipe out the current trips variable and start over
-                trips = None
-
-            # 4. Quit loop if not paging
-            if self.paging is False:
-                logging.debug("MDSClient030::get_trips() Paging set to False, stopping request...")
-                break
-
-            # 5. The `next` link becomes our new endpoint
-            current_endpoint = self._get_next_link(data)
-
-            # 6. If the endpoint is None, then quit loop
-            if current_endpoint:
-                logging.debug(
-                    "MDSClient030::get_trips() Next link: %s" % current_endpoint
-                )
-            else:
-                break
-
-        # Return trips in this envelope:
-        return {
-            "version": self._get_response_version(data),
-            "data": {
-                "trips": trips_accumulator
-            }
+    def _get_params(self, endpoint, start_time, end_time, **kwargs):
+        """
+        Builds the URI parameters of an endpoint, see MDSClientBase._get_params
+        :param str endpoint: "trips" or "status_changes"
+        :param int start_time: The start time in unix format
+        :param int end_time: The end time in unix format
+        :param dict kwargs: Any additional parameters to be taken as HTTP param.
+        :return dict:
+        """
+        params = {
+            "start_time": int(round(start_time * 1000)),
+            "end_time": int(round(end_time * 1000)),
+            **kwargs
         }
+        # Trips are queried by end time, status changes by event time (start_time and end_time)
+        schema = self.param_schema if endpoint == "trips" else {}
+        return {schema.get(key, key): value for key, value in params.items()}
 
     def _load_params(self, start_time, end_time, **kwargs):
         """
         Takes the parameters from the configuration and start time
         and loads them into our self.params dictionary.
-        :param int start_time: The min_time_end hour we need data for (as specified in MDS 0.3.0)
-        :param int end_time: The max_time_end hour we need data for (as specified in MDS 0.3.0)
+        :param int start_time: The min_end_time we need data for (as specified in MDS 0.3.0)
+        :param int end_time: The max_end_time we need data for (as specified in MDS 0.3.0)
         :param dict kwargs: Any additional parameters to be taken as HTTP param.
         :return:
         """
-
-        params = {
-            **{
-                "start_time": int(round(start_time * 1000)),
-                "end_time": int(round(end_time * 1000))
-            },
-            **kwargs
-        }
-
-        # Set the required URI parameters
-        for key, value in params.items():
-            self.params[self.param_schema[key]] = value
+        self.params.update(self._get_params("trips", start_time, end_time, **kwargs))
@@ -10,15 +10,22 @@ The application requires the requests library:
     https://pypi.org/project/requests/
 """
 
+import json
+import threading
 import time
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from urllib3.util.request import ACCEPT_ENCODING
+
+from ..MDSException import MDSException, MDSPagingException, MDSDeadlineException
+from ..MDSLogging import MDSLogging
+from ..MDSProfiler import MDSProfiler
+from ..MDSTransport import MDSTransport
+from ..MDSValidator import MDSTripValidator
 
 # Debug & Logging
 import logging
 
-logging.basicConfig(
-    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+logger = logging.getLogger(__name__)
 
 
 class MDSClientBase:
@@ -33,17 +40,50 @@ class MDSClientBase:
         "delay",
         "timeout",
         "max_attempts",
+        "observers",
+        "transport",
+        "validator",
+        "_pace_lock",
+        "_next_request_at",
     )
 
+    # The endpoints served by the version: {endpoint: the key of its records in the payload's data}
+    endpoints = {}
+
+    # Multiplies unix seconds into the unit of the record times (1000 for milliseconds)
+    time_multiplier = 1
+
+    # The encodings urllib3 can decode: gzip and deflate, plus br and zstd
+    # when the brotli and zstandard packages are installed
+    accept_encoding = ACCEPT_ENCODING
+
     def __init__(self, config):
         self.config = config
-        self.headers = {}
+        # Compressed bodies are decoded as they stream in, "compression": False asks for plain bodies
+        self.headers = {
+            "Accept-Encoding": self.accept_encoding if self.config.get("compression", True) else "identity"
+        }
         self.params = {}
         self.mds_endpoint = self.config.get("mds_api_url", None)
         self.paging = self.config.get("paging", True)
         self.delay = self.config.get("delay", 0)
-        self.timeout = self.config.get("interval", None)
+        # "interval" is the legacy name of the "timeout" setting
+        self.timeout = self.config.get("timeout", self.config.get("interval", None))
         self.max_attempts = self.config.get("max_attempts", 3)
+        # Instances of MDSObserver to be notified of the client's events
+        self.observers = list(self.config.get("observers", []))
+        # The HTTP backend: "requests" (default), "http2" or an MDSTransport instance
+        self.transport = MDSTransport.get_transport(
+            self.config.get("transport", None), **self.config.get("transport_options", {})
+        )
+        # Checks the trips against the schema of the version: "full", "first_page" or {"mode": "sampled", ...}
+        validation = self.config.get("validation", None)
+        self.validator = (
+            MDSTripValidator.from_config(getattr(self, "version", None), validation) if validation else None
+        )
+        # The delay paces the requests of concurrent pulls too (see _get_delay)
+        self._pace_lock = threading.Lock()
+        self._next_request_at = 0
 
     @staticmethod
     def _build_response(response):
@@ -57,73 +97,177 @@ class MDSClientBase:
         # to handle 301 and 302 redirect responses.
         status_code = response.status_code if hasattr(response, "status_code") else -1
         success = status_code == 200
-        message = response.content if hasattr(response, "content") else "No response message provided."
+        logger.debug("MDSClientBase::_build_response() status_code: %s", status_code)
 
-        logging.debug(
-            f"MDSClientBase::_build_response() status_code: {status_code}"
-        )
+        # The validators of the page, sent back in conditional requests (see _iter_pages)
+        headers = getattr(response, "headers", None) or {}
+        validators = {
+            "etag": headers.get("ETag", headers.get("etag", None)),
+            "last_modified": headers.get("Last-Modified", headers.get("last-modified", None)),
+        }
+        if status_code == 304:
+            # The page did not change since the validators were sent, it has no body
+            return {
+                "status_code": status_code,
+                "response": "not_modified",
+                "message": "Not modified",
+                "payload": {},
+                **validators,
+            }
 
+        message = response.content if hasattr(response, "content") else "No response message provided."
         return {
             "status_code": status_code,
             "response": "success" if success else "error",
             "message": "success" if success else f"Error: {message}",
             "payload": response.json() if success else {},
+            **validators,
         }
 
-    def _request(self, mds_endpoint, **kwargs):
+    @staticmethod
+    def _get_wire_bytes(response, bytes_received):
+        """
+        Returns the size of the body as transferred, before decompression
+        :param object response: As provided by the transport, with its body read
+        :param int bytes_received: The size of the decoded body
+        :return int:
+        """
+        # urllib3 and httpx count the bytes read from the socket, in-memory responses are plain
+        raw = getattr(response, "raw", None)
+        if callable(getattr(raw, "tell", None)):
+            return raw.tell()
+        return getattr(response, "num_bytes_downloaded", bytes_received)
+
+    @staticmethod
+    def _get_time_left(expires_at):
+        """
+        Returns the number of seconds left before the deadline expires
+        :param float expires_at: The deadline as a time.monotonic() value, or None
+        :return float: The seconds left, or None if there is no deadline
+        """
+        return None if expires_at is None else expires_at - time.monotonic()
+
+    def _get_delay(self):
+        """
+        Returns the time to wait before a request: the configured delay, stretched so the
+        requests of concurrent pulls of this client (see get_endpoints) also start `delay` apart
+        :return float: The time to wait in seconds
+        """
+        if not self.delay:
+            return 0
+        with self._pace_lock:
+            now = time.monotonic()
+            request_at = max(now + self.delay, self._next_request_at)
+            self._next_request_at = request_at + self.delay
+        return request_at - now
+
+    def _sleep(self, seconds, attempt, observers=None):
+        """
+        Waits before an attempt, the time is reported as "delay" before the first
+        attempt and as "backoff" before a retry.
+        :param float seconds: The time to wait in seconds
+        :param int attempt: The attempt about to be made, starting at 1
+        :param tuple observers: (Optional) The observers of the pull, those of the client by default
+        """
+        observers = self.observers if observers is None else observers
+        if observers:
+            sleep_start = time.perf_counter()
+            time.sleep(seconds)
+            self._notify(
+                "on_sleep",
+                observers=observers,
+                seconds=time.perf_counter() - sleep_start,
+                kind="delay" if attempt == 1 else "backoff",
+            )
+        else:
+            time.sleep(seconds)
+
+    def _request(self, mds_endpoint, expires_at=None, observers=None, **kwargs):
         """
         Makes an HTTP request
         :param str mds_endpoint: The URL endpoint to make the request to
+        :param float expires_at: (Optional) The deadline as a time.monotonic() value
+        :param tuple observers: (Optional) The observers of the pull, those of the client by default
         :param dict params: (Optional) URI Parameters to add to the request
         :param dict headers: (Optional) A dictionary of HTTP headers to pass to the request
         :return dict:
         """
-        logging.debug(f"\nMDSClientBase::__request() Making request...")
-
         # Load our endpoint, parameters and headers
         mds_params = kwargs.get("params", {})
         mds_headers = kwargs.get("headers", {})
 
+        observers = self.observers if observers is None else observers
+
         # Manage our current attempt to make an HTTP request
         current_attempts = 0
 
-        # Log our current values
-        logging.debug(f"MDSClientBase::__request() Details:")
-        logging.debug(f"MDSClientBase::__request() mds_endpoint: {mds_endpoint}")
-        logging.debug(f"MDSClientBase::__request() mds_params: {mds_params}")
-        logging.debug(f"MDSClientBase::__request() mds_headers: {mds_headers}\n")
+        # Log our current values, without credentials
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "MDSClientBase::_request() Making request: mds_endpoint: %s, mds_params: %s, mds_headers: %s",
+                mds_endpoint, mds_params, MDSLogging.redact_headers(mds_headers)
+            )
 
         # We are going to try N times as specified in self.max_attempts
         while True:
             # Increase current attempt
             current_attempts += 1
 
-            # Wait N seconds as specified in `self.delay`
-            time.sleep(self.delay)
+            # Wait N seconds as specified in `self.delay`, but never past the deadline
+            time_left = self._get_time_left(expires_at)
+            delay = self._get_delay()
+            if time_left is None:
+                self._sleep(delay, current_attempts, observers)
+                timeout = self.timeout
+            else:
+                self._sleep(max(min(delay, time_left), 0), current_attempts, observers)
+                time_left = self._get_time_left(expires_at)
+                if time_left <= 0:
+                    raise MDSDeadlineException(
+                        "MDSClientBase::_request() Deadline expired before attempt %s at endpoint '%s'"
+                        % (current_attempts, mds_endpoint)
+                    )
+                # The request may not outlive the deadline
+                timeout = time_left if self.timeout is None else min(self.timeout, time_left)
+
+            # Size and timings of the request phases, only measured when observed
+            bytes_received = 0
+            wire_bytes = 0
+            content_encoding = None
+            timings = {}
 
             # Let's try to make an HTTP request
             try:
-                logging.debug(
-                    "MDSClientBase::__request() Attempting request: %s/%s -- Timeout %s, Paging: %s, Delay: %s"
-                    % (
-                        current_attempts, self.max_attempts, self.timeout, self.paging, self.delay
-                    )
+                logger.debug(
+                    "MDSClientBase::_request() Attempting request: %s/%s -- Timeout %s, Paging: %s, Delay: %s",
+                    current_attempts, self.max_attempts, timeout, self.paging, self.delay
                 )
-                # Make actual request
-                response = requests.get(
+                if observers:
+                    self._notify("on_request_start", observers=observers, mds_endpoint=mds_endpoint, attempt=current_attempts)
+                    request_start = time.perf_counter()
+                # Make actual request, it returns as soon as the headers are received
+                response = self.transport.get(
                     mds_endpoint,
                     params=mds_params,
                     headers=mds_headers,
-                    timeout=self.timeout,
+                    timeout=timeout,
+                    stream=True,
                 )
+                if observers:
+                    timings["ttfb"] = time.perf_counter() - request_start
+                    # Download the body now, so it can be told apart from decoding
+                    bytes_received = len(response.content)
+                    wire_bytes = self._get_wire_bytes(response, bytes_received)
+                    content_encoding = response.headers.get("Content-Encoding", "identity")
+                    timings["download"] = time.perf_counter() - request_start - timings["ttfb"]
                 # Build a data json response
                 data = self._build_response(response)
+                if observers:
+                    timings["decode"] = time.perf_counter() - request_start - timings["ttfb"] - timings["download"]
 
             # There was an exception, timeout or otherwise:
             except Exception as e:
-                logging.debug(
-                    "MDSClientBase::__request() Exception detected: %s" % (str(e))
-                )
+                logger.debug("MDSClientBase::_request() Exception detected: %s", e)
                 data = {
                     "status_code": -1,
                     "response": "error",
@@ -131,40 +275,501 @@ class MDSClientBase:
                     "payload": {},
                 }
 
-            success = data.get("response", "error") == "success"
-            logging.debug(
-                "MDSClientBase::__request() Reported status: %s" % success
-            )
+            if observers:
+                self._notify(
+                    "on_request_end",
+                    observers=observers,
+                    mds_endpoint=mds_endpoint,
+                    attempt=current_attempts,
+                    status_code=data["status_code"],
+                    elapsed=time.perf_counter() - request_start,
+                    bytes_received=bytes_received,
+                    wire_bytes=wire_bytes,
+                    content_encoding=content_encoding,
+                    **timings
+                )
+
+            success = data.get("response", "error") in ("success", "not_modified")
+            logger.debug("MDSClientBase::_request() Reported status: %s", success)
 
             # Check if we have an error
             if success:
                 break
             else:
                 # First, log the response error
-                logging.debug(
-                    "MDSClientBase::__request() Unable to make request: %s"
-                    % (data.get("message", "No error message provided"))
+                logger.debug(
+                    "MDSClientBase::_request() Unable to make request: %s",
+                    data.get("message", "No error message provided")
                 )
                 # Check if we still have attempts left
                 if current_attempts < self.max_attempts:
+                    if observers:
+                        self._notify(
+                            "on_retry",
+                            observers=observers,
+                            mds_endpoint=mds_endpoint,
+                            attempt=current_attempts,
+                            message=data.get("message", None),
+                        )
                     continue  # Try again in next iteration
+                elif expires_at is not None and self._get_time_left(expires_at) <= 0:
+                    # The last attempt was cut short by the deadline, not refused by the provider
+                    raise MDSDeadlineException(
+                        "MDSClientBase::_request() Deadline expired during attempt %s at endpoint '%s'"
+                        % (current_attempts, mds_endpoint)
+                    )
                 else:
                     # We need to stop the execution, it seems we have a problem
-                    raise Exception(
+                    raise MDSPagingException(
                         "Max attempts reached (%s): could not fetch MDS data at endpoint '%s'"
                         % (self.max_attempts, mds_endpoint)
                     )
 
         return data
 
+    def _start_profiler(self, profile):
+        """
+        Starts a profiler for the current pull, it only observes this pull (see _iter_pages)
+        :param profile: True for a new MDSProfiler, an MDSProfiler instance, or False/None
+        :return MDSProfiler: The running profiler, or None if not profiling
+        """
+        if not profile:
+            return None
+        profiler = MDSProfiler() if profile is True else profile
+        profiler.start(provider=self.config.get("provider", None))
+        return profiler
+
+    def _stop_profiler(self, profiler):
+        """
+        Stops a profiler, its report is logged at INFO level
+        :param MDSProfiler profiler: The profiler returned by _start_profiler
+        :return dict: The profiling report
+        """
+        report = profiler.stop()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("MDSClientBase::_stop_profiler() Profile: %s", json.dumps(report))
+        return report
+
+    def _iter_pages(
+        self,
+        mds_endpoint,
+        params,
+        data_key="trips",
+        deadline=None,
+        profile=None,
+        fields=None,
+        trip_filter=None,
+        conditional=None,
+    ):
+        """
+        Downloads every page of an MDS endpoint by following the `next` links,
+        yielding the records of each page as soon as it is parsed.
+        :param str mds_endpoint: The URL of the first page
+        :param dict params: The URI parameters for the first page
+        :param str data_key: The key in the payload's data that holds the records (e.g., "trips")
+        :param float deadline: (Optional) The maximum time in seconds allowed for the whole pull
+        :param profile: (Optional) True or an MDSProfiler instance to profile the pull
+        :param list fields: (Optional) The keys of the records to keep, the others are dropped page by page
+        :param MDSTripFilter trip_filter: (Optional) Drops the trips the provider should have filtered out
+        :param conditional: (Optional) Makes conditional requests, see MDSChangeTracker. Its get_validators(page_key)
+            returns the "etag", "last_modified" and "next_link" of the page as last downloaded, or None, and its
+            on_page(page_key, data, records, next_link) is called with every page. Pages that did not change
+            (304) have no records and data["response"] == "not_modified".
+        :return generator: Yields (records, data) tuples, where data is the page as provided by self._request
+        """
+        expires_at = None if deadline is None else time.monotonic() + deadline
+        profiler = self._start_profiler(profile)
+        # The observers of this pull: concurrent pulls of the client do not see each other's profiler
+        observers = tuple(self.observers)
+        if profiler:
+            observers += (profiler,)
+
+        # The cursor points to the next page to download
+        cursor = {"mds_endpoint": mds_endpoint, "params": params, "data_key": data_key}
+        if fields:
+            fields = tuple(fields)
+            cursor["fields"] = fields
+        pages = 0
+        filtered = 0
+
+        try:
+            while cursor:
+                if observers:
+                    page_start = time.perf_counter()
+
+                # 1. Make the HTTP Request, conditional if the page was downloaded before
+                headers = self.headers
+                validators = None
+                if conditional is not None:
+                    page_key = MDSTransport.get_request_key(cursor["mds_endpoint"], cursor["params"])
+                    validators = conditional.get_validators(page_key)
+                    if validators:
+                        headers = {**headers, **self._get_conditional_headers(validators)}
+                try:
+                    data = self._request(
+                        mds_endpoint=cursor["mds_endpoint"],
+                        headers=headers,
+                        params=cursor["params"],
+                        expires_at=expires_at,
+                        observers=observers,
+                    )
+                except MDSPagingException as e:
+                    # Stop the pull, the cursor tells where to resume from
+                    raise e.__class__(str(e), cursor=cursor, pages=pages) from e
+                pages += 1
+
+                # 2. Gather the records from `data`, if any
+                if observers:
+                    extract_start = time.perf_counter()
+                not_modified = data["response"] == "not_modified"
+                records = data.get("payload", {}).get("data", {}).get(data_key, [])
+                if self.validator is not None and data_key == "trips" and records:
+                    # The violations are counted, the page goes on as provided
+                    self.validator.validate(records, first_page=pages == 1)
+                if trip_filter is not None and records:
+                    received = len(records)
+                    records = trip_filter.apply(records, self.time_multiplier)
+                    filtered += received - len(records)
+                if fields and records:
+                    records = self._project(records, fields)
+                if (trip_filter is not None or fields) and data_key in data.get("payload", {}).get("data", {}):
+                    # The page keeps what is yielded, so the dropped values are freed now
+                    data["payload"]["data"][data_key] = records
+
+                if observers:
+                    page_end = time.perf_counter()
+                    self._notify(
+                        "on_page",
+                        observers=observers,
+                        mds_endpoint=cursor["mds_endpoint"],
+                        data_key=data_key,
+                        page=pages,
+                        records=len(records),
+                        elapsed=page_end - page_start,
+                        extract=page_end - extract_start,
+                    )
+
+                # 3. The `next` link becomes our new cursor, quit loop if there is none or not paging
+                if self.paging is False:
+                    next_link = None
+                elif not_modified:
+                    # A page that did not change links to the same next page
+                    next_link = validators.get("next_link", None)
+                else:
+                    next_link = self._get_next_link(data)
+                if next_link:
+                    logger.debug("MDSClientBase::_iter_pages() Next link: %s", next_link)
+                    if observers:
+                        self._notify("on_paging_step", observers=observers, next_link=next_link, page=pages)
+                    cursor = {"mds_endpoint": next_link, "params": None, "data_key": data_key}
+                    if fields:
+                        cursor["fields"] = fields
+                else:
+                    cursor = None
+
+                if conditional is not None:
+                    conditional.on_page(page_key, data, records, next_link)
+                yield records, data
+        finally:
+            if filtered:
+                logger.info(
+                    "MDSClientBase::_iter_pages() Dropped %s records the provider should have filtered out: %s",
+                    filtered, mds_endpoint
+                )
+            if profiler:
+                self._stop_profiler(profiler)
+
+    @staticmethod
+    def _get_conditional_headers(validators):
+        """
+        Returns the headers of a conditional request
+        :param dict validators: The "etag" and "last_modified" of the page as last downloaded
+        :return dict: If-None-Match and If-Modified-Since, for the validators known
+        """
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    @staticmethod
+    def _project(records, fields):
+        """
+        Keeps the given keys of each record, the keys a record lacks are left out
+        :param list records: The records of a page
+        :param tuple fields: The keys to keep
+        :return list: New records
+        """
+        return [{key: record[key] for key in fields if key in record} for record in records]
+
+    def _get_paged_data(
+        self,
+        mds_endpoint,
+        params,
+        data_key="trips",
+        deadline=None,
+        result=None,
+        profile=False,
+        fields=None,
+        trip_filter=None,
+    ):
+        """
+        Downloads every page of an MDS endpoint and returns all of the records.
+        :param str mds_endpoint: The URL of the first page
+        :param dict params: The URI parameters for the first page
+        :param str data_key: The key in the payload's data that holds the records (e.g., "trips")
+        :param float deadline: (Optional) The maximum time in seconds allowed for the whole pull
+        :param dict result: (Optional) A partial result to be extended with the new pages
+        :param bool profile: (Optional) If True, the envelope includes a "profile" report of the pull
+        :param list fields: (Optional) The keys of the records to keep
+        :param MDSTripFilter trip_filter: (Optional) Drops the trips the provider should have filtered out,
+            the envelope then includes the number of trips dropped as "filtered"
+        :return dict:
+        """
+        profiler = MDSProfiler() if profile else None
+        dropped_before = trip_filter.get_dropped() if trip_filter is not None else 0
+
+        # Our records accumulator, seeded with the partial result (if any)
+        records_accumulator = list(result["data"][data_key]) if result else []
+        # The last page we downloaded
+        data = {}
+
+        try:
+            for records, data in self._iter_pages(
+                mds_endpoint=mds_endpoint,
+                params=params,
+                data_key=data_key,
+                deadline=deadline,
+                profile=profiler,
+                fields=fields,
+                trip_filter=trip_filter,
+            ):
+                records_accumulator += records
+        except MDSPagingException as e:
+            # Hand back what we have so far
+            e.result = {
+                "version": self._get_response_version(data),
+                "data": {data_key: records_accumulator},
+            }
+            if profiler:
+                e.result["profile"] = profiler.get_report()
+            raise
+
+        # Return records in this envelope:
+        envelope = {
+            "version": self._get_response_version(data),
+            "data": {data_key: records_accumulator},
+        }
+        if profiler:
+            envelope["profile"] = profiler.get_report()
+        if trip_filter is not None:
+            envelope["filtered"] = trip_filter.get_dropped() - dropped_before
+        return envelope
+
+    def _get_params(self, endpoint, start_time, end_time, **kwargs):
+        """
+        Builds the URI parameters of an endpoint for a time window, implemented by each version
+        :param str endpoint: The endpoint name (e.g., "trips", "status_changes")
+        :param int start_time: The start time in unix format, ignored by hourly endpoints
+        :param int end_time: The end time in unix format
+        :param dict kwargs: Any additional parameters to be taken as HTTP param
+        :return dict: A new dictionary, so concurrent pulls do not share their parameters
+        """
+        raise NotImplementedError
+
+    def _get_endpoint_url(self, endpoint, trip_filter=None):
+        """
+        Returns the URL of an endpoint served by the version
+        :param str endpoint: The endpoint name
+        :param MDSTripFilter trip_filter: (Optional) A filter, only trips can be filtered
+        :return str:
+        """
+        if endpoint not in self.endpoints:
+            raise MDSException(
+                f"MDSClientBase::_get_endpoint_url() Endpoint '{endpoint}' is not available in version "
+                f"{getattr(self, 'version', None)}, available: {', '.join(self.endpoints)}"
+            )
+        if trip_filter is not None and self.endpoints[endpoint] != "trips":
+            raise MDSException(f"MDSClientBase::_get_endpoint_url() Endpoint '{endpoint}' has no trips to filter")
+        return f"{self.mds_endpoint}/{endpoint}"
+
+    @staticmethod
+    def _get_filter_params(trip_filter, params):
+        """
+        Adds the query parameters of a filter, the explicit parameters take precedence
+        :param MDSTripFilter trip_filter: The filter, or None
+        :param dict params: The explicit parameters
+        :return dict:
+        """
+        if trip_filter is None:
+            return params
+        return {**trip_filter.get_params(), **params}
+
+    def get_endpoint(
+        self,
+        endpoint,
+        start_time=None,
+        end_time=None,
+        deadline=None,
+        profile=False,
+        fields=None,
+        trip_filter=None,
+        **kwargs
+    ):
+        """
+        Returns every record of an endpoint for a time window
+        :param str endpoint: The endpoint name (e.g., "trips", "status_changes")
+        :param int start_time: The start time in unix format, ignored by hourly endpoints
+        :param int end_time: The end time in unix format
+        :param float deadline: (Optional) The maximum time in seconds allowed for the whole pull
+        :param bool profile: (Optional) If True, the envelope includes a "profile" report of the pull
+        :param list fields: (Optional) The keys of the records to keep (e.g., ["trip_id", "end_time"])
+        :param MDSTripFilter trip_filter: (Optional) Sends its parameters and drops the trips that fail it
+        :param dict kwargs: Any additional parameters to be taken as HTTP param
+        :return dict:
+        """
+        return self._get_paged_data(
+            mds_endpoint=self._get_endpoint_url(endpoint, trip_filter),
+            params=self._get_params(endpoint, start_time, end_time, **self._get_filter_params(trip_filter, kwargs)),
+            data_key=self.endpoints[endpoint],
+            deadline=deadline,
+            profile=profile,
+            fields=fields,
+            trip_filter=trip_filter,
+        )
+
+    def iter_endpoint(
+        self,
+        endpoint,
+        start_time=None,
+        end_time=None,
+        deadline=None,
+        profile=False,
+        fields=None,
+        trip_filter=None,
+        conditional=None,
+        **kwargs
+    ):
+        """
+        Yields the records of each page of an endpoint as soon as the page is downloaded
+        :param str endpoint: The endpoint name (e.g., "trips", "status_changes")
+        :param int start_time: The start time in unix format, ignored by hourly endpoints
+        :param int end_time: The end time in unix format
+        :param float deadline: (Optional) The maximum time in seconds allowed for the whole pull
+        :param profile: (Optional) True to log a profile of the pull, or an MDSProfiler instance
+        :param list fields: (Optional) The keys of the records to keep (e.g., ["trip_id", "end_time"])
+        :param MDSTripFilter trip_filter: (Optional) Sends its parameters and drops the trips that fail it
+        :param conditional: (Optional) Makes conditional requests for the pages downloaded before (see _iter_pages)
+        :param dict kwargs: Any additional parameters to be taken as HTTP param
+        :return generator: Yields a list of records per page, empty for the pages that did not change
+        """
+        mds_endpoint = self._get_endpoint_url(endpoint, trip_filter)
+        for records, data in self._iter_pages(
+            mds_endpoint=mds_endpoint,
+            params=self._get_params(endpoint, start_time, end_time, **self._get_filter_params(trip_filter, kwargs)),
+            data_key=self.endpoints[endpoint],
+            deadline=deadline,
+            profile=profile,
+            fields=fields,
+            trip_filter=trip_filter,
+            conditional=conditional,
+        ):
+            yield records
+
+    def get_endpoints(self, endpoints, start_time=None, end_time=None, deadline=None, **kwargs):
+        """
+        Returns every record of several endpoints for the same time window, pulled concurrently.
+        The pulls share the authentication, the connection pool and the request pacing of the client.
+        :param list endpoints: The endpoint names (e.g., ["trips", "status_changes"])
+        :param int start_time: The start time in unix format, ignored by hourly endpoints
+        :param int end_time: The end time in unix format
+        :param float deadline: (Optional) The maximum time in seconds allowed for each pull
+        :param dict kwargs: The fields to keep and the trip filter (see get_endpoint), and any additional HTTP params
+        :return dict: The envelope of each endpoint, by endpoint name. If a pull fails, its
+            exception is raised once the other pulls are done.
+        """
+        # Fail before starting any pull
+        for endpoint in endpoints:
+            self._get_endpoint_url(endpoint)
+
+        with ThreadPoolExecutor(max_workers=max(len(endpoints), 1), thread_name_prefix="mds-endpoint") as executor:
+            futures = {
+                endpoint: executor.submit(
+                    self.get_endpoint, endpoint, start_time, end_time, deadline=deadline, **kwargs
+                )
+                for endpoint in endpoints
+            }
+        results = {}
+        for endpoint, future in futures.items():
+            # The first failure in endpoint order, MDSPagingException carries its partial result
+            results[endpoint] = future.result()
+        return results
+
+    def get_status_changes(self, start_time=None, end_time=None, deadline=None, profile=False, **kwargs):
+        """
+        Returns the status changes for a time window
+        :param int start_time: The start time in unix format, ignored by hourly versions
+        :param int end_time: The end time in unix format
+        :param float deadline: (Optional) The maximum time in seconds allowed for the whole pull
+        :param bool profile: (Optional) If True, the envelope includes a "profile" report of the pull
+        :return dict:
+        """
+        return self.get_endpoint(
+            "status_changes", start_time, end_time, deadline=deadline, profile=profile, **kwargs
+        )
+
+    def resume(self, cursor, result=None, deadline=None, trip_filter=None):
+        """
+        Resumes a paged pull from the cursor of an MDSPagingException
+        :param dict cursor: The cursor as provided by MDSPagingException.cursor
+        :param dict result: (Optional) The partial result (MDSPagingException.result) to be extended
+        :param float deadline: (Optional) The maximum time in seconds allowed for the rest of the pull
+        :param MDSTripFilter trip_filter: (Optional) The filter of the failed pull, if any
+        :return dict:
+        """
+        logger.debug("MDSClientBase::resume() Resuming from: %s", cursor["mds_endpoint"])
+        return self._get_paged_data(
+            mds_endpoint=cursor["mds_endpoint"],
+            params=cursor["params"],
+            data_key=cursor.get("data_key", "trips"),
+            deadline=deadline,
+            result=result,
+            fields=cursor.get("fields", None),
+            trip_filter=trip_filter,
+        )
+
+    def add_observer(self, observer):
+        """
+        Registers an instance of MDSObserver to be notified of the client's events
+        :param MDSObserver observer: The observer to be registered
+        """
+        self.observers.append(observer)
+
+    def _notify(self, event, observers=None, **kwargs):
+        """
+        Calls the given event on every observer. Observer errors are logged and
+        never interrupt the pull.
+        :param str event: The name of the event method (e.g., "on_request_end")
+        :param tuple observers: (Optional) The observers of the pull, those of the client by default
+        :param dict kwargs: The event data
+        """
+        provider = self.config.get("provider", None)
+        for observer in self.observers if observers is None else observers:
+            try:
+                getattr(observer, event)(provider=provider, **kwargs)
+            except Exception as e:
+                logger.debug("MDSClientBase::_notify() Observer failed on %s: %s", event, e)
+
     def set_header(self, key, value):
         """
         Adds an HTTP header to the list
         :param str key: The name of the header
         :param str value: The value of the HTTP header
         """
-        logging.debug(
-            f"MDSClientBase::set_header() Set header k: '{key}', v: '{value}'"
+        logger.debug(
+            "MDSClientBase::set_header() Set header k: '%s', v: '%s'",
+            key, MDSLogging.redact_headers({key: value})[key]
         )
         self.headers[key] = value
 
@@ -174,11 +779,11 @@ class MDSClientBase:
         :param dict headers: (Optional) Adds any additional headers to the list (e.g., authentication headers)
         """
         # 1. Consolidate current headers and new headers
-        logging.debug("MDSClientBase::render_settings() Rendering headers")
+        logger.debug("MDSClientBase::render_settings() Rendering headers")
         self.headers = {**self.headers, **headers}
 
         # 2. Initialize Param Schema & Overrides
-        logging.debug("MDSClientBase::render_settings() Rendering parameters")
+        logger.debug("MDSClientBase::render_settings() Rendering parameters")
         params_override = self.config.get("mds_param_override", None)
         if isinstance(params_override, dict):
             for key, value in params_override.items():
@@ -212,6 +817,13 @@ class MDSClientBase:
         """
         self.timeout = timeout
 
+    def set_transport(self, transport):
+        """
+        Allows to override the transport used to make HTTP requests
+        :param transport: "requests", "http2" or an MDSTransport instance
+        """
+        self.transport = MDSTransport.get_transport(transport)
+
     def set_max_attempts(self, max_attempts):
         """
         Allows to override the max_attempts configuration
@@ -13,6 +13,17 @@ setuptools.setup(
       'requests',
       'pytz',
     ],
+    extras_require={
+      'http2': ['httpx[http2]'],
+      'spatial': ['numpy'],
+    },
+    entry_points={
+      'console_scripts': [
+        'mds-backfill=mds.MDSBackfill:main',
+        'mds-scheduler=mds.MDSScheduler:main',
+        'mds-jobs=mds.MDSJobWorker:main',
+      ],
+    },
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/cityofaustin/atd-mds-client/tree/atd-mds-client",
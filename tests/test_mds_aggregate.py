@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+# Required Libraries
+import json
+import random
+
+from parent_directory import *
+from mds.MDSAggregate import MDSQuantileSketch, MDSTripAggregate, MDSAggregateSink
+from mds.MDSBackfill import MDSBackfill
+from mds.MDSMockProvider import MDSMockProvider
+
+
+class TestMDSAggregate:
+    start_time = 1578780000
+    end_time = 1578794400
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSAggregate")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSAggregate")
+        print("---------------------------------------------")
+
+    def test_sketch_success_t1(self):
+        """
+        Tests the quantiles are within the relative accuracy, and merged sketches equal a single one
+        """
+        rng = random.Random(1)
+        values = [rng.lognormvariate(6, 1) for _ in range(20000)]
+        single, first, second = MDSQuantileSketch(), MDSQuantileSketch(), MDSQuantileSketch()
+        for position, value in enumerate(values):
+            single.add(value)
+            (first if position % 2 else second).add(value)
+        first.merge(second)
+        ordered = sorted(values)
+        errors = [
+            abs(first.get_quantile(quantile) / ordered[int(quantile * (len(ordered) - 1))] - 1)
+            for quantile in (0.1, 0.5, 0.9, 0.99)
+        ]
+        assert max(errors) <= 0.01 and \
+            first.buckets == single.buckets and first.count == 20000 and \
+            MDSQuantileSketch.from_dict(json.loads(json.dumps(first.to_dict()))).buckets == first.buckets
+
+    def test_sketch_fail_t1(self):
+        """
+        Tests sketches of different accuracies cannot be merged
+        """
+        try:
+            MDSQuantileSketch(0.01).merge(MDSQuantileSketch(0.02))
+            assert False
+        except Exception as e:
+            assert "different accuracies" in str(e)
+
+    def test_add_success_t1(self):
+        """
+        Tests the counts, sums, hours and vehicle types of trips in seconds and milliseconds
+        """
+        aggregate = MDSTripAggregate()
+        aggregate.add("a", [
+            {"end_time": 1578780001, "trip_duration": 60, "trip_distance": 100, "vehicle_type": "scooter"},
+            {"end_time": 1578783601, "trip_duration": 120, "trip_distance": 200, "vehicle_type": "bicycle"},
+        ])
+        aggregate.add("b", [
+            {"end_time": 1578780001000, "trip_duration": 300, "trip_distance": 50, "vehicle_type": "scooter"},
+        ])
+        report = aggregate.get_report()
+        assert report["a"]["trips"] == 2 and report["a"]["distance"] == 300 and report["a"]["duration"] == 180 and \
+            report["a"]["hourly"] == {1578780000: 1, 1578783600: 1} and \
+            report["a"]["vehicle_types"] == {"scooter": 1, "bicycle": 1} and \
+            report["b"]["hourly"] == {1578780000: 1} and \
+            report["b"]["duration_percentiles"]["p50"] == 300
+
+    def test_sink_success_t1(self):
+        """
+        Tests a backfill aggregated window by window matches the aggregates of the whole range
+        """
+        with MDSMockProvider(version="0.3.0", trips_per_hour=40, page_size=15) as provider:
+            sink = MDSAggregateSink()
+            summary = MDSBackfill(
+                providers={"mock": provider.get_config(provider="mock")}, sink=sink, workers=3,
+            ).run(self.start_time, self.end_time)
+            # Pulling a window again does not count it twice
+            sink.write_window("mock", self.start_time, self.start_time + 3600, [provider.get_trips(
+                self.start_time, self.start_time + 3600
+            )])
+            expected = MDSTripAggregate()
+            expected.add("mock", provider.get_trips(self.start_time, self.end_time))
+
+        merged = MDSTripAggregate.from_dict(json.loads(json.dumps(sink.aggregate.to_dict())))
+        assert summary["completed"] == 4 and \
+            sink.aggregate.get_report() == expected.get_report() and \
+            merged.get_report() == expected.get_report() and \
+            expected.get_report()["mock"]["trips"] == 160
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+# Required Libraries
+import tempfile
+
+from parent_directory import *
+from mds.MDSClient import MDSClient
+from mds.MDSArchive import MDSArchive
+from mds.MDSMockProvider import MDSMockProvider
+from mds.MDSTransport import MDSMemoryTransport, MDSTransportResponse
+
+
+class TestMDSArchive:
+    start_time = 1578780000
+    end_time = 1578783600
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSArchive")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSArchive")
+        print("---------------------------------------------")
+
+    def _get_trips(self, config):
+        return MDSClient(config=config).get_trips(start_time=self.start_time, end_time=self.end_time)
+
+    def test_record_replay_success_t1(self):
+        """
+        Tests a pull replayed from the archive returns the recorded trips
+        """
+        with tempfile.TemporaryDirectory() as path:
+            archive = MDSArchive(path)
+            with MDSMockProvider(version="0.3.0", trips_per_hour=25, page_size=10, auth_type="Bearer") as provider:
+                config = provider.get_config()
+                recorded = self._get_trips({**config, "transport": archive.get_recording_transport("mock")})
+
+            # The provider is gone, only the archive answers
+            replayed = self._get_trips({**config, "transport": archive.get_replay_transport("mock")})
+            windows = archive.get_windows("mock")
+            archive.close()
+
+            assert replayed == recorded and \
+                len(replayed["data"]["trips"]) == 25 and \
+                list(windows.values()) == [3]
+
+    def test_record_replay_success_t2(self):
+        """
+        Tests pages survive retries, segment rotation and reopening the archive
+        """
+        with tempfile.TemporaryDirectory() as path:
+            archive = MDSArchive(path, max_segment_bytes=1024)
+            with MDSMockProvider(version="0.4.0", trips_per_hour=50, page_size=10, error_rate_5xx=0.3, seed=1) as provider:
+                config = provider.get_config(max_attempts=10)
+                recorded = self._get_trips({**config, "transport": archive.get_recording_transport("mock")})
+            segments = archive.get_segments()
+            archive.close()
+
+            archive = MDSArchive(path)
+            replayed = self._get_trips({**config, "transport": archive.get_replay_transport("mock")})
+            windows = archive.get_windows("mock")
+            archive.close()
+
+            assert replayed == recorded and \
+                len(segments) > 1 and \
+                list(windows.values()) == [5]
+
+    def test_replay_fail_t1(self):
+        """
+        Tests a window missing from the archive is not found
+        """
+        with tempfile.TemporaryDirectory() as path:
+            archive = MDSArchive(path)
+            response = archive.get_replay_transport("mock").get("http://localhost/trips", params={"end_time": 1})
+            archive.close()
+            assert response.status_code == 404
+
+    def test_record_empty_params_success_t1(self):
+        """
+        Tests a first page requested with empty parameters starts a new window, and is not archived as a next page
+        """
+        transport = MDSMemoryTransport()
+        transport.add("GET", "http://localhost/trips", MDSTransportResponse(200, {"data": {}}), params={"end_time": 1})
+        transport.add("GET", "http://localhost/trips?page=2", MDSTransportResponse(200, {"data": {}}))
+        transport.add("GET", "http://localhost/vehicles", MDSTransportResponse(200, {"data": {}}), params={})
+        with tempfile.TemporaryDirectory() as path:
+            archive = MDSArchive(path)
+            recording = archive.get_recording_transport("mock", transport=transport)
+            recording.get("http://localhost/trips", params={"end_time": 1})
+            recording.get("http://localhost/trips?page=2", params=None)
+            recording.get("http://localhost/vehicles", params={})
+            windows = archive.get_windows("mock")
+            archive.close()
+            assert sorted(windows.values()) == [1, 2]
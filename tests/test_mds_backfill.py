@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+# Required Libraries
+import json
+import os
+import tempfile
+import time
+
+from parent_directory import *
+from mds.MDSBackfill import MDSBackfill, main
+from mds.MDSMockProvider import MDSMockProvider
+from mds.MDSSink import MDSFileSink
+
+
+class TestMDSBackfill:
+    start_time = 1578780000
+    end_time = 1578794400
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSBackfill")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSBackfill")
+        print("---------------------------------------------")
+
+    def test_plan_windows_success_t1(self):
+        """
+        Tests 0.4.0 ranges are planned as whole hours
+        """
+        windows = MDSBackfill.plan_windows("0.4.0", self.start_time + 600, self.end_time - 600)
+        assert windows[0] == (self.start_time, self.start_time + 3600) and \
+            windows[-1] == (self.end_time - 3600, self.end_time) and \
+            len(windows) == 4
+
+    def test_plan_windows_success_t2(self):
+        """
+        Tests 0.2.0 and 0.3.0 ranges are planned in windows of the given size
+        """
+        windows = MDSBackfill.plan_windows("0.3.0", self.start_time, self.end_time - 600, window_size=7200)
+        assert windows == [
+            (self.start_time, self.start_time + 7200),
+            (self.start_time + 7200, self.end_time - 600),
+        ]
+
+    def test_plan_success_t1(self):
+        """
+        Tests the windows of the providers are interleaved, newest first
+        """
+        backfill = MDSBackfill(
+            providers={"a": {"version": "0.4.0"}, "b": {"version": "0.3.0"}},
+            sink=None,
+            window_size=7200,
+        )
+        plan = backfill.plan(self.start_time, self.end_time)
+        assert plan[:3] == [
+            ("a", self.end_time - 3600, self.end_time),
+            ("b", self.end_time - 7200, self.end_time),
+            ("a", self.end_time - 7200, self.end_time - 3600),
+        ] and len(plan) == 6
+
+    def test_run_success_t1(self):
+        """
+        Tests a backfill writes every window, then a second run resumes with nothing left to do
+        """
+        with tempfile.TemporaryDirectory() as path, \
+                MDSMockProvider(version="0.4.0", trips_per_hour=20, page_size=10) as provider:
+            backfill = MDSBackfill(
+                providers={"mock": provider.get_config(provider="mock")},
+                sink=MDSFileSink(os.path.join(path, "trips")),
+                checkpoint=os.path.join(path, "checkpoint"),
+                workers=2,
+            )
+            first = backfill.run(self.start_time, self.end_time)
+            second = backfill.run(self.start_time, self.end_time)
+            files = os.listdir(os.path.join(path, "trips", "mock"))
+
+        assert first["completed"] == 4 and first["trips"] == 80 and not first["failed"] and \
+            second["skipped"] == 4 and second["completed"] == 0 and \
+            len(files) == 4
+
+    def test_main_success_t1(self):
+        """
+        Tests the command line with process workers
+        """
+        with tempfile.TemporaryDirectory() as path, \
+                MDSMockProvider(version="0.3.0", trips_per_hour=20, page_size=10) as provider:
+            config_path = os.path.join(path, "providers.json")
+            with open(config_path, "w") as config_file:
+                json.dump([provider.get_config(provider="mock")], config_file)
+            exit_code = main([
+                "--config", config_path,
+                "--start", "2020-01-11T22", "--end", "2020-01-12",
+                "--window-hours", "0.5",
+                "--executor", "process", "--workers", "2",
+                "--sink", os.path.join(path, "trips"), "--format", "jsonl",
+                "--checkpoint", os.path.join(path, "checkpoint"),
+            ])
+            with open(os.path.join(path, "checkpoint")) as checkpoint:
+                records = [json.loads(line) for line in checkpoint]
+
+        assert exit_code == 0 and \
+            len(records) == 4 and \
+            sum(record["trips"] for record in records) == 40
+
+    def test_main_fail_t1(self):
+        """
+        Tests the command line reports failed windows with its exit code
+        """
+        with tempfile.TemporaryDirectory() as path, MDSMockProvider(error_rate_5xx=1.0) as provider:
+            config_path = os.path.join(path, "providers.json")
+            with open(config_path, "w") as config_file:
+                json.dump({"mock": provider.get_config(max_attempts=1)}, config_file)
+            exit_code = main([
+                "--config", config_path, "--start", "2020-01-11T22", "--end", "2020-01-11T23",
+                "--sink", os.path.join(path, "trips"),
+            ])
+        assert exit_code == 1
+
+    def test_run_fail_t1(self):
+        """
+        Tests an interrupted run raises the interruption and drops the windows not started yet
+        """
+        class Interrupted(BaseException):
+            pass
+
+        class InterruptingSink:
+            windows = 0
+
+            def write_window(self, provider, start_time, end_time, pages):
+                self.windows += 1
+                # The next window starts meanwhile, the others are still queued
+                time.sleep(0.1)
+                raise Interrupted()
+
+        sink = InterruptingSink()
+        with tempfile.TemporaryDirectory() as path, MDSMockProvider(version="0.4.0") as provider:
+            backfill = MDSBackfill(
+                providers={"mock": provider.get_config(provider="mock")},
+                sink=sink,
+                checkpoint=os.path.join(path, "checkpoint"),
+                workers=1,
+            )
+            try:
+                backfill.run(self.start_time, self.end_time)
+                interrupted = False
+            except Interrupted:
+                interrupted = True
+        assert interrupted and sink.windows <= 2
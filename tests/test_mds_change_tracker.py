@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+# Required Libraries
+import os
+import tempfile
+
+from parent_directory import *
+from mds.MDSChangeTracker import MDSChangeTracker, get_content_hash
+from mds.MDSClient import MDSClient
+from mds.MDSMockProvider import MDSMockProvider
+from mds.clients.MDSClientBase import MDSClientBase
+
+
+class MockResponse:
+    def __init__(self, status_code, headers):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = b""
+
+
+class TestMDSChangeTracker:
+    # 2020-01-11T10:00:00Z
+    hour = 1578736800
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSChangeTracker")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSChangeTracker")
+        print("---------------------------------------------")
+
+    def test_build_response_not_modified_success_t1(self):
+        """
+        Tests a 304 is a success without payload, and the validators are kept
+        """
+        data = MDSClientBase._build_response(MockResponse(304, {"ETag": '"abc"', "Last-Modified": "Sat, 11 Jan"}))
+        headers = MDSClientBase._get_conditional_headers({"etag": '"abc"', "last_modified": None})
+        assert data["response"] == "not_modified" and data["payload"] == {} and \
+            data["etag"] == '"abc"' and data["last_modified"] == "Sat, 11 Jan" and \
+            headers == {"If-None-Match": '"abc"'}
+
+    def test_content_hash_success_t1(self):
+        """
+        Tests the hash does not depend on the order of the keys
+        """
+        assert get_content_hash({"a": 1, "b": [1, 2]}) == get_content_hash({"b": [1, 2], "a": 1}) and \
+            get_content_hash({"a": 1}) != get_content_hash({"a": 2})
+
+    def test_not_modified_success_t1(self):
+        """
+        Tests a provider with ETags answers 304 to every page of a window pulled again
+        """
+        with MDSMockProvider(version="0.3.0", trips_per_hour=250, page_size=100, etags=True) as provider:
+            mds_client = MDSClient(config=provider.get_config())
+            tracker = MDSChangeTracker()
+            first = tracker.get_changes(mds_client, "lime", self.hour, self.hour + 3600)
+            provider.reset_stats()
+            second = tracker.get_changes(mds_client, "lime", self.hour, self.hour + 3600)
+            stats = dict(provider.stats)
+        assert len(first["inserted"]) == 250 and first["updated"] == [] and first["deleted"] == [] and \
+            second == {"inserted": [], "updated": [], "deleted": []} and \
+            stats["not_modified"] == 3 and stats["pages"] == 0
+
+    def test_changes_success_t1(self):
+        """
+        Tests the inserted, updated and deleted trips are found by hash without ETags
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "changes.sqlite")
+            with MDSMockProvider(version="0.3.0", trips_per_hour=250, page_size=100) as provider:
+                mds_client = MDSClient(config=provider.get_config())
+                MDSChangeTracker(path).get_changes(mds_client, "lime", self.hour, self.hour + 3600)
+
+                trips = provider._get_hour_trips(self.hour)
+                deleted = trips.pop(-1)
+                trips[0] = {"_end": trips[0]["_end"], "trip": {**trips[0]["trip"], "trip_distance": 12345}}
+                inserted = {"_end": trips[-1]["_end"], "trip": {**trips[-1]["trip"], "trip_id": "late-trip"}}
+                trips.append(inserted)
+
+                # The state is read back from the file
+                tracker = MDSChangeTracker(path)
+                changes = tracker.get_changes(mds_client, "lime", self.hour, self.hour + 3600)
+                again = tracker.get_changes(mds_client, "lime", self.hour, self.hour + 3600)
+        assert [trip["trip_id"] for trip in changes["inserted"]] == ["late-trip"] and \
+            [trip["trip_distance"] for trip in changes["updated"]] == [12345] and \
+            changes["deleted"] == [deleted["trip"]["trip_id"]] and \
+            again == {"inserted": [], "updated": [], "deleted": []}
+
+    def test_interrupted_fail_t1(self):
+        """
+        Tests a pull that does not complete stores nothing and reports no deletion
+        """
+        with MDSMockProvider(version="0.3.0", trips_per_hour=250, page_size=100) as provider:
+            mds_client = MDSClient(config=provider.get_config())
+            tracker = MDSChangeTracker()
+            changes = tracker.iter_changes(mds_client, "lime", self.hour, self.hour + 3600)
+            first = [next(changes) for _ in range(10)]
+            changes.close()
+            result = tracker.get_changes(mds_client, "lime", self.hour, self.hour + 3600)
+        assert all(change == "inserted" for change, _ in first) and \
+            len(result["inserted"]) == 250 and result["deleted"] == []
@@ -2,9 +2,15 @@
 
 # Required Libraries
 import json
+import time
+import tracemalloc
 from parent_directory import *
 
 from mds.clients.MDSClientBase import MDSClientBase
+from mds.MDSClient import MDSClient
+from mds.MDSException import MDSException, MDSPagingException, MDSDeadlineException
+from mds.MDSMockProvider import MDSMockProvider
+from mds.MDSTransport import MDSMemoryTransport, MDSTransportResponse
 
 
 class DummyResponse:
@@ -164,3 +170,294 @@ class TestMDSBase:
         """
         self.mds_base.set_max_attempts(max_attempts=1000)
         assert self.mds_base.max_attempts == 1000
+
+    def test_constructor_timeout_success_t1(self):
+        """
+        Tests the constructor reads the timeout setting
+        """
+        mds_base = MDSClientBase(config={"timeout": 10})
+        assert mds_base.timeout == 10
+
+    def test_constructor_timeout_success_t2(self):
+        """
+        Tests the constructor still honors the legacy interval setting
+        """
+        mds_base = MDSClientBase(config={"interval": 5})
+        assert mds_base.timeout == 5
+
+    def test_request_deadline_fail_t1(self):
+        """
+        Tests the request method gives up once the deadline has expired
+        """
+        mds_base = MDSClientBase(config={"delay": 0})
+        try:
+            mds_base._request(
+                mds_endpoint="http://localhost/trips",
+                expires_at=time.monotonic() - 1
+            )
+            assert False
+        except MDSDeadlineException:
+            assert True
+
+    def test_request_deadline_fail_t2(self):
+        """
+        Tests a deadline expiring during the last attempt is reported as a deadline, not as max attempts
+        """
+        def slow_error(method, url, params, headers):
+            time.sleep(0.2)
+            return MDSTransportResponse(500, b"Timed out")
+
+        transport = MDSMemoryTransport()
+        transport.add("GET", "http://localhost/trips", slow_error)
+        mds_base = MDSClientBase(config={"delay": 0, "max_attempts": 1, "transport": transport})
+        try:
+            mds_base._request(mds_endpoint="http://localhost/trips", expires_at=time.monotonic() + 0.1)
+            assert False
+        except MDSDeadlineException as e:
+            assert "during attempt 1" in str(e)
+
+    def test_request_max_attempts_fail_t1(self):
+        """
+        Tests the request method raises a paging exception after max attempts
+        """
+        mds_base = MDSClientBase(config={"delay": 0, "max_attempts": 1, "timeout": 1})
+        try:
+            mds_base._request(mds_endpoint="http://localhost:1/trips")
+            assert False
+        except MDSPagingException as e:
+            assert "Max attempts reached" in str(e)
+
+
+class TestMDSBaseEndpoints:
+    start_time = 1578780000
+    end_time = 1578783600
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSBaseEndpoints")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSBaseEndpoints")
+        print("---------------------------------------------")
+
+    def test_get_endpoints_success_t1(self):
+        """
+        Tests trips and status changes of a window are pulled concurrently by one client
+        """
+        with MDSMockProvider(version="0.3.0", trips_per_hour=30, page_size=10) as provider:
+            client = MDSClient(config=provider.get_config())
+            results = client.get_endpoints(
+                ["trips", "status_changes"], start_time=self.start_time, end_time=self.end_time
+            )
+            requests = provider.stats["requests"]
+
+        trips = results["trips"]["data"]["trips"]
+        status_changes = results["status_changes"]["data"]["status_changes"]
+        assert len(trips) == 30 and len(status_changes) == 30 and \
+            {trip["trip_id"] for trip in trips} == {change["associated_trip"] for change in status_changes} and \
+            requests == 6
+
+    def test_get_endpoints_profile_success_t1(self):
+        """
+        Tests each concurrent pull is profiled alone, as when it is pulled by itself
+        """
+        endpoints = ["trips", "status_changes"]
+        end_time = self.start_time + 3 * 3600
+        with MDSMockProvider(version="0.3.0", trips_per_hour=60, page_size=20, latency=0.01) as provider:
+            client = MDSClient(config=provider.get_config())
+            results = client.get_endpoints(endpoints, start_time=self.start_time, end_time=end_time, profile=True)
+            solo = {
+                endpoint: client.get_endpoint(endpoint, self.start_time, end_time, profile=True)["profile"]
+                for endpoint in endpoints
+            }
+
+        assert all(
+            (results[endpoint]["profile"]["pages"], results[endpoint]["profile"]["records"]) ==
+            (solo[endpoint]["pages"], solo[endpoint]["records"]) == (9, 180)
+            for endpoint in endpoints
+        ) and client.mds_client.observers == [] and not tracemalloc.is_tracing()
+
+    def test_get_endpoint_success_t1(self):
+        """
+        Tests the 0.4.0 endpoints get their own parameters
+        """
+        transport = MDSMemoryTransport()
+        for endpoint, params in [
+            ("status_changes", {"event_time": "2020-01-11T22"}),
+            ("telemetry", {"telemetry_time": "2020-01-11T22"}),
+            ("events", {"start_time": 1578780000000, "end_time": 1578783600000}),
+            ("vehicles", None),
+        ]:
+            data_key = "status_changes" if endpoint == "events" else endpoint
+            transport.add(
+                "GET", f"http://provider.test/{endpoint}",
+                MDSTransportResponse(200, {"version": "0.4.0", "data": {data_key: [{"endpoint": endpoint}]}}),
+                params=params,
+            )
+        client = MDSClient(config={
+            "mds_api_url": "http://provider.test", "version": "0.4.0", "auth_type": "Bearer", "token": "abc",
+            "delay": 0, "transport": transport,
+        })
+        results = client.get_endpoints(
+            ["status_changes", "telemetry", "events", "vehicles"], start_time=self.start_time, end_time=self.end_time
+        )
+        assert [results[endpoint]["data"] for endpoint in results] == [
+            {"status_changes": [{"endpoint": "status_changes"}]},
+            {"telemetry": [{"endpoint": "telemetry"}]},
+            {"status_changes": [{"endpoint": "events"}]},
+            {"vehicles": [{"endpoint": "vehicles"}]},
+        ]
+
+    def test_get_endpoints_success_t2(self):
+        """
+        Tests concurrent pulls share the delay between requests
+        """
+        started = []
+
+        def respond(method, url, params, headers):
+            started.append(time.monotonic())
+            return MDSTransportResponse(200, {"version": "0.3.0", "data": {"trips": [], "status_changes": []}})
+
+        transport = MDSMemoryTransport()
+        transport.add("GET", "http://provider.test/trips", respond, params={
+            "min_end_time": 1578780000000, "max_end_time": 1578783600000,
+        })
+        transport.add("GET", "http://provider.test/status_changes", respond, params={
+            "start_time": 1578780000000, "end_time": 1578783600000,
+        })
+        client = MDSClient(config={
+            "mds_api_url": "http://provider.test", "version": "0.3.0", "auth_type": "Bearer", "token": "abc",
+            "delay": 0.1, "transport": transport,
+        })
+        client.get_endpoints(["trips", "status_changes"], start_time=self.start_time, end_time=self.end_time)
+        assert len(started) == 2 and abs(started[1] - started[0]) >= 0.09
+
+    def test_get_endpoint_fail_t1(self):
+        """
+        Tests an endpoint the version does not serve is rejected before any request
+        """
+        transport = MDSMemoryTransport()
+        client = MDSClient(config={
+            "mds_api_url": "http://provider.test", "version": "0.2.0", "auth_type": "Bearer", "token": "abc",
+            "transport": transport,
+        })
+        try:
+            client.get_endpoints(["trips", "telemetry"], start_time=self.start_time, end_time=self.end_time)
+            assert False
+        except MDSException as e:
+            assert "telemetry" in str(e) and not transport.requests
+
+    def test_resume_success_t1(self):
+        """
+        Tests a pull that fails on a page carries the pages before it, and resumes from the failed page
+        """
+        failures = []
+
+        def third_page(method, url, params, headers):
+            # Fails once, as a provider would with a transient error
+            if not failures:
+                failures.append(url)
+                return MDSTransportResponse(500, {"error": "Internal Server Error"})
+            return MDSTransportResponse(200, {
+                "version": "0.3.0", "data": {"trips": [{"trip_id": "5"}, {"trip_id": "6"}]}, "links": {"next": None},
+            })
+
+        transport = MDSMemoryTransport()
+        transport.add("GET", "http://provider.test/trips", MDSTransportResponse(200, {
+            "version": "0.3.0",
+            "data": {"trips": [{"trip_id": "1"}, {"trip_id": "2"}]},
+            "links": {"next": "http://provider.test/trips?page=1"},
+        }), params={"min_end_time": 1578780000000, "max_end_time": 1578783600000})
+        transport.add("GET", "http://provider.test/trips?page=1", MDSTransportResponse(200, {
+            "version": "0.3.0",
+            "data": {"trips": [{"trip_id": "3"}, {"trip_id": "4"}]},
+            "links": {"next": "http://provider.test/trips?page=2"},
+        }))
+        transport.add("GET", "http://provider.test/trips?page=2", third_page)
+        client = MDSClient(config={
+            "mds_api_url": "http://provider.test", "version": "0.3.0", "auth_type": "Bearer", "token": "abc",
+            "delay": 0, "max_attempts": 1, "transport": transport,
+        })
+        try:
+            client.get_trips(start_time=self.start_time, end_time=self.end_time)
+            assert False
+        except MDSPagingException as e:
+            partial = [trip["trip_id"] for trip in e.result["data"]["trips"]]
+            cursor, pages = e.cursor, e.pages
+            result = client.resume(e.cursor, result=e.result)
+
+        assert partial == ["1", "2", "3", "4"] and pages == 2 and \
+            cursor["mds_endpoint"] == "http://provider.test/trips?page=2" and cursor["params"] is None and \
+            [trip["trip_id"] for trip in result["data"]["trips"]] == ["1", "2", "3", "4", "5", "6"] and \
+            len(failures) == 1
+
+    def test_fields_success_t1(self):
+        """
+        Tests only the selected fields of the trips are kept, by get_trips and iter_trips
+        """
+        fields = ["trip_id", "end_time", "trip_distance", "missing"]
+        with MDSMockProvider(version="0.3.0", trips_per_hour=30, page_size=10) as provider:
+            client = MDSClient(config=provider.get_config())
+            trips = client.get_trips(start_time=self.start_time, end_time=self.end_time, fields=fields)
+            pages = list(client.iter_trips(start_time=self.start_time, end_time=self.end_time, fields=fields))
+            full_trips = client.get_trips(start_time=self.start_time, end_time=self.end_time)
+
+        projected = trips["data"]["trips"]
+        assert len(projected) == 30 and len(pages) == 3 and \
+            all(set(trip) == {"trip_id", "end_time", "trip_distance"} for trip in projected) and \
+            [trip["trip_id"] for trip in projected] == [trip["trip_id"] for trip in full_trips["data"]["trips"]] and \
+            pages[0] == projected[:10]
+
+    def test_fields_fail_t1(self):
+        """
+        Tests the cursor of a failed pull keeps the fields, so the resumed pages are projected too
+        """
+        transport = MDSMemoryTransport()
+        transport.add("GET", "http://provider.test/trips", MDSTransportResponse(200, {
+            "version": "0.3.0",
+            "data": {"trips": [{"trip_id": "1", "route": {}}]},
+            "links": {"next": "http://provider.test/trips?page=1"},
+        }), params={"min_end_time": 1578780000000, "max_end_time": 1578783600000})
+        client = MDSClient(config={
+            "mds_api_url": "http://provider.test", "version": "0.3.0", "auth_type": "Bearer", "token": "abc",
+            "delay": 0, "max_attempts": 1, "transport": transport,
+        })
+        try:
+            client.get_trips(start_time=self.start_time, end_time=self.end_time, fields=["trip_id"])
+            assert False
+        except MDSPagingException as e:
+            transport.add("GET", "http://provider.test/trips?page=1", MDSTransportResponse(200, {
+                "version": "0.3.0", "data": {"trips": [{"trip_id": "2", "route": {}}]}, "links": {"next": None},
+            }))
+            result = client.resume(e.cursor, result=e.result)
+            assert result["data"]["trips"] == [{"trip_id": "1"}, {"trip_id": "2"}]
+
+    def test_custom_client_success_t1(self):
+        """
+        Tests a custom client with the original interface is called as before, without the newer options
+        """
+        class LegacyClient:
+            def __init__(self, config):
+                self.headers = {}
+
+            def set_header(self, key, value):
+                self.headers[key] = value
+
+            def render_settings(self, headers):
+                self.headers.update(headers)
+
+            def get_headers(self):
+                return self.headers
+
+            def get_trips(self, start_time, end_time):
+                return {"start_time": start_time, "end_time": end_time}
+
+        client = MDSClient(config={
+            "mds_api_url": "http://provider.test", "version": "0.3.0", "auth_type": "Bearer", "token": "abc",
+            "custom_client": LegacyClient,
+        })
+        trips = client.get_trips(start_time=self.start_time, end_time=self.end_time)
+        assert client.authenticated and client.get_validation() is None and \
+            trips == {"start_time": self.start_time, "end_time": self.end_time}
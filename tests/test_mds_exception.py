@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+# Required Libraries
+from parent_directory import *
+from mds.MDSException import MDSException, MDSPagingException, MDSDeadlineException
+
+
+class TestMDSException:
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSException")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSException")
+        print("---------------------------------------------")
+
+    def test_paging_exception_success_t1(self):
+        """
+        Tests the paging exception carries the partial result and the cursor
+        """
+        cursor = {"mds_endpoint": "https://sample.com/trips?page=2", "params": None}
+        result = {"version": "0.3.0", "data": {"trips": [{"trip_id": "a"}]}}
+        e = MDSPagingException("Failed", result=result, cursor=cursor, pages=1)
+        assert e.result == result and e.cursor == cursor and e.pages == 1
+
+    def test_deadline_exception_success_t1(self):
+        """
+        Tests the deadline exception is a paging exception and an MDS exception
+        """
+        e = MDSDeadlineException("Expired")
+        assert isinstance(e, MDSPagingException) and \
+            isinstance(e, MDSException) and \
+            e.result is None and e.cursor is None
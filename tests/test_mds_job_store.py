@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+# Required Libraries
+import os
+import tempfile
+
+from parent_directory import *
+from mds.MDSJobStore import MDSSQLiteJobStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMDSJobStore:
+    hour = 1578780000
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSJobStore")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSJobStore")
+        print("---------------------------------------------")
+
+    def _store(self, path, **kwargs):
+        return MDSSQLiteJobStore(os.path.join(path, "jobs.sqlite"), **kwargs)
+
+    def test_lease_success_t1(self):
+        """
+        Tests jobs are leased by priority then newest first, once each, and adding a job twice does nothing
+        """
+        with tempfile.TemporaryDirectory() as path:
+            store = self._store(path)
+            added = store.add_many([("a", self.hour, self.hour + 3600), ("a", self.hour + 3600, self.hour + 7200)])
+            added_again = store.add("a", self.hour, self.hour + 3600)
+            store.add("b", self.hour - 3600, self.hour, priority=0)
+            leased = [store.lease("worker", 60) for _ in range(4)]
+            counts = store.get_counts()
+            store.close()
+
+        assert added == 2 and not added_again and \
+            [(job.provider, job.start_time) for job in leased[:3]] == [
+                ("b", self.hour - 3600), ("a", self.hour + 3600), ("a", self.hour),
+            ] and \
+            leased[3] is None and \
+            counts["leased"] == 3
+
+    def test_expired_lease_success_t1(self):
+        """
+        Tests an expired lease is leased again, and only its new holder can complete the job
+        """
+        clock = FakeClock()
+        with tempfile.TemporaryDirectory() as path:
+            store = self._store(path, clock=clock)
+            store.add("a", self.hour, self.hour + 3600)
+            first = store.lease("one", 60)
+            clock.now += 30
+            extended = store.heartbeat(first, 60)
+            clock.now += 45
+            not_expired = store.lease("two", 60)
+            clock.now += 30
+            second = store.lease("two", 60)
+            first_completed = store.complete(first, 10)
+            first_heartbeat = store.heartbeat(first, 60)
+            second_completed = store.complete(second, 10)
+            second_completed_again = store.complete(second, 10)
+            counts = store.get_counts()
+            store.close()
+
+        assert extended and not_expired is None and \
+            second.attempts == 2 and second.token != first.token and \
+            not first_completed and not first_heartbeat and \
+            second_completed and not second_completed_again and \
+            counts["completed"] == 1
+
+    def test_release_success_t1(self):
+        """
+        Tests a released job is leased again, until it runs out of attempts and fails
+        """
+        with tempfile.TemporaryDirectory() as path:
+            store = self._store(path, max_attempts=2)
+            store.add("a", self.hour, self.hour + 3600)
+            store.release(store.lease("one", 60), error="timeout")
+            store.release(store.lease("one", 60), error="timeout")
+            after_failure = store.lease("one", 60)
+            failed = store.get_failed()
+            retried = store.retry_failed()
+            retry = store.lease("one", 60)
+            store.close()
+
+        assert after_failure is None and \
+            failed == [("a", self.hour, self.hour + 3600, "timeout")] and \
+            retried == 1 and retry.attempts == 1
+
+    def test_expired_lease_fail_t1(self):
+        """
+        Tests a job whose last lease expires fails instead of being leased again
+        """
+        clock = FakeClock()
+        with tempfile.TemporaryDirectory() as path:
+            store = self._store(path, max_attempts=1, clock=clock)
+            store.add("a", self.hour, self.hour + 3600)
+            store.lease("one", 60)
+            clock.now += 61
+            job = store.lease("two", 60)
+            counts = store.get_counts()
+            store.close()
+
+        assert job is None and counts["failed"] == 1
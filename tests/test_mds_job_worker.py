@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+
+# Required Libraries
+import json
+import os
+import tempfile
+
+from parent_directory import *
+from mds.MDSJobStore import MDSSQLiteJobStore
+from mds.MDSJobWorker import MDSJobWorker, main
+from mds.MDSMockProvider import MDSMockProvider
+from mds.MDSSink import MDSFileSink
+
+
+class TestMDSJobWorker:
+    start_time = 1578780000
+    end_time = 1578794400
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSJobWorker")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSJobWorker")
+        print("---------------------------------------------")
+
+    def test_run_success_t1(self):
+        """
+        Tests two workers sharing a job database pull every window once
+        """
+        with tempfile.TemporaryDirectory() as path, \
+                MDSMockProvider(version="0.4.0", trips_per_hour=20, page_size=10) as provider:
+            jobs_path = os.path.join(path, "jobs.sqlite")
+            store = MDSSQLiteJobStore(jobs_path)
+            for hour in range(self.start_time, self.end_time, 3600):
+                store.add("mock", hour, hour + 3600)
+            providers = {"mock": provider.get_config(provider="mock")}
+            sink = MDSFileSink(os.path.join(path, "trips"))
+            workers = [
+                MDSJobWorker(MDSSQLiteJobStore(jobs_path), providers, sink, name=name) for name in ("one", "two")
+            ]
+            summaries = [worker.run(threads=2) for worker in workers]
+            counts = store.get_counts()
+            files = os.listdir(os.path.join(path, "trips", "mock"))
+            for worker in workers:
+                worker.store.close()
+            store.close()
+
+        assert sum(summary["completed"] for summary in summaries) == 4 and \
+            sum(summary["trips"] for summary in summaries) == 80 and \
+            counts["completed"] == 4 and \
+            len(files) == 4
+
+    def test_run_fail_t1(self):
+        """
+        Tests failed pulls are released until the job runs out of attempts
+        """
+        with tempfile.TemporaryDirectory() as path, MDSMockProvider(error_rate_5xx=1.0) as provider:
+            store = MDSSQLiteJobStore(os.path.join(path, "jobs.sqlite"), max_attempts=2)
+            store.add("mock", self.start_time, self.start_time + 3600)
+            worker = MDSJobWorker(
+                store, {"mock": provider.get_config(max_attempts=1)}, MDSFileSink(os.path.join(path, "trips"))
+            )
+            summary = worker.run()
+            failed = store.get_failed()
+            store.close()
+
+        assert summary["released"] == 2 and summary["completed"] == 0 and len(failed) == 1
+
+    def test_main_success_t1(self):
+        """
+        Tests the command line adds, works and reports the jobs
+        """
+        with tempfile.TemporaryDirectory() as path, \
+                MDSMockProvider(version="0.3.0", trips_per_hour=20, page_size=10) as provider:
+            config_path = os.path.join(path, "providers.json")
+            with open(config_path, "w") as config_file:
+                json.dump([provider.get_config(provider="mock")], config_file)
+            jobs_path = os.path.join(path, "jobs.sqlite")
+            add_code = main([
+                "add", "--jobs", jobs_path, "--config", config_path,
+                "--start", "2020-01-11T22", "--end", "2020-01-12", "--window-hours", "0.5",
+            ])
+            work_code = main([
+                "work", "--jobs", jobs_path, "--config", config_path,
+                "--sink", os.path.join(path, "trips"), "--threads", "2",
+            ])
+            store = MDSSQLiteJobStore(jobs_path)
+            counts = store.get_counts()
+            store.close()
+
+        assert add_code == 0 and work_code == 0 and counts["completed"] == 4
+
+    def test_main_success_t2(self):
+        """
+        Tests the windows of an "auto" provider are planned for the version it serves, hours for 0.4.0
+        """
+        with tempfile.TemporaryDirectory() as path, \
+                MDSMockProvider(version="0.4.0", trips_per_hour=20, page_size=10) as provider:
+            config_path = os.path.join(path, "providers.json")
+            with open(config_path, "w") as config_file:
+                json.dump([provider.get_config(
+                    provider="mock", version="auto", version_cache=os.path.join(path, "versions.json"),
+                )], config_file)
+            jobs_path = os.path.join(path, "jobs.sqlite")
+            add_code = main([
+                "add", "--jobs", jobs_path, "--config", config_path,
+                "--start", "2020-01-11T18", "--end", "2020-01-12", "--window-hours", "6",
+            ])
+            work_code = main([
+                "work", "--jobs", jobs_path, "--config", config_path,
+                "--sink", os.path.join(path, "trips"), "--threads", "2",
+            ])
+            store = MDSSQLiteJobStore(jobs_path)
+            counts = store.get_counts()
+            store.close()
+            files = os.listdir(os.path.join(path, "trips", "mock"))
+
+        assert add_code == 0 and work_code == 0 and counts["completed"] == 6 and len(files) == 6
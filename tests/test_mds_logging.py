@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+# Required Libraries
+import logging
+from parent_directory import *
+from mds.MDSLogging import MDSLogging
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestMDSLogging:
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSLogging")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSLogging")
+        print("---------------------------------------------")
+        MDSLogging.disable_async_logging()
+
+    def test_redact_headers_success_t1(self):
+        """
+        Tests the credentials are masked but the scheme is kept
+        """
+        headers = MDSLogging.redact_headers({
+            "Authorization": "Bearer abc123",
+            "x-api-key": "secret",
+            "Accept": "application/json",
+        })
+        assert headers == {
+            "Authorization": "Bearer [REDACTED]",
+            "x-api-key": "[REDACTED]",
+            "Accept": "application/json",
+        }
+
+    def test_redact_headers_success_t2(self):
+        """
+        Tests the original headers are left untouched
+        """
+        original = {"Authorization": "Basic dXNlcjpwYXNz"}
+        MDSLogging.redact_headers(original)
+        assert original["Authorization"] == "Basic dXNlcjpwYXNz"
+
+    def test_async_logging_success_t1(self):
+        """
+        Tests the records reach the handler through the background listener
+        """
+        handler = ListHandler()
+        MDSLogging.enable_async_logging(handler)
+        logging.getLogger("mds.clients.MDSClientBase").debug("Test %s", "message")
+        MDSLogging.disable_async_logging()
+        assert [record.getMessage() for record in handler.records] == ["Test message"]
+
+    def test_async_logging_success_t2(self):
+        """
+        Tests the records are not emitted again by the root handlers, and the logger is restored
+        """
+        root_handler = ListHandler()
+        root = logging.getLogger()
+        root.addHandler(root_handler)
+        logger = logging.getLogger("mds")
+        previous_level, previous_propagate = logger.level, logger.propagate
+        try:
+            handler = ListHandler()
+            MDSLogging.enable_async_logging(handler)
+            logging.getLogger("mds.clients.MDSClientBase").warning("hello")
+            MDSLogging.disable_async_logging()
+        finally:
+            root.removeHandler(root_handler)
+        assert [record.getMessage() for record in handler.records] == ["hello"] and \
+            root_handler.records == [] and \
+            logger.level == previous_level and logger.propagate == previous_propagate
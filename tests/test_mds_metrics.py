@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+
+# Required Libraries
+from parent_directory import *
+from mds.MDSMetrics import MDSMetrics, MDSHistogram
+from mds.MDSObserver import MDSObserver
+
+
+class TestMDSMetrics:
+    metrics = None
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSMetrics")
+        print("---------------------------------------------")
+        self.metrics = MDSMetrics()
+        for status_code, elapsed in [(200, 0.2), (200, 0.3), (500, 1.5)]:
+            self.metrics.on_request_end(
+                provider="lime",
+                mds_endpoint="https://sample.com/trips",
+                attempt=1,
+                status_code=status_code,
+                elapsed=elapsed,
+                bytes_received=2048,
+            )
+        self.metrics.on_retry(provider="lime", mds_endpoint="https://sample.com/trips", attempt=1, message="Error")
+        self.metrics.on_page(
+            provider="lime", mds_endpoint="https://sample.com/trips", data_key="trips", page=1, records=120, elapsed=0.5
+        )
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSMetrics")
+        print("---------------------------------------------")
+        self.metrics = None
+
+    def test_constructor_success_t1(self):
+        """
+        Tests the aggregator is an observer
+        """
+        assert isinstance(self.metrics, MDSObserver)
+
+    def test_histogram_success_t1(self):
+        """
+        Tests the histogram's cumulative counts
+        """
+        histogram = MDSHistogram(buckets=(1, 10))
+        for value in [0.5, 1, 5, 50]:
+            histogram.observe(value)
+        assert histogram.get_cumulative_counts() == [(1, 2), (10, 3), (float("inf"), 4)] and \
+            histogram.sum == 56.5 and \
+            histogram.count == 4
+
+    def test_counters_success_t1(self):
+        """
+        Tests the counters are aggregated per label set
+        """
+        assert self.metrics.get_value("mds_requests_total", provider="lime", status_code=200) == 2 and \
+            self.metrics.get_value("mds_requests_total", provider="lime", status_code=500) == 1 and \
+            self.metrics.get_value("mds_retries_total", provider="lime") == 1 and \
+            self.metrics.get_value("mds_records_total", provider="lime", data_key="trips") == 120
+
+    def test_to_prometheus_success_t1(self):
+        """
+        Tests the Prometheus text export
+        """
+        text = self.metrics.to_prometheus()
+        assert "# TYPE mds_request_duration_seconds histogram" in text and \
+            'mds_request_duration_seconds_bucket{provider="lime",le="0.25"} 1' in text and \
+            'mds_request_duration_seconds_bucket{provider="lime",le="+Inf"} 3' in text and \
+            'mds_request_duration_seconds_count{provider="lime"} 3' in text and \
+            'mds_requests_total{provider="lime",status_code="200"} 2' in text and \
+            "mds_auth_total" not in text
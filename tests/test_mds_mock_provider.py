@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+# Required Libraries
+from parent_directory import *
+from mds.MDSClient import MDSClient
+from mds.MDSException import MDSPagingException
+from mds.MDSMockProvider import MDSMockProvider
+
+
+class TestMDSMockProvider:
+    start_time = 1578780000
+    end_time = 1578783600
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSMockProvider")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSMockProvider")
+        print("---------------------------------------------")
+
+    def _get_trips(self, provider, **kwargs):
+        client = MDSClient(config=provider.get_config(**kwargs))
+        return client.get_trips(start_time=self.start_time, end_time=self.end_time)
+
+    def test_get_trips_success_t1(self):
+        """
+        Tests paging through a 0.2.0 provider with bearer authentication
+        """
+        with MDSMockProvider(version="0.2.0", trips_per_hour=25, page_size=10, auth_type="Bearer") as provider:
+            trips = self._get_trips(provider)
+            assert trips["version"] == "0.2.0" and \
+                len(trips["data"]["trips"]) == 25 and \
+                provider.stats["pages"] == 3
+
+    def test_get_trips_success_t2(self):
+        """
+        Tests a 0.3.0 provider with OAuth authentication
+        """
+        with MDSMockProvider(version="0.3.0", trips_per_hour=25, page_size=10, auth_type="OAuth") as provider:
+            trips = self._get_trips(provider)
+            assert trips["version"] == "0.3.0" and \
+                len(trips["data"]["trips"]) == 25 and \
+                trips["data"]["trips"][0]["end_time"] >= self.start_time * 1000
+
+    def test_get_trips_success_t3(self):
+        """
+        Tests a 0.4.0 provider with basic authentication
+        """
+        with MDSMockProvider(version="0.4.0", trips_per_hour=25, page_size=10, auth_type="Basic") as provider:
+            trips = self._get_trips(provider)
+            assert trips["version"] == "0.4.0" and \
+                len(trips["data"]["trips"]) == 25
+
+    def test_compression_success_t1(self):
+        """
+        Tests gzip is negotiated and the profile reports the transferred bytes
+        """
+        with MDSMockProvider(trips_per_hour=25, page_size=10, route_points=20, compress=True) as provider:
+            client = MDSClient(config=provider.get_config())
+            trips = client.get_trips(start_time=self.start_time, end_time=self.end_time, profile=True)
+            plain = MDSClient(config=provider.get_config(compression=False))
+            plain_trips = plain.get_trips(start_time=self.start_time, end_time=self.end_time, profile=True)
+            assert trips["data"] == plain_trips["data"] and \
+                trips["profile"]["wire_bytes"] < trips["profile"]["bytes"] and \
+                trips["profile"]["compression_ratio"] > 2 and \
+                plain_trips["profile"]["compression_ratio"] == 1.0
+
+    def test_deterministic_success_t1(self):
+        """
+        Tests the same seed generates the same trips
+        """
+        first = MDSMockProvider(seed=7).get_trips(self.start_time, self.end_time)
+        second = MDSMockProvider(seed=7).get_trips(self.start_time, self.end_time)
+        third = MDSMockProvider(seed=8).get_trips(self.start_time, self.end_time)
+        assert first == second and first != third
+
+    def test_deterministic_success_t2(self):
+        """
+        Tests only the recently served hours are kept, and an evicted hour is generated again identically
+        """
+        provider = MDSMockProvider(seed=7, trips_per_hour=5)
+        provider.max_cached_hours = 2
+        first = provider.get_trips(self.start_time, self.end_time)
+        provider.get_trips(self.start_time + 3600, self.end_time + 7200)
+        assert len(provider._hours) == 2 and self.start_time not in provider._hours and \
+            provider.get_trips(self.start_time, self.end_time) == first
+
+    def test_faults_success_t1(self):
+        """
+        Tests the client retries through injected faults
+        """
+        with MDSMockProvider(trips_per_hour=50, page_size=10, error_rate_5xx=0.2, disconnect_rate=0.2, seed=1) as provider:
+            trips = self._get_trips(provider, max_attempts=10)
+            assert len(trips["data"]["trips"]) == 50 and \
+                provider.stats["5xx"] + provider.stats["disconnects"] > 0
+
+    def test_faults_fail_t1(self):
+        """
+        Tests the client gives up when every request fails
+        """
+        with MDSMockProvider(error_rate_429=1.0) as provider:
+            try:
+                self._get_trips(provider, max_attempts=2)
+                assert False
+            except MDSPagingException:
+                assert provider.stats["429"] == 2
+
+    def test_unauthorized_fail_t1(self):
+        """
+        Tests the provider rejects invalid credentials
+        """
+        with MDSMockProvider(auth_type="Bearer") as provider:
+            try:
+                self._get_trips(provider, token="invalid", max_attempts=1)
+                assert False
+            except MDSPagingException:
+                assert provider.stats["unauthorized"] == 1
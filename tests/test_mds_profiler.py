@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+# Required Libraries
+import json
+from parent_directory import *
+from mds.MDSProfiler import MDSProfiler
+
+
+class TestMDSProfiler:
+    profiler = None
+    report = None
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSProfiler")
+        print("---------------------------------------------")
+        self.profiler = MDSProfiler()
+        self.profiler.start(provider="lime")
+        self.profiler.on_sleep(provider="lime", seconds=1.0, kind="delay")
+        self.profiler.on_request_end(
+            provider="lime", mds_endpoint="https://sample.com/trips", attempt=1, status_code=-1,
+            elapsed=0.5, bytes_received=0, wire_bytes=0,
+        )
+        self.profiler.on_retry(provider="lime", mds_endpoint="https://sample.com/trips", attempt=1, message="Error")
+        self.profiler.on_sleep(provider="lime", seconds=2.0, kind="backoff")
+        self.profiler.on_request_end(
+            provider="lime", mds_endpoint="https://sample.com/trips", attempt=2, status_code=200,
+            elapsed=0.6, bytes_received=1048576, wire_bytes=131072, ttfb=0.3, download=0.2, decode=0.1,
+        )
+        self.profiler.on_page(
+            provider="lime", mds_endpoint="https://sample.com/trips", data_key="trips", page=1,
+            records=500, elapsed=4.1, extract=0.01,
+        )
+        self.report = self.profiler.stop()
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSProfiler")
+        print("---------------------------------------------")
+        self.profiler = None
+        self.report = None
+
+    def test_report_counters_success_t1(self):
+        """
+        Tests the counters of the report
+        """
+        assert self.report["provider"] == "lime" and \
+            self.report["pages"] == 1 and \
+            self.report["requests"] == 2 and \
+            self.report["retries"] == 1 and \
+            self.report["records"] == 500 and \
+            self.report["bytes"] == 1048576
+
+    def test_report_compression_success_t1(self):
+        """
+        Tests the transferred bytes are reported next to the decoded bytes
+        """
+        assert self.report["wire_bytes"] == 131072 and \
+            self.report["compression_ratio"] == 8.0
+
+    def test_report_phases_success_t1(self):
+        """
+        Tests the time spent per phase
+        """
+        phases = self.report["phases"]
+        assert phases["ttfb"] == 0.3 and \
+            phases["download"] == 0.2 and \
+            phases["decode"] == 0.1 and \
+            phases["extract"] == 0.01 and \
+            phases["delay"] == 1.0 and \
+            phases["backoff"] == 2.0 and \
+            phases["other"] >= 0
+
+    def test_report_memory_success_t1(self):
+        """
+        Tests the peak memory is measured
+        """
+        assert isinstance(self.report["peak_memory_bytes"], int)
+
+    def test_report_json_success_t1(self):
+        """
+        Tests the report is machine-readable
+        """
+        assert json.loads(json.dumps(self.report)) == self.report
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+# Required Libraries
+import os
+import tempfile
+import threading
+
+from parent_directory import *
+from mds.MDSMockProvider import MDSMockProvider
+from mds.MDSScheduler import MDSScheduler
+from mds.MDSSink import MDSFileSink
+
+
+class TestMDSScheduler:
+    # 2020-01-11T22:10:00Z
+    now = 1578780600
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSScheduler")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSScheduler")
+        print("---------------------------------------------")
+
+    def test_get_next_run_success_t1(self):
+        """
+        Tests providers wake up after the hour boundary plus their lag and a bounded jitter
+        """
+        scheduler = MDSScheduler(
+            providers={"a": {"version": "0.4.0"}, "b": {"version": "0.4.0", "lag": 900}},
+            sink=None, lag=300, jitter=60,
+        )
+        next_a = scheduler.get_next_run("a", self.now)
+        next_b = scheduler.get_next_run("b", self.now)
+        # "b" has not published 21:00-22:00 yet, it runs at 22:15
+        assert 1578783600 + 300 <= next_a <= 1578783600 + 360 and \
+            1578780000 + 900 <= next_b <= 1578780000 + 960 and \
+            next_a == scheduler.get_next_run("a", self.now)
+
+    def test_get_pending_hours_success_t1(self):
+        """
+        Tests the newest published hour comes first, then the missed hours
+        """
+        scheduler = MDSScheduler(providers={"a": {"version": "0.3.0"}}, sink=None, catch_up=3)
+        scheduler.checkpoint.complete("a", 1578772800, 1578776400, 0)
+        assert scheduler.get_pending_hours("a", self.now) == [
+            (1578776400, 1578780000),
+            (1578769200, 1578772800),
+        ]
+
+    def test_run_provider_success_t1(self):
+        """
+        Tests a run pulls the pending hours with a single authentication, the next run has nothing left
+        """
+        with tempfile.TemporaryDirectory() as path, \
+                MDSMockProvider(version="0.4.0", trips_per_hour=20, page_size=10, auth_type="OAuth") as provider:
+            scheduler = MDSScheduler(
+                providers={"mock": provider.get_config(provider="mock")},
+                sink=MDSFileSink(path),
+                catch_up=3,
+            )
+            first = scheduler.run_provider("mock", now=self.now)
+            second = scheduler.run_provider("mock", now=self.now)
+            token_requests = provider.stats["requests"] - provider.stats["pages"]
+            files = sorted(os.listdir(os.path.join(path, "mock")))
+
+        assert first == {"completed": 3, "failed": 0, "trips": 60} and \
+            second == {"completed": 0, "failed": 0, "trips": 0} and \
+            token_requests == 1 and \
+            files[-1] == "1578776400-1578780000.json"
+
+    def test_run_success_t1(self):
+        """
+        Tests the scheduler threads run at start-up and stop on request
+        """
+        with tempfile.TemporaryDirectory() as path, \
+                MDSMockProvider(version="0.4.0", trips_per_hour=20, page_size=10) as provider:
+            scheduler = MDSScheduler(
+                providers={"mock": provider.get_config(provider="mock")},
+                sink=MDSFileSink(path),
+                checkpoint=os.path.join(path, "checkpoint"),
+                jitter=0,
+                catch_up=2,
+                clock=lambda: self.now,
+            )
+            thread = threading.Thread(target=scheduler.run)
+            thread.start()
+            while len(scheduler.checkpoint.completed) < 2:
+                thread.join(0.01)
+            scheduler.stop()
+            thread.join(5)
+            assert not thread.is_alive() and len(scheduler.checkpoint.completed) == 2
+
+    def test_run_fail_t1(self):
+        """
+        Tests a run that raises is logged and the provider is run again at its next run
+        """
+        scheduler = MDSScheduler(providers={"mock": {"version": "0.4.0"}}, sink=None, jitter=0, clock=lambda: self.now)
+        runs = []
+
+        def run_provider(provider):
+            runs.append(provider)
+            if len(runs) == 1:
+                raise OSError("No space left on device")
+            return {"completed": 0, "failed": 0, "trips": 0}
+
+        scheduler.run_provider = run_provider
+        scheduler.get_next_run = lambda provider, now: now
+        thread = threading.Thread(target=scheduler.run)
+        thread.start()
+        while len(runs) < 2 and thread.is_alive():
+            thread.join(0.01)
+        scheduler.stop()
+        thread.join(5)
+        assert not thread.is_alive() and len(runs) >= 2
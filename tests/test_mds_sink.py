@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+# Required Libraries
+import json
+import os
+import tempfile
+import threading
+
+from parent_directory import *
+from mds.MDSSink import MDSFileSink
+
+
+class TestMDSSink:
+    pages = [[{"trip_id": "1"}, {"trip_id": "2"}], [{"trip_id": "3"}]]
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSSink")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSSink")
+        print("---------------------------------------------")
+
+    def test_write_window_json_success_t1(self):
+        """
+        Tests a window is written as an MDS-like document
+        """
+        with tempfile.TemporaryDirectory() as path:
+            sink = MDSFileSink(path)
+            trips = sink.write_window("lime", 1578780000, 1578783600, iter(self.pages))
+            with open(os.path.join(path, "lime", "1578780000-1578783600.json")) as output:
+                document = json.load(output)
+            assert trips == 3 and \
+                [trip["trip_id"] for trip in document["data"]["trips"]] == ["1", "2", "3"]
+
+    def test_write_window_jsonl_success_t1(self):
+        """
+        Tests a window is written one trip per line
+        """
+        with tempfile.TemporaryDirectory() as path:
+            sink = MDSFileSink(path, file_format="jsonl")
+            trips = sink.write_window("lime", 1578780000, 1578783600, iter(self.pages))
+            with open(sink.get_file_path("lime", 1578780000, 1578783600)) as output:
+                lines = [json.loads(line) for line in output]
+            assert trips == 3 and len(lines) == 3
+
+    def test_write_window_fail_t1(self):
+        """
+        Tests a failed pull leaves no file behind
+        """
+        def pages():
+            yield self.pages[0]
+            raise Exception("Connection lost")
+
+        with tempfile.TemporaryDirectory() as path:
+            sink = MDSFileSink(path, file_format="jsonl")
+            try:
+                sink.write_window("lime", 1578780000, 1578783600, pages())
+                assert False
+            except Exception:
+                assert os.listdir(os.path.join(path, "lime")) == []
+
+    def test_write_window_concurrent_success_t1(self):
+        """
+        Tests two threads writing the same window at once both complete, and the file is whole
+        """
+        barrier = threading.Barrier(2)
+        errors = []
+
+        def pages(trip_ids):
+            for trip_id in trip_ids:
+                # Both writers are within the window at once
+                barrier.wait(timeout=5)
+                yield [{"trip_id": trip_id}]
+
+        with tempfile.TemporaryDirectory() as path:
+            sink = MDSFileSink(path, file_format="jsonl")
+
+            def write(trip_ids):
+                try:
+                    sink.write_window("lime", 1578780000, 1578783600, pages(trip_ids))
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=write, args=(trip_ids,)) for trip_ids in (["a1", "a2"], ["b1", "b2"])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            with open(sink.get_file_path("lime", 1578780000, 1578783600)) as output:
+                trip_ids = [json.loads(line)["trip_id"] for line in output]
+            files = os.listdir(os.path.join(path, "lime"))
+        assert errors == [] and trip_ids in (["a1", "a2"], ["b1", "b2"]) and \
+            files == ["1578780000-1578783600.jsonl"]
+
+    def test_write_window_mode_success_t1(self):
+        """
+        Tests the window files get the mode of files created under the umask, not the temporary file's
+        """
+        with tempfile.TemporaryDirectory() as path:
+            sink = MDSFileSink(path)
+            sink.write_window("lime", 1578780000, 1578783600, iter(self.pages))
+            mode = os.stat(sink.get_file_path("lime", 1578780000, 1578783600)).st_mode & 0o777
+            reference = os.path.join(path, "reference")
+            open(reference, "w").close()
+            expected = os.stat(reference).st_mode & 0o777
+        assert mode == expected
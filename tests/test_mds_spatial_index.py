@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+# Required Libraries
+from parent_directory import *
+from mds.MDSException import MDSException
+from mds.MDSMockProvider import MDSMockProvider
+from mds.MDSSpatialIndex import MDSSpatialIndex
+
+
+def build_trip(trip_id, start, end):
+    return {
+        "trip_id": trip_id,
+        "route": {
+            "type": "FeatureCollection",
+            "features": [
+                {"type": "Feature", "geometry": {"type": "Point", "coordinates": list(point)}}
+                for point in (start, end)
+            ],
+        },
+    }
+
+
+def build_index(**kwargs):
+    """
+    Returns an index, or None if numpy is not installed
+    """
+    try:
+        return MDSSpatialIndex(**kwargs)
+    except MDSException as e:
+        if "numpy is required" in str(e):
+            return None
+        raise
+
+
+class TestMDSSpatialIndex:
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSSpatialIndex")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSSpatialIndex")
+        print("---------------------------------------------")
+
+    def test_geohash_success_t1(self):
+        """
+        Tests the geohashes and bounds of points, and points out of range
+        """
+        index = build_index(geohash_precision=11)
+        if index is None:
+            return
+        min_lon, min_lat, max_lon, max_lat = index.get_cell_bounds("u4pruydqqvj")
+        assert index.get_cell(10.40744, 57.64911) == "u4pruydqqvj" and \
+            index.get_cells([-97.7431, 200, float("nan")], [30.2672, 0, 0]) == ["9v6kpvcxhxn", None, None] and \
+            min_lon <= 10.40744 <= max_lon and min_lat <= 57.64911 <= max_lat
+
+    def test_grid_success_t1(self):
+        """
+        Tests the cells of a fixed grid contain their points
+        """
+        index = build_index(cell_size=0.01)
+        if index is None:
+            return
+        cell = index.get_cell(-97.7431, 30.2672)
+        min_lon, min_lat, max_lon, max_lat = index.get_cell_bounds(cell)
+        assert cell == "8225:12026" and \
+            min_lon <= -97.7431 < max_lon and min_lat <= 30.2672 < max_lat
+
+    def test_add_success_t1(self):
+        """
+        Tests the counters and trip index of origins and destinations, and trips without a route
+        """
+        index = build_index(geohash_precision=5)
+        if index is None:
+            return
+        downtown, airport = (-97.7431, 30.2672), (-97.6664, 30.1975)
+        binned = index.add([
+            build_trip("a", downtown, airport),
+            build_trip("b", downtown, downtown),
+            build_trip("c", airport, downtown),
+            {"trip_id": "d"},
+        ])
+        index.add([build_trip("e", airport, airport)])
+        first, second = index.get_cell(*downtown), index.get_cell(*airport)
+        assert binned == 3 and index.skipped == 1 and first != second and \
+            index.get_counts() == {
+                first: {"origins": 2, "destinations": 2},
+                second: {"origins": 2, "destinations": 2},
+            } and \
+            index.get_trips(first, "origins") == ["a", "b"] and \
+            index.get_trips(first, "destinations") == ["b", "c"] and \
+            index.get_trips(second) == ["a", "c", "e"]
+
+    def test_add_success_t2(self):
+        """
+        Tests the index of a page of mock trips matches the cells of each trip
+        """
+        index = build_index(cell_size=0.005)
+        if index is None:
+            return
+        with MDSMockProvider(version="0.3.0", trips_per_hour=500) as provider:
+            trips = provider.get_trips(1578780000, 1578783600)
+        for page in range(0, len(trips), 100):
+            index.add(trips[page:page + 100])
+
+        expected = {}
+        for trip in trips:
+            cell = index.get_cell(*trip["route"]["features"][0]["geometry"]["coordinates"])
+            expected.setdefault(cell, []).append(trip["trip_id"])
+        assert sum(counts["origins"] for counts in index.get_counts().values()) == 500 and \
+            all(index.get_trips(cell, "origins") == trip_ids for cell, trip_ids in expected.items())
+
+    def test_index_fail_t1(self):
+        """
+        Tests invalid parameters are refused
+        """
+        index = build_index(geohash_precision=5)
+        if index is None:
+            return
+        for kwargs in ({}, {"geohash_precision": 5, "cell_size": 0.01}, {"geohash_precision": 13}, {"cell_size": 0}):
+            try:
+                MDSSpatialIndex(**kwargs)
+                assert False
+            except MDSException:
+                pass
+        try:
+            index.get_trips("9v6kp", "stops")
+            assert False
+        except MDSException as e:
+            assert "Invalid kind" in str(e)
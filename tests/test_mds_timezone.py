@@ -123,3 +123,80 @@ class TestMDSTimeZone:
         utc and unix arguments are True.
         """
         assert self.tz_time.get_time_start(utc=True, unix=True) == 1578780000.0
+
+    def test_get_time_default_success_t1(self):
+        """
+        Tests the default date time of get_time is the time of the call, not of the import
+        """
+        before = datetime.now()
+        dt = self.tz_time.get_time().replace(tzinfo=None)
+        assert dt >= before
+
+    def test_get_windows_success_t1(self):
+        """
+        Tests a year of hourly windows in UTC milliseconds, every window an hour long
+        """
+        starts, ends = MDSTimeZone.get_windows(
+            datetime(2020, 1, 1), datetime(2021, 1, 1), time_zone="US/Central", milliseconds=True
+        )
+        assert len(starts) == 8784 and \
+            starts[0] == 1577858400000 and ends[-1] == 1609480800000 and \
+            all(end - start == 3600000 for start, end in zip(starts, ends)) and \
+            all(start == end for start, end in zip(starts[1:], ends))
+
+    def test_get_windows_success_t2(self):
+        """
+        Tests the days of the DST changes last 23 and 25 hours, and their hours are not lost or repeated
+        """
+        spring, fall = datetime(2020, 3, 8), datetime(2020, 11, 1)
+        day = timedelta(days=1)
+        spring_days = MDSTimeZone.get_windows(spring, spring + day, step=86400, time_zone="US/Central")
+        fall_days = MDSTimeZone.get_windows(fall, fall + day, step=86400, time_zone="US/Central")
+        spring_hours = MDSTimeZone.get_windows(spring, spring + day, time_zone="US/Central")
+        fall_hours = MDSTimeZone.get_windows(fall, fall + day, time_zone="US/Central")
+        assert spring_days[1][0] - spring_days[0][0] == 23 * 3600 and \
+            fall_days[1][0] - fall_days[0][0] == 25 * 3600 and \
+            len(spring_hours[0]) == 23 and len(fall_hours[0]) == 25
+
+    def test_get_windows_success_t3(self):
+        """
+        Tests a boundary skipped by the clocks going forward moves to the transition
+        """
+        starts, ends = MDSTimeZone.get_windows(
+            datetime(2020, 3, 8, 1, 30), datetime(2020, 3, 8, 4, 30), time_zone="US/Central"
+        )
+        # 01:30 CST, 03:00 CDT (the transition), 03:30 CDT and 04:30 CDT
+        assert list(starts) == [1583652600, 1583654400, 1583656200] and \
+            list(ends) == [1583654400, 1583656200, 1583659800]
+
+    def test_get_windows_success_t4(self):
+        """
+        Tests a start skipped by the clocks going forward moves to the transition
+        """
+        starts, ends = MDSTimeZone.get_windows(
+            datetime(2020, 3, 8, 2, 30), datetime(2020, 3, 8, 5), time_zone="US/Central"
+        )
+        short = MDSTimeZone.get_windows(datetime(2020, 3, 8, 2, 30), datetime(2020, 3, 8, 3, 30), time_zone="US/Central")
+        # 02:30 does not exist: 03:00 CDT (the transition), 03:30 CDT and 04:30 CDT
+        assert list(starts) == [1583654400, 1583656200] and list(ends) == [1583656200, 1583659800] and \
+            (list(short[0]), list(short[1])) == ([1583654400], [1583656200])
+
+    def test_get_windows_success_t5(self):
+        """
+        Tests an end skipped by the clocks going forward moves to the transition
+        """
+        starts, ends = MDSTimeZone.get_windows(
+            datetime(2020, 3, 8, 0, 30), datetime(2020, 3, 8, 2, 30), time_zone="US/Central"
+        )
+        # 00:30 CST, 01:30 CST and 02:30, which does not exist: 03:00 CDT (the transition)
+        assert list(starts) == [1583649000, 1583652600] and list(ends) == [1583652600, 1583654400]
+
+    def test_get_windows_fail_t1(self):
+        """
+        Tests a step that is not positive is refused
+        """
+        try:
+            MDSTimeZone.get_windows(datetime(2020, 1, 1), datetime(2020, 1, 2), step=0)
+            assert False
+        except Exception as e:
+            assert "step must be positive" in str(e)
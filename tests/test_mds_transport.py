@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+# Required Libraries
+from parent_directory import *
+from mds.MDSClient import MDSClient
+from mds.MDSException import MDSException
+from mds.MDSMockProvider import MDSMockProvider
+from mds.MDSTransport import (
+    MDSTransport,
+    MDSTransportResponse,
+    MDSRequestsTransport,
+    MDSHttpxTransport,
+    MDSMemoryTransport,
+)
+
+
+class TestMDSTransport:
+    start_time = 1578780000
+    end_time = 1578783600
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSTransport")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSTransport")
+        print("---------------------------------------------")
+
+    @staticmethod
+    def _get_memory_transport():
+        """
+        Returns a memory transport serving two pages of trips and an OAuth token
+        """
+        transport = MDSMemoryTransport()
+        transport.add("POST", "http://provider.test/token", MDSTransportResponse(200, {"access_token": "abc"}))
+        transport.add(
+            "GET",
+            "http://provider.test/trips",
+            MDSTransportResponse(200, {
+                "version": "0.3.0",
+                "data": {"trips": [{"trip_id": "1"}]},
+                "links": {"next": "http://provider.test/trips?page=1"},
+            }),
+            params={"min_end_time": 1578780000000, "max_end_time": 1578783600000},
+        )
+        transport.add("GET", "http://provider.test/trips?page=1", MDSTransportResponse(200, {
+            "version": "0.3.0",
+            "data": {"trips": [{"trip_id": "2"}]},
+            "links": {"next": None},
+        }))
+        return transport
+
+    def test_get_transport_success_t1(self):
+        """
+        Tests the transports are resolved by name, instances are kept
+        """
+        memory = MDSMemoryTransport()
+        assert isinstance(MDSTransport.get_transport(), MDSRequestsTransport) and \
+            isinstance(MDSTransport.get_transport("requests", pool_size=2), MDSRequestsTransport) and \
+            MDSTransport.get_transport(memory) is memory
+
+    def test_get_transport_fail_t1(self):
+        """
+        Tests an unknown transport name is rejected
+        """
+        try:
+            MDSTransport.get_transport("carrier-pigeon")
+            assert False
+        except MDSException:
+            assert True
+
+    def test_memory_transport_success_t1(self):
+        """
+        Tests a pull and its OAuth authentication are served from memory
+        """
+        transport = self._get_memory_transport()
+        client = MDSClient(config={
+            "provider": "memory",
+            "mds_api_url": "http://provider.test",
+            "version": "0.3.0",
+            "auth_type": "OAuth",
+            "token_url": "http://provider.test/token",
+            "auth_data": {"client_id": "id", "client_secret": "secret"},
+            "auth_token_res_key": "access_token",
+            "transport": transport,
+        })
+        trips = client.get_trips(start_time=self.start_time, end_time=self.end_time)
+        assert [trip["trip_id"] for trip in trips["data"]["trips"]] == ["1", "2"] and \
+            [request[0] for request in transport.requests] == ["POST", "GET", "GET"] and \
+            transport.requests[-1][2]["Authorization"] == "Bearer abc"
+
+    def test_memory_transport_fail_t1(self):
+        """
+        Tests an unknown request gets a 404 response
+        """
+        response = MDSMemoryTransport().get("http://provider.test/trips")
+        assert response.status_code == 404
+
+    def test_shared_transport_success_t1(self):
+        """
+        Tests clients of one provider share the connections of a transport
+        """
+        transport = MDSTransport.get_transport("requests")
+        with MDSMockProvider(trips_per_hour=25, page_size=10, auth_type="OAuth") as provider:
+            for _ in range(3):
+                client = MDSClient(config=provider.get_config(transport=transport))
+                trips = client.get_trips(start_time=self.start_time, end_time=self.end_time)
+                assert len(trips["data"]["trips"]) == 25
+            pools = len(transport.session.get_adapter(provider.url).poolmanager.pools)
+        transport.close()
+        assert pools == 1
+
+    def test_http2_transport_success_t1(self):
+        """
+        Tests the httpx transport, when installed, against a local provider
+        """
+        try:
+            transport = MDSTransport.get_transport("http2")
+        except MDSException:
+            return
+        with MDSMockProvider(trips_per_hour=25, page_size=10, auth_type="OAuth", compress=True) as provider:
+            client = MDSClient(config=provider.get_config(transport=transport))
+            trips = client.get_trips(start_time=self.start_time, end_time=self.end_time, profile=True)
+        transport.close()
+        assert isinstance(transport, MDSHttpxTransport) and \
+            len(trips["data"]["trips"]) == 25 and \
+            trips["profile"]["wire_bytes"] < trips["profile"]["bytes"]
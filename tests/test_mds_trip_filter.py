@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+# Required Libraries
+from parent_directory import *
+from mds.MDSClient import MDSClient
+from mds.MDSMockProvider import MDSMockProvider
+from mds.MDSTripFilter import MDSTripFilter
+
+
+def build_trip(device_id="d1", vehicle_id="v1", end_time=1578780600, points=((-97.74, 30.27), (-97.70, 30.30))):
+    return {
+        "device_id": device_id,
+        "vehicle_id": vehicle_id,
+        "end_time": end_time,
+        "route": {"type": "FeatureCollection", "features": [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": list(point)}} for point in points
+        ]},
+    }
+
+
+class TestMDSTripFilter:
+    start_time = 1578780000
+    end_time = 1578783600
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSTripFilter")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSTripFilter")
+        print("---------------------------------------------")
+
+    def test_apply_success_t1(self):
+        """
+        Tests each criterion drops the trips that fail it, and the drops are counted by criterion
+        """
+        trip_filter = MDSTripFilter(
+            device_ids=["d1", "d2"],
+            vehicle_ids=["v1"],
+            min_end_time=1578780000,
+            max_end_time=1578783600,
+            bbox=(-97.75, 30.26, -97.73, 30.28),
+        )
+        trips = [
+            build_trip(),
+            build_trip(device_id="d3"),
+            build_trip(vehicle_id="v2"),
+            build_trip(end_time=1578783600),
+            build_trip(points=((-97.0, 30.0), (-97.74, 30.27))),
+            build_trip(points=((-97.0, 30.0), (-97.1, 30.1))),
+            {"device_id": "d2", "vehicle_id": "v1", "end_time": 1578780600},
+        ]
+        kept = trip_filter.apply(trips)
+        assert kept == [trips[0], trips[4]] and \
+            trip_filter.received == 7 and \
+            trip_filter.dropped == {"device_id": 1, "vehicle_id": 1, "end_time": 1, "bbox": 2} and \
+            trip_filter.get_dropped() == 5
+
+    def test_apply_success_t2(self):
+        """
+        Tests the time bounds follow the unit of the trip times
+        """
+        trip_filter = MDSTripFilter(min_end_time=1578780000, max_end_time=1578783600)
+        kept = trip_filter.apply([build_trip(end_time=1578780600000), build_trip(end_time=1578790000000)], 1000)
+        assert len(kept) == 1 and trip_filter.dropped == {"end_time": 1}
+
+    def test_get_params_success_t1(self):
+        """
+        Tests single ids and the bbox are sent to the provider, sets of ids are not
+        """
+        assert MDSTripFilter(device_ids=["d1"], vehicle_ids=["v1", "v2"], bbox=(1, 2, 3, 4)).get_params() == {
+            "device_id": "d1",
+            "bbox": "1.0,2.0,3.0,4.0",
+        }
+
+    def test_pull_success_t1(self):
+        """
+        Tests trips are filtered while streaming from a provider that ignores the filter parameters
+        """
+        with MDSMockProvider(version="0.3.0", trips_per_hour=50, page_size=10) as provider:
+            client = MDSClient(config=provider.get_config())
+            every_trip = client.get_trips(start_time=self.start_time, end_time=self.end_time)["data"]["trips"]
+            device_ids = [trip["device_id"] for trip in every_trip[:5]]
+            trip_filter = MDSTripFilter(device_ids=device_ids)
+            result = client.get_trips(start_time=self.start_time, end_time=self.end_time, trip_filter=trip_filter)
+            pages = list(client.iter_trips(
+                start_time=self.start_time, end_time=self.end_time, trip_filter=MDSTripFilter(device_ids=device_ids),
+            ))
+
+        assert [trip["device_id"] for trip in result["data"]["trips"]] == device_ids and \
+            result["filtered"] == 45 and \
+            sum(len(page) for page in pages) == 5
+
+    def test_constructor_fail_t1(self):
+        """
+        Tests an inverted bbox is rejected
+        """
+        try:
+            MDSTripFilter(bbox=(-97.73, 30.26, -97.75, 30.28))
+            assert False
+        except Exception as e:
+            assert "Invalid bbox" in str(e)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+
+# Required Libraries
+import os
+import random
+import threading
+import tracemalloc
+
+from parent_directory import *
+from mds.MDSBackfill import MDSBackfill
+from mds.MDSException import MDSException
+from mds.MDSMockProvider import MDSMockProvider
+from mds.MDSTripSorter import MDSTripSorter
+
+
+class TestMDSTripSorter:
+    start_time = 1578780000
+    end_time = 1578794400
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSTripSorter")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSTripSorter")
+        print("---------------------------------------------")
+
+    @staticmethod
+    def _get_pages(trips, page_size):
+        return [trips[position:position + page_size] for position in range(0, len(trips), page_size)]
+
+    def test_in_memory_success_t1(self):
+        """
+        Tests trips of several windows and versions are ordered by end time in seconds, without files
+        """
+        with MDSTripSorter() as sorter:
+            sorter.write_window("a", 0, 10, [[{"trip_id": "a2", "end_time": 1578780200},
+                                              {"trip_id": "a0"}], [{"trip_id": "a1", "end_time": 1578780100}]])
+            sorter.write_window("b", 0, 10, [[{"trip_id": "b1", "end_time": 1578780150000}]])
+            trip_ids = [trip["trip_id"] for trip in sorter.iter_trips()]
+            stats = dict(sorter.stats)
+            count = sorter.get_trip_count()
+        assert trip_ids == ["a1", "b1", "a2", "a0"] and stats["spilled_runs"] == 0 and count == 4
+
+    def test_spilled_success_t1(self):
+        """
+        Tests a budget smaller than the trips spills runs, merged in several passes, in the right order
+        """
+        randomizer = random.Random(1)
+        windows = []
+        for window in range(6):
+            trips = [
+                {"trip_id": f"{window}-{position}", "end_time": randomizer.randint(0, 10 ** 6) * 1000}
+                for position in range(500)
+            ]
+            windows.append(trips)
+
+        with MDSTripSorter(memory_budget=20000, max_runs=4) as sorter:
+            for window, trips in enumerate(windows):
+                sorter.write_window("mock", window, window + 1, self._get_pages(trips, 50))
+            sorted_trips = list(sorter.iter_trips())
+            stats = dict(sorter.stats)
+            directory = sorter._directory.name
+            files = os.listdir(directory)
+        expected = sorted((trip for trips in windows for trip in trips), key=lambda trip: trip["end_time"])
+        assert [trip["end_time"] for trip in sorted_trips] == [trip["end_time"] for trip in expected] and \
+            sorted(trip["trip_id"] for trip in sorted_trips) == sorted(trip["trip_id"] for trip in expected) and \
+            stats["spilled_runs"] > 4 and len(files) == stats["spilled_runs"] and not os.path.exists(directory)
+
+    def test_replace_window_success_t1(self):
+        """
+        Tests a window written again replaces its trips, and a failed window adds none
+        """
+        def failing_pages():
+            yield [{"trip_id": "lost", "end_time": 5}] * 100
+            raise MDSException("Connection lost")
+
+        with MDSTripSorter(memory_budget=2000) as sorter:
+            sorter.write_window("mock", 0, 10, [[{"trip_id": "old", "end_time": 3}] * 50])
+            sorter.write_window("mock", 0, 10, [[{"trip_id": "new", "end_time": 3}] * 2])
+            try:
+                sorter.write_window("mock", 10, 20, failing_pages())
+                failed = False
+            except MDSException:
+                failed = True
+            trip_ids = [trip["trip_id"] for trip in sorter.iter_trips()]
+            memory = sorter._memory
+            files = os.listdir(sorter._directory.name)
+        # The failed window needed the budget, the completed one was written to a file
+        assert failed and trip_ids == ["new", "new"] and memory == 0 and len(files) == 1
+
+    def test_memory_success_t1(self):
+        """
+        Tests the bytes counted against the budget are the memory the trips held actually take
+        """
+        pages = self._get_pages([{"trip_id": str(position), "end_time": position} for position in range(5000)], 100)
+        with MDSTripSorter() as sorter:
+            tracemalloc.start()
+            try:
+                before = tracemalloc.get_traced_memory()[0]
+                sorter.write_window("mock", 0, 10, pages)
+                held = tracemalloc.get_traced_memory()[0] - before
+            finally:
+                tracemalloc.stop()
+            memory = sorter._memory
+        assert 0.9 * held <= memory <= 1.1 * held
+
+    def test_backfill_success_t1(self):
+        """
+        Tests the windows of a backfill are merged in order and passed on to another sink
+        """
+        class CountingSink:
+            trips = 0
+            lock = threading.Lock()
+
+            def write_window(self, provider, start_time, end_time, pages):
+                trips = sum(len(page) for page in pages)
+                with self.lock:
+                    self.trips += trips
+                return trips
+
+        with MDSMockProvider(version="0.3.0", trips_per_hour=40, page_size=15) as provider:
+            counting = CountingSink()
+            with MDSTripSorter(memory_budget=5000, sink=counting) as sorter:
+                summary = MDSBackfill(
+                    providers={"mock": provider.get_config(provider="mock")}, sink=sorter, workers=3,
+                ).run(self.start_time, self.end_time)
+                trips = list(sorter.iter_trips())
+            expected = sorted(provider.get_trips(self.start_time, self.end_time), key=lambda trip: trip["end_time"])
+        assert summary["completed"] == 4 and counting.trips == 160 and \
+            [trip["end_time"] for trip in trips] == [trip["end_time"] for trip in expected]
+
+    def test_budget_fail_t1(self):
+        """
+        Tests invalid budgets and fan-ins are refused
+        """
+        for kwargs in ({"memory_budget": 0}, {"max_runs": 1}):
+            try:
+                MDSTripSorter(**kwargs)
+                assert False
+            except MDSException:
+                pass
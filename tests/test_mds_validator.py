@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+# Required Libraries
+from parent_directory import *
+from mds.MDSClient import MDSClient
+from mds.MDSException import MDSException
+from mds.MDSMockProvider import MDSMockProvider
+from mds.MDSValidator import MDSTripValidator, get_trip_checks
+
+
+class TestMDSValidator:
+    start_time = 1578780000
+    end_time = 1578783600
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSValidator")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSValidator")
+        print("---------------------------------------------")
+
+    def test_full_success_t1(self):
+        """
+        Tests the trips of the local provider are valid for every version, and the checks are compiled once
+        """
+        for version in ("0.2.0", "0.3.0", "0.4.0"):
+            with MDSMockProvider(version=version, trips_per_hour=50) as provider:
+                trips = provider.get_trips(self.start_time, self.end_time)
+            validator = MDSTripValidator(version)
+            assert validator.validate(trips) == 0 and \
+                validator.get_report()["checked"] == 50 and \
+                get_trip_checks(version) is validator._checks
+
+    def test_full_success_t2(self):
+        """
+        Tests the violations of invalid trips are counted, not raised
+        """
+        with MDSMockProvider(version="0.3.0", trips_per_hour=10) as provider:
+            trips = provider.get_trips(self.start_time, self.end_time)
+        del trips[0]["trip_id"]
+        trips[1]["vehicle_type"] = "moped"
+        trips[2]["end_time"] = trips[2]["end_time"] // 1000
+        trips[3]["route"] = {"type": "FeatureCollection", "features": []}
+        trips[4]["end_time"] = trips[4]["start_time"] - 1000
+        validator = MDSTripValidator("0.3.0")
+        invalid = validator.validate(trips)
+        report = validator.get_report()
+        assert invalid == 5 and report["invalid"] == 5 and report["invalid_rate"] == 0.5 and \
+            report["violations"] == {
+                "trip_id: missing": 1,
+                "vehicle_type: invalid value": 1,
+                "end_time: not a timestamp in milliseconds": 1,
+                "route: not a FeatureCollection of points": 1,
+                "end_time: before start_time": 1,
+            } and \
+            MDSTripValidator("0.4.0").check(trips[1]) == []
+
+    def test_sampled_success_t1(self):
+        """
+        Tests the share of the trips checked over many small pages
+        """
+        with MDSMockProvider(version="0.4.0", trips_per_hour=1000) as provider:
+            trips = provider.get_trips(self.start_time, self.end_time)
+        validator = MDSTripValidator("0.4.0", mode="sampled", sample_rate=0.05, seed=1)
+        for page in range(0, len(trips), 30):
+            validator.validate(trips[page:page + 30])
+        report = validator.get_report()
+        assert report["trips"] == 1000 and report["checked"] == 50 and report["invalid"] == 0
+
+    def test_client_success_t1(self):
+        """
+        Tests a client configured with "first_page" validation checks the first page of each pull only
+        """
+        with MDSMockProvider(version="0.3.0", trips_per_hour=25, page_size=10) as provider:
+            client = MDSClient(config=provider.get_config(validation="first_page"))
+            trips = client.get_trips(start_time=self.start_time, end_time=self.end_time)
+            client.get_trips(start_time=self.start_time, end_time=self.end_time)
+            report = client.get_validation()
+            unvalidated = MDSClient(config=provider.get_config())
+        assert len(trips["data"]["trips"]) == 25 and \
+            report["pages"] == 6 and report["trips"] == 50 and report["checked"] == 20 and \
+            unvalidated.get_validation() is None
+
+    def test_validator_fail_t1(self):
+        """
+        Tests unknown versions and modes are refused
+        """
+        for args, kwargs in ((("0.1.0",), {}), (("0.3.0",), {"mode": "all"}), (("0.3.0",), {"sample_rate": 0})):
+            try:
+                MDSTripValidator(*args, **kwargs)
+                assert False
+            except MDSException:
+                pass
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+# Required Libraries
+import json
+import os
+import tempfile
+
+from parent_directory import *
+from mds.MDSClient import MDSClient
+from mds.MDSException import MDSException
+from mds.MDSMockProvider import MDSMockProvider
+from mds.MDSTransport import MDSTransport, MDSTransportResponse
+from mds.MDSVersionProbe import MDSVersionProbe
+
+
+class StaticTransport(MDSTransport):
+    """
+    Answers every request with the same status and body, as a provider ignoring the Accept header
+    """
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = json.dumps(body).encode()
+        self.requests = 0
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        self.requests += 1
+        return MDSTransportResponse(self.status_code, self.body)
+
+
+def build_clients(transport):
+    return {
+        version: MDSClient.load_mds_client(version)(config={"mds_api_url": "http://mock", "transport": transport})
+        for version in MDSVersionProbe.versions
+    }
+
+
+class TestMDSVersionProbe:
+    start_time = 1578780000
+    end_time = 1578783600
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSVersionProbe")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSVersionProbe")
+        print("---------------------------------------------")
+
+    def test_auto_success_t1(self):
+        """
+        Tests "auto" finds the version of the provider, pulls with it and caches it
+        """
+        with tempfile.TemporaryDirectory() as directory, \
+                MDSMockProvider(version="0.3.0", trips_per_hour=20, page_size=10) as provider:
+            cache_path = os.path.join(directory, "versions.json")
+            client = MDSClient(config=provider.get_config(version="auto", version_cache=cache_path))
+            trips = client.get_trips(start_time=self.start_time, end_time=self.end_time)
+            with open(cache_path) as file:
+                cache = json.load(file)
+        assert client.version == "0.3.0" and client.mds_client.version == "0.3.0" and \
+            provider.stats["not_acceptable"] == 1 and \
+            len(trips["data"]["trips"]) == 20 and \
+            cache["mock-0.3.0"]["version"] == "0.3.0"
+
+    def test_auto_success_t2(self):
+        """
+        Tests the cached version is used until it expires
+        """
+        with tempfile.TemporaryDirectory() as directory, \
+                MDSMockProvider(version="0.2.0", trips_per_hour=20) as provider:
+            cache_path = os.path.join(directory, "versions.json")
+            MDSClient(config=provider.get_config(version="auto", version_cache=cache_path))
+            probed = provider.stats["requests"]
+            cached = MDSClient(config=provider.get_config(version="auto", version_cache=cache_path))
+            requests_cached = provider.stats["requests"]
+            MDSClient(config=provider.get_config(version="auto", version_cache=cache_path, version_cache_ttl=0))
+        assert probed == 3 and requests_cached == 3 and cached.version == "0.2.0" and \
+            provider.stats["requests"] == 6
+
+    def test_probe_success_t1(self):
+        """
+        Tests the version of the payload wins when the provider ignores the Accept header
+        """
+        transport = StaticTransport(200, {"version": "0.3.1", "data": {"trips": []}})
+        version = MDSVersionProbe().probe(build_clients(transport), headers={})
+        assert version == "0.3.0" and transport.requests == 1
+
+    def test_probe_fail_t1(self):
+        """
+        Tests a provider refusing every version or serving an unknown one
+        """
+        for status_code, body, message in (
+            (406, {"error": "not_acceptable"}, "refused every version"),
+            (200, {"version": "1.0.0"}, "unsupported version"),
+            (401, {"error": "unauthorized"}, "answered 401"),
+        ):
+            try:
+                MDSVersionProbe().probe(build_clients(StaticTransport(status_code, body)), headers={})
+                assert False
+            except MDSException as e:
+                assert message in str(e)
+
+    def test_load_mds_client_fail_t1(self):
+        """
+        Tests an unknown version raises instead of returning None
+        """
+        try:
+            MDSClient.load_mds_client("0.5.0")
+            assert False
+        except MDSException as e:
+            assert "Unsupported version: '0.5.0'" in str(e)
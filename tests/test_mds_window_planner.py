@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+# Required Libraries
+import os
+import tempfile
+
+from parent_directory import *
+from mds.MDSBackfill import MDSBackfill
+from mds.MDSClient import MDSClient
+from mds.MDSException import MDSException
+from mds.MDSMockProvider import MDSMockProvider
+from mds.MDSSink import MDSFileSink
+from mds.MDSWindowPlanner import MDSWindowPlanner
+
+
+class TestMDSWindowPlanner:
+    # 2020-01-11T00:00:00Z
+    day = 1578700800
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSWindowPlanner")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSWindowPlanner")
+        print("---------------------------------------------")
+
+    def test_plan_windows_success_t1(self):
+        """
+        Tests dense hours are split and sparse hours merged, on multiples of min_window
+        """
+        planner = MDSWindowPlanner(target_trips=1000)
+        unknown = planner.plan_windows("lime", self.day + 100, self.day + 3 * 3600)
+        for hour in range(24):
+            hour_start = self.day + hour * 3600
+            planner.observe("lime", hour_start, hour_start + 3600, 7200 if hour in (13, 14) else 36)
+        windows = planner.plan_windows("lime", self.day, self.day + 86400)
+        sizes = [window_end - window_start for window_start, window_end in windows]
+        assert unknown == [(self.day + 100, self.day + 3600), (self.day + 3600, self.day + 7200),
+                           (self.day + 7200, self.day + 10800)] and \
+            windows[0][0] == self.day and windows[-1][1] == self.day + 86400 and \
+            all(windows[position][1] == windows[position + 1][0] for position in range(len(windows) - 1)) and \
+            all(window_start % 300 == 0 for window_start, _ in windows) and \
+            sizes.count(600) == 11 and sizes[0] > 10 * 3600 and len(windows) == 13
+
+    def test_save_success_t1(self):
+        """
+        Tests the densities are stored and loaded, and moved by new observations
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "densities.json")
+            planner = MDSWindowPlanner(path)
+            planner.observe("lime", self.day, self.day + 3600, 3600)
+            planner.save()
+            loaded = MDSWindowPlanner(path, smoothing=0.5)
+            loaded.observe("lime", self.day, self.day + 3600, 0)
+        assert loaded.get_density("lime", self.day + 60) == 0.5 and \
+            loaded.densities["lime"][0]["samples"] == 2 and \
+            loaded.get_density("lime", self.day + 7200) == 0.5 and \
+            loaded.get_density("bird", self.day) is None
+
+    def test_iter_trips_success_t1(self):
+        """
+        Tests a pull planned window by window gets every trip, in shorter windows once the density is known
+        """
+        planner = MDSWindowPlanner(target_trips=100)
+        with MDSMockProvider(version="0.3.0", trips_per_hour=600, page_size=50) as provider:
+            client = MDSClient(config=provider.get_config())
+            trips = [trip for page in planner.iter_trips(client, "mock", self.day, self.day + 7200) for trip in page]
+            expected = provider.get_trips(self.day, self.day + 7200)
+        assert sorted(trip["trip_id"] for trip in trips) == sorted(trip["trip_id"] for trip in expected) and \
+            planner.next_window("mock", self.day + 7200, self.day + 86400) == self.day + 7200 + 600
+
+    def test_backfill_success_t1(self):
+        """
+        Tests a backfill with a planner keeps the completed windows and plans the gaps with what it learned
+        """
+        with tempfile.TemporaryDirectory() as directory, \
+                MDSMockProvider(version="0.2.0", trips_per_hour=400, page_size=100) as provider:
+            planner = MDSWindowPlanner(os.path.join(directory, "densities.json"), target_trips=200)
+            checkpoint = os.path.join(directory, "checkpoint")
+            providers = {"mock": provider.get_config()}
+            sink = MDSFileSink(os.path.join(directory, "trips"))
+            first = MDSBackfill(providers=providers, sink=sink, checkpoint=checkpoint, planner=planner).run(
+                self.day + 3600, self.day + 3 * 3600
+            )
+            second = MDSBackfill(
+                providers=providers, sink=sink, checkpoint=checkpoint,
+                planner=MDSWindowPlanner(os.path.join(directory, "densities.json"), target_trips=200),
+            ).run(self.day, self.day + 4 * 3600)
+        assert first["windows"] == 2 and first["trips"] == 800 and \
+            second["skipped"] == 2 and second["completed"] == 4 and second["trips"] == 800 and \
+            not second["failed"]
+
+    def test_planner_fail_t1(self):
+        """
+        Tests invalid settings and 0.4.0 clients are refused
+        """
+        for kwargs in ({"min_window": 0}, {"min_window": 7200}, {"smoothing": 0}):
+            try:
+                MDSWindowPlanner(**kwargs)
+                assert False
+            except MDSException:
+                pass
+        with MDSMockProvider(version="0.4.0") as provider:
+            client = MDSClient(config=provider.get_config())
+            try:
+                next(MDSWindowPlanner().iter_trips(client, "mock", self.day, self.day + 3600))
+                assert False
+            except MDSException as e:
+                assert "0.4.0" in str(e)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+# Required Libraries
+import tempfile
+
+from parent_directory import *
+from mds.MDSBackfill import MDSBackfill
+from mds.MDSMockProvider import MDSMockProvider
+from mds.MDSScheduler import MDSScheduler
+from mds.MDSSink import MDSFileSink
+from mds.MDSWindowQueue import MDSWindowQueue
+
+
+class TestMDSWindowQueue:
+    hour = 1578780000
+
+    def setup_class(self):
+        print("\n\n---------------------------------------------")
+        print("Beginning tests for: TestMDSWindowQueue")
+        print("---------------------------------------------")
+
+    def teardown_class(self):
+        print("\n\n---------------------------------------------")
+        print("All tests finished for: TestMDSWindowQueue")
+        print("---------------------------------------------")
+
+    def _put(self, queue, provider, hours_ago, priority=MDSWindowQueue.BACKFILL):
+        end_time = self.hour - hours_ago * 3600
+        return queue.put(provider, {}, end_time - 3600, end_time, sink=None, priority=priority)
+
+    def _take(self, queue, count):
+        taken = []
+        for _ in range(count):
+            job = queue.get(timeout=0)
+            taken.append((job.provider, (self.hour - job.end_time) // 3600))
+            queue.task_done(job)
+        return taken
+
+    def test_order_success_t1(self):
+        """
+        Tests live windows go first, then providers take turns, newest window first
+        """
+        queue = MDSWindowQueue()
+        for hours_ago in range(1, 5):
+            self._put(queue, "big", hours_ago)
+        self._put(queue, "small", 1)
+        self._put(queue, "small", 2)
+        self._put(queue, "small", 0, priority=MDSWindowQueue.LIVE)
+        assert self._take(queue, 7) == [
+            ("small", 0), ("big", 1), ("small", 1), ("big", 2), ("small", 2), ("big", 3), ("big", 4),
+        ] and queue.get(timeout=0) is None
+
+    def test_max_in_flight_success_t1(self):
+        """
+        Tests a provider at its limit of windows being pulled lets the others through
+        """
+        queue = MDSWindowQueue(max_in_flight=1)
+        self._put(queue, "big", 0, priority=MDSWindowQueue.LIVE)
+        self._put(queue, "big", 1, priority=MDSWindowQueue.LIVE)
+        self._put(queue, "small", 1)
+        first = queue.get(timeout=0)
+        second = queue.get(timeout=0)
+        third = queue.get(timeout=0)
+        queue.task_done(first)
+        fourth = queue.get(timeout=0)
+        assert (first.provider, second.provider, third, fourth.provider) == ("big", "small", None, "big")
+
+    def test_promote_success_t1(self):
+        """
+        Tests queueing a pending window again returns its future, and promotes it
+        """
+        queue = MDSWindowQueue()
+        self._put(queue, "a", 1)
+        backfill_future = self._put(queue, "b", 5)
+        live_future = self._put(queue, "b", 5, priority=MDSWindowQueue.LIVE)
+        assert live_future is backfill_future and \
+            queue.get_pending() == {MDSWindowQueue.LIVE: 1, MDSWindowQueue.BACKFILL: 1} and \
+            self._take(queue, 2) == [("b", 5), ("a", 1)] and \
+            queue.get(timeout=0) is None
+
+    def test_shared_workers_success_t1(self):
+        """
+        Tests a backfill and the scheduler pull through the same workers
+        """
+        with tempfile.TemporaryDirectory() as path, \
+                MDSMockProvider(version="0.4.0", trips_per_hour=20, page_size=10) as provider:
+            providers = {"mock": provider.get_config(provider="mock")}
+            queue = MDSWindowQueue(max_in_flight=2)
+            queue.start(workers=3)
+            sink = MDSFileSink(path)
+            backfill = MDSBackfill(providers=providers, sink=sink, queue=queue)
+            scheduler = MDSScheduler(providers=providers, sink=sink, queue=queue, catch_up=2)
+            live = scheduler.run_provider("mock", now=self.hour + 600)
+            summary = backfill.run(self.hour - 6 * 3600, self.hour - 2 * 3600)
+            queue.close()
+
+        assert live == {"completed": 2, "failed": 0, "trips": 40} and \
+            summary["completed"] == 4 and summary["trips"] == 80
+
+    def test_close_fail_t1(self):
+        """
+        Tests closing the queue cancels the pending windows
+        """
+        queue = MDSWindowQueue()
+        future = self._put(queue, "a", 1)
+        queue.close()
+        assert future.cancelled() and queue.get(timeout=0) is None